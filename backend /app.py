@@ -4,13 +4,24 @@ from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from dotenv import load_dotenv
-from datetime import timedelta
 
 from config import Config
 from models.user import db, User, UserRole
 from utils.helpers import make_response_data
 from resources import api_bp  # Your API blueprints
 from resources.dashboard import dashboard_bp
+from utils.rollups import rollup_cli
+from utils.stock import stock_cli
+from utils.cache import response_cache
+from utils.auth_state import active_users, issued_at_ms
+from utils.instrumentation import sql_instrumentation
+from utils.metrics import metrics
+from utils.profiler import request_profiler
+from utils.engine import apply_engine_profile, register_connection_setup
+from utils.replica import configure_read_replica, read_replica, replica_cli
+from utils.jobs import job_runner, jobs_cli
+from utils.archive import archive_cli
+from utils.notify import message_changes
 
 # Load environment variables
 load_dotenv()
@@ -38,13 +49,15 @@ def create_app(config_class=Config):
         "http://127.0.0.1:5000"
     ]
 
-    # JWT Expiry
-    app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
-    # app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
-
     # Initialize Extensions
+    # Binds and pool settings must be in place before db.init_app creates the engines
+    configure_read_replica(app)
+    apply_engine_profile(app)
     db.init_app(app)
+    register_connection_setup(app)
+    read_replica.init_app(app)
     jwt.init_app(app)
+    active_users.init_app(app)
     # cors.init_app(app, resources={r"/*": {
     #     "origins": app.config['CORS_ORIGINS'],
     #     "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
@@ -66,12 +79,32 @@ def create_app(config_class=Config):
 
     
     migrate.init_app(app, db)
+    app.cli.add_command(rollup_cli)
+    app.cli.add_command(stock_cli)
+    app.cli.add_command(replica_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(archive_cli)
+    response_cache.init_app(app)
+    sql_instrumentation.init_app(app)
+    metrics.init_app(app)
+    request_profiler.init_app(app)
+    job_runner.init_app(app)
+    message_changes.init_app(app)
 
     # JWT error handlers
     @jwt.expired_token_loader
     def expired_token_callback(jwt_header, jwt_payload):
         return jsonify({'success': False, 'message': 'The token has expired', 'error': 'token_expired'}), 401
 
+    @jwt.token_in_blocklist_loader
+    def token_revoked_check(jwt_header, jwt_payload):
+        # In-memory check against the cached user map; no per-request DB hit
+        return active_users.is_token_revoked(jwt_payload['sub'], issued_at_ms(jwt_payload))
+
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return jsonify({'success': False, 'message': 'The token has been revoked', 'error': 'token_revoked'}), 401
+
     @jwt.invalid_token_loader
     def invalid_token_callback(error):
         return jsonify({'success': False, 'message': 'Invalid token', 'error': 'invalid_token'}), 401
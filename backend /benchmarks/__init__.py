@@ -0,0 +1 @@
+"""In-process benchmark suite: synthetic data generator (seed), cases, runner and comparison."""
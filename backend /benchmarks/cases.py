@@ -0,0 +1,169 @@
+"""The requests the benchmark runner times, one or more per registered route and method."""
+from datetime import date, timedelta
+
+
+class Case:
+    """
+    One timed request. `path` and `json` may be callables taking the iteration
+    number, for writes that need a fresh target each time. `destructive` cases
+    run once, after every other case. `repeat` caps the iterations (e.g. exports).
+    `headers` are sent in addition to the Authorization header.
+    """
+
+    def __init__(self, name, method, path, role=None, json=None, token='access',
+                 destructive=False, repeat=None, headers=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.json = json
+        self.token = token
+        self.destructive = destructive
+        self.repeat = repeat
+        self.headers = headers or {}
+
+    def resolve(self, iteration):
+        path = self.path(iteration) if callable(self.path) else self.path
+        body = self.json(iteration) if callable(self.json) else self.json
+        return '/api' + path, body
+
+
+def build_cases(ids):
+    """
+    `ids` holds the seeded fixtures the cases point at: first user per role
+    ('ceo', 'seller', ...), 'driver_ids' (users safe to edit), 'spare_users'
+    (users safe to delete) and row-id ranges for deletes.
+    """
+    today = date.today()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    driver = ids['driver_ids'][0]
+
+    def sale(i):
+        return {'assignment': 'Bench', 'fruit_type': 'mango', 'quantity': '12.5', 'unit': 'kg',
+                'revenue': 3200.0, 'sale_date': today.isoformat()}
+
+    def purchase(i):
+        return {'supplier_name': 'Bench supplier', 'fruit_type': 'mango', 'quantity': '40', 'unit': 'kg',
+                'cost': 5100.0, 'purchase_date': today.isoformat()}
+
+    def batch(factory):
+        return lambda i: [factory(i) for _ in range(100)]
+
+    def delete_from(key):
+        return lambda i: ids[key][i % len(ids[key])]
+
+    return [
+        Case('health', 'GET', '/health'),
+        Case('cors_test', 'GET', '/cors-test'),
+
+        # Auth
+        Case('auth.login', 'POST', '/auth/login', json={'email': ids['seller_email'], 'password': ids['password']}),
+        Case('auth.me', 'GET', '/auth/me', 'seller'),
+        Case('auth.refresh', 'POST', '/auth/refresh', 'seller', token='refresh'),
+
+        # Users
+        Case('users.list', 'GET', '/users', 'ceo'),
+        Case('users.create', 'POST', '/users', 'ceo', json=lambda i: {
+            'email': f'bench-new-{i}@example.com', 'password': 'bench', 'name': 'New', 'role': 'driver'}),
+        Case('users.update', 'PUT', f'/users/{driver}', 'ceo', json={
+            'email': f'bench-driver-{driver}@example.com', 'password': '', 'name': 'Driver', 'role': 'driver'}),
+        Case('users.salary', 'PUT', f'/users/{driver}/salary', 'ceo', json={'salary': 1200.0}),
+        Case('users.payment', 'PUT', f'/users/{driver}/payment', 'ceo', json={'is_paid': True}),
+        Case('users.delete', 'DELETE', lambda i: f"/users/{delete_from('spare_users')(i)}", 'ceo'),
+
+        # Inventory and stock
+        Case('inventory.list', 'GET', '/inventory', 'storekeeper'),
+        Case('inventory.list_filtered', 'GET', '/inventory?fruit_type=mango&limit=50', 'storekeeper'),
+        Case('inventory.create', 'POST', '/inventory', 'storekeeper', json={
+            'name': 'Bench lot', 'quantity': '100', 'fruit_type': 'mango', 'unit': 'kg',
+            'location': 'Depot', 'expiry_date': (today + timedelta(days=20)).isoformat()}),
+        Case('inventory.update', 'PUT', lambda i: f"/inventory/{ids['inventory_ids'][i % len(ids['inventory_ids'])]}",
+             'storekeeper', json=lambda i: {'name': 'Bench lot', 'quantity': str(500 + i), 'fruit_type': 'mango'}),
+        Case('inventory.delete', 'DELETE', lambda i: f"/inventory/{delete_from('spare_inventory')(i)}", 'storekeeper'),
+        Case('inventory.export', 'GET', '/inventory/export?format=ndjson', 'ceo', repeat=3),
+        Case('inventory.expiring', 'GET', '/inventory/expiring?days=14', 'storekeeper'),
+        Case('inventory.stock', 'GET', f"/inventory/{ids['inventory_ids'][0]}/stock", 'storekeeper'),
+        Case('inventory.stock_as_of', 'GET', f"/inventory/{ids['inventory_ids'][0]}/stock?as_of={month_ago}", 'storekeeper'),
+        Case('stock.list', 'GET', '/stock-movements', 'storekeeper'),
+        Case('stock.create', 'POST', '/stock-movements', 'storekeeper', json={
+            'inventory_id': ids['inventory_ids'][0], 'movement_type': 'in', 'quantity': '5'}),
+        Case('stock.export', 'GET', '/stock-movements/export', 'ceo', repeat=3),
+
+        # Legacy stubs
+        Case('expenses.other', 'GET', '/expenses/other', 'ceo'),
+        Case('expenses.car', 'GET', '/car-expenses', 'ceo'),
+        Case('salaries.list', 'GET', '/salaries', 'ceo'),
+        Case('salaries.payments', 'GET', '/salary-payments', 'ceo'),
+
+        # Sales
+        Case('sales.list_ceo', 'GET', '/sales', 'ceo'),
+        Case('sales.list_seller', 'GET', '/sales', 'seller'),
+        Case('sales.list_range', 'GET', f'/sales?date_from={month_ago}&fruit_type=mango', 'ceo'),
+        Case('sales.create', 'POST', '/sales', 'seller', json=sale),
+        Case('sales.batch', 'POST', '/sales/batch', 'seller', json=batch(sale)),
+        Case('sales.update', 'PUT', f"/sales/{ids['sale_id']}", 'ceo', json=sale),
+        Case('sales.delete', 'DELETE', lambda i: f"/sales/{delete_from('spare_sales')(i)}", 'ceo'),
+        Case('sales.summary', 'GET', '/sales/summary', 'ceo'),
+        Case('sales.summary_all', 'GET', '/sales/summary?include_archived=true', 'ceo'),
+        Case('sales.archive', 'GET', '/sales/archive', 'ceo'),
+        Case('sales.export', 'GET', '/sales/export', 'ceo', repeat=3),
+
+        # Purchases
+        Case('purchases.list_ceo', 'GET', '/purchases', 'ceo'),
+        Case('purchases.list_purchaser', 'GET', '/purchases', 'purchaser'),
+        Case('purchases.create', 'POST', '/purchases', 'purchaser', json=purchase),
+        Case('purchases.batch', 'POST', '/purchases/batch', 'purchaser', json=batch(purchase)),
+        Case('purchases.update', 'PUT', f"/purchases/{ids['purchase_id']}", 'ceo', json=purchase),
+        Case('purchases.delete', 'DELETE', lambda i: f"/purchases/{delete_from('spare_purchases')(i)}", 'ceo'),
+        Case('purchases.summary', 'GET', '/purchases/summary', 'ceo'),
+        Case('purchases.archive', 'GET', '/purchases/archive', 'ceo'),
+        Case('purchases.export', 'GET', '/purchases/export', 'ceo', repeat=3),
+
+        # Gradients
+        Case('gradients.list', 'GET', '/gradients', 'storekeeper'),
+        Case('gradients.create', 'POST', '/gradients', 'storekeeper', json={
+            'fruit_type': 'mango', 'gradient_type': 'wax', 'application_date': today.isoformat()}),
+
+        # Messages
+        Case('messages.list', 'GET', '/messages', 'seller'),
+        Case('messages.create', 'POST', '/messages', 'ceo', json={'message': 'Bench broadcast', 'recipient_role': 'seller'}),
+        Case('messages.mark_read', 'PUT', f"/messages/{ids['seller_message_id']}", 'seller'),
+        Case('messages.poll', 'GET', '/messages/poll?since=0&timeout=0', 'seller'),
+        Case('messages.read_batch', 'POST', '/messages/read', 'seller', json={'ids': ids['seller_message_ids']}),
+        Case('messages.unread_count', 'GET', '/messages/unread-count', 'seller'),
+        Case('messages.archive', 'GET', '/messages/archive', 'ceo'),
+
+        # Dashboards and analytics
+        Case('dashboard.ceo', 'GET', '/ceo/dashboard', 'ceo'),
+        Case('dashboard.seller', 'GET', '/seller/dashboard', 'seller'),
+        Case('dashboard.purchaser', 'GET', '/purchaser/dashboard', 'purchaser'),
+        Case('dashboard.storekeeper', 'GET', '/storekeeper/dashboard', 'storekeeper'),
+        Case('stats', 'GET', '/stats', 'ceo'),
+        Case('performance.stats', 'GET', '/performance/stats', 'ceo'),
+        Case('performance.fruit', 'GET', '/performance/fruit?bucket=week', 'ceo'),
+        Case('performance.monthly', 'GET', '/performance/monthly', 'ceo'),
+
+        # Profiler: a profiled request first, so the list and download have something to show
+        Case('profiles.profiled_dashboard', 'GET', '/ceo/dashboard', 'ceo', headers={'X-Profile': '1'}, repeat=3),
+        Case('profiles.list', 'GET', '/profiles', 'ceo'),
+        Case('profiles.download', 'GET', lambda i: f"/profiles/{ids['latest_profile']()}", 'ceo'),
+
+        # Background jobs: these time the 202 only; the queued jobs run when a case needs their result
+        Case('sales.export_async', 'GET', '/sales/export?async=true', 'ceo', repeat=3),
+        Case('stock.export_async', 'GET', '/stock-movements/export?async=true&format=ndjson', 'storekeeper', repeat=3),
+        Case('jobs.rebuild_rollups', 'POST', '/jobs', 'ceo', json={'kind': 'rebuild_rollups'}, repeat=3),
+        Case('jobs.list', 'GET', '/jobs', 'ceo'),
+        Case('jobs.status', 'GET', lambda i: f"/jobs/{ids['finished_export']()}", 'ceo'),
+        Case('jobs.download', 'GET', lambda i: f"/jobs/{ids['finished_export']()}/download", 'ceo', repeat=3),
+
+        # Run last, once each
+        Case('auth.logout', 'POST', '/auth/logout', 'driver', destructive=True),
+        # Moves rows out of the hot tables, so it runs with the other destructive cases
+        Case('jobs.archive', 'POST', '/jobs', 'ceo', json={'kind': 'archive'}, destructive=True),
+        Case('messages.clear', 'DELETE', '/messages/clear', 'ceo', destructive=True),
+        Case('gradients.clear', 'DELETE', '/gradients/clear', 'ceo', destructive=True),
+        Case('stock.clear', 'DELETE', '/stock-movements/clear', 'ceo', destructive=True),
+        Case('sales.clear', 'DELETE', '/sales/clear', 'ceo', destructive=True),
+        Case('purchases.clear', 'DELETE', '/purchases/clear', 'ceo', destructive=True),
+        Case('inventory.clear', 'DELETE', '/inventory/clear', 'ceo', destructive=True),
+    ]
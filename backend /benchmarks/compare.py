@@ -0,0 +1,34 @@
+"""
+Compare two benchmark result files case by case.
+
+    python -m benchmarks.compare benchmarks/results/abc123-100000.json benchmarks/results/def456-100000.json
+"""
+import json
+import sys
+
+
+def load(path):
+    with open(path) as handle:
+        report = json.load(handle)
+    return report, {result['name']: result for result in report['results']}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    (before, old), (after, new) = load(argv[0]), load(argv[1])
+    print(f"{'case':<28} {before['commit']:>10} {after['commit']:>10} {'change':>8}   queries")
+    for name in [name for name in old if name in new] + [name for name in new if name not in old]:
+        a, b = old.get(name), new[name]
+        if a is None:
+            print(f"{name:<28} {'-':>10} {b['p50_ms']:>10.2f} {'new':>8}   {b['queries']}")
+            continue
+        change = (b['p50_ms'] - a['p50_ms']) / a['p50_ms'] * 100 if a['p50_ms'] else 0.0
+        print(f"{name:<28} {a['p50_ms']:>10.2f} {b['p50_ms']:>10.2f} {change:>+7.1f}%   {a['queries']} -> {b['queries']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
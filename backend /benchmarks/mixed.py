@@ -0,0 +1,175 @@
+"""
+Mixed read/write throughput under each engine profile.
+
+    python -m benchmarks.mixed --rows 100000 --seconds 15 --readers 6 --writers 2
+
+Seeds one SQLite database, then for each profile (default: none, sqlite) copies
+it, builds an app with DATABASE_ENGINE_PROFILE set to that profile, and runs
+reader threads (dashboards, summaries, lists) against writer threads (sales
+and stock movements) through the Flask test client for a fixed time. Reports
+requests per second, latency percentiles and errors per kind, to stdout and to
+benchmarks/results/<commit>-mixed-<rows>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+from benchmarks.run import BACKEND_DIR, RESULTS_DIR, _git_commit, _percentile
+
+READS = ['/api/ceo/dashboard', '/api/sales/summary', '/api/sales?limit=50', '/api/inventory?limit=50',
+         '/api/purchases/summary', '/api/stock-movements?limit=50']
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50_000, help='approximate total rows to seed')
+    parser.add_argument('--seconds', type=float, default=10, help='duration of each profile run')
+    parser.add_argument('--readers', type=int, default=6, help='reader threads')
+    parser.add_argument('--writers', type=int, default=2, help='writer threads')
+    parser.add_argument('--profiles', default='none,sqlite', help='comma-separated DATABASE_ENGINE_PROFILE values')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the data generator')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<commit>-mixed-<rows>.json)')
+    return parser.parse_args(argv)
+
+
+def _worker(app, headers, requests, deadline, samples, errors, lock):
+    client = app.test_client()
+    iteration = 0
+    while time.perf_counter() < deadline:
+        method, path, body = requests(iteration)
+        iteration += 1
+        start = time.perf_counter()
+        try:
+            response = client.open(path, method=method, json=body, headers=headers)
+            response.get_data()
+            failed = response.status_code >= 400 and f'HTTP {response.status_code}'
+        except Exception as e:  # e.g. "database is locked" escaping a handler
+            failed = type(e).__name__
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            if failed:
+                errors[failed] = errors.get(failed, 0) + 1
+            else:
+                samples.append(elapsed)
+
+
+def run_profile(profile, base_db, args, workdir):
+    from config import Config
+    from app import create_app
+    from models import db, Inventory, User, UserRole
+    from benchmarks.run import _tokens
+
+    db_path = os.path.join(workdir, f'mixed-{profile}.db')
+    shutil.copyfile(base_db, db_path)
+    config = type('MixedBenchConfig', (Config,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'DATABASE_ENGINE_PROFILE': profile,
+        'RESPONSE_CACHE_BACKEND': 'none',
+        'PROFILER_ENABLED': False,
+    })
+    app = create_app(config)
+    with app.app_context():
+        roles = {role.value: db.session.query(User.id).filter(User.role == role).order_by(User.id).limit(1).scalar()
+                 for role in UserRole}
+        items = [row.id for row in db.session.query(Inventory.id).order_by(Inventory.id).limit(50)]
+    tokens = _tokens(app, roles)
+
+    def auth(role):
+        return {'Authorization': 'Bearer ' + tokens[role]['access']}
+
+    def reads(i):
+        return 'GET', READS[i % len(READS)], None
+
+    def writes(i):
+        if i % 2:
+            return 'POST', '/api/stock-movements', {
+                'inventory_id': items[i % len(items)], 'movement_type': 'in', 'quantity': '2'}
+        return 'POST', '/api/sales', {
+            'assignment': 'Mixed', 'fruit_type': 'mango', 'quantity': '3', 'unit': 'kg',
+            'revenue': 450.0, 'sale_date': date.today().isoformat()}
+
+    lock = threading.Lock()
+    stats = {kind: ([], {}) for kind in ('read', 'write')}
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=_worker, args=(app, auth('ceo'), reads, deadline, *stats['read'], lock))
+               for _ in range(args.readers)]
+    # Writers alternate sales (seller) and stock movements (storekeeper); each needs its role
+    threads += [threading.Thread(target=_worker, args=(
+        app, auth('storekeeper' if n % 2 else 'seller'),
+        (lambda i, n=n: writes(2 * i + n % 2)), deadline, *stats['write'], lock))
+        for n in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        db.engine.dispose()
+
+    result = {'profile': profile}
+    for kind, (samples, errors) in stats.items():
+        result[kind] = {
+            'ok': len(samples),
+            'per_second': round(len(samples) / args.seconds, 1),
+            'p50_ms': round(statistics.median(samples), 2) if samples else None,
+            'p99_ms': round(_percentile(samples, 0.99), 2) if samples else None,
+            'max_ms': round(max(samples), 2) if samples else None,
+            'errors': errors,
+        }
+    return result
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='fruittrack-mixed-')
+    base_db = os.path.join(workdir, 'base.db')
+    # Config reads the environment at import time; the module-level app seeds the base file,
+    # which must stay in rollback-journal mode for the baseline (WAL mode persists in the file)
+    os.environ['DATABASE_URL'] = f'sqlite:///{base_db}'
+    os.environ['DATABASE_ENGINE_PROFILE'] = 'none'
+    os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app
+    from benchmarks.seed import plan_counts, seed
+
+    try:
+        with app.app_context():
+            seed(plan_counts(args.rows), random_seed=args.seed)
+        results = []
+        for profile in args.profiles.split(','):
+            result = run_profile(profile, base_db, args, workdir)
+            results.append(result)
+            for kind in ('read', 'write'):
+                r = result[kind]
+                print(f"{profile:<10} {kind:<5} {r['per_second']:>8.1f} req/s  p50 {r['p50_ms']} ms  "
+                      f"p99 {r['p99_ms']} ms  max {r['max_ms']} ms  errors {r['errors'] or 0}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'rows': args.rows,
+        'seconds': args.seconds,
+        'readers': args.readers,
+        'writers': args.writers,
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-mixed-{args.rows}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f'Wrote {output}', file=sys.stderr)
+    return report
+
+
+if __name__ == '__main__':
+    main()
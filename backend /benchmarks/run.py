@@ -0,0 +1,307 @@
+"""
+Seed a synthetic SQLite database and time every API route through the Flask test client.
+
+    python -m benchmarks.run --rows 100000
+    python -m benchmarks.run --rows 1000000 --db /tmp/bench-1m.db --reuse --repeat 50
+
+Writes latency percentiles, SQL query counts, response sizes and peak Python memory
+per case to a JSON file (benchmarks/results/<commit>-<rows>.json by default), which
+`python -m benchmarks.compare` diffs across runs.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, 'benchmarks', 'results')
+SPARE_ROWS = 200
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000, help='approximate total rows to seed')
+    for table in ('users', 'sales', 'purchases', 'inventory', 'stock-movements', 'messages', 'gradients'):
+        parser.add_argument(f'--{table}', type=int, help=f'exact {table} row count (overrides --rows share)')
+    parser.add_argument('--db', help='SQLite file to use (default: a file per --rows in the temp dir)')
+    parser.add_argument('--reuse', action='store_true', help='reuse --db if it exists instead of reseeding')
+    parser.add_argument('--repeat', type=int, default=20, help='timed iterations per case')
+    parser.add_argument('--only', help='run only cases whose name contains this string')
+    parser.add_argument('--skip-destructive', action='store_true', help='skip the clear/logout cases')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--seed', type=int, default=42, help='random seed for the data generator')
+    parser.add_argument('--output', help='result file (default: benchmarks/results/<commit>-<rows>.json)')
+    return parser.parse_args(argv)
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+
+def _fixtures(app, db):
+    """Ids the cases point at, read back from the seeded database."""
+    from sqlalchemy import func, select
+    from models import User, UserRole, Sale, Purchase, Inventory, Message, MessageRead, UnreadMessageCount, TokenRevocation
+    from utils.profiler import request_profiler
+    from utils.rollups import SALES_ROLLUP, PURCHASES_ROLLUP, apply_inserted_rows
+    from benchmarks.seed import BENCH_PASSWORD
+
+    with app.app_context():
+        first = {role.value: db.session.execute(
+            select(User.id).where(User.role == role).order_by(User.id).limit(1)).scalar() for role in UserRole}
+        seller = db.session.get(User, first['seller'])
+        drivers = db.session.execute(
+            select(User.id).where(User.role == UserRole.DRIVER).order_by(User.id).limit(1)).scalars().all()
+
+        def last_ids(model):
+            return db.session.execute(
+                select(model.id).order_by(model.id.desc()).limit(SPARE_ROWS)).scalars().all()
+
+        # Picked before the spare users' own rows are added, so the cases don't overlap
+        spare_sales, spare_purchases = last_ids(Sale), last_ids(Purchase)
+
+        inbox = db.session.execute(
+            select(Message.id).where((Message.recipient_id == seller.id) | (Message.recipient_role == UserRole.SELLER))
+            .order_by(Message.id).limit(50)).scalars().all()
+
+        # Throwaway users for the delete case. Each owns a sale and a purchase, has read a
+        # message, has an unread counter and has logged out once, so deleting one goes
+        # through everything that references a real user
+        now = datetime.utcnow()
+        max_id = db.session.execute(select(func.max(User.id))).scalar()
+        spare = [{'id': max_id + n + 1, 'email': f'bench-spare-{max_id + n + 1}@example.com', 'name': 'Spare',
+                  'role': UserRole.DRIVER.name, 'password_hash': seller.password_hash, 'is_active': True,
+                  'created_at': now} for n in range(SPARE_ROWS)]
+        db.session.execute(User.__table__.insert(), spare)
+        owned_sales = [{'seller_id': row['id'], 'assignment': 'Spare', 'fruit_type': 'mango', 'quantity': 1.0,
+                        'unit': 'kg', 'revenue': 1.0, 'sale_date': now.date(), 'created_at': now} for row in spare]
+        owned_purchases = [{'purchaser_id': row['id'], 'supplier_name': 'Spare', 'fruit_type': 'mango', 'quantity': 1.0,
+                            'unit': 'kg', 'cost': 1.0, 'purchase_date': now.date(), 'created_at': now} for row in spare]
+        db.session.execute(Sale.__table__.insert(), owned_sales)
+        db.session.execute(Purchase.__table__.insert(), owned_purchases)
+        apply_inserted_rows(SALES_ROLLUP, db.session.connection(), owned_sales)
+        apply_inserted_rows(PURCHASES_ROLLUP, db.session.connection(), owned_purchases)
+        db.session.execute(MessageRead.__table__.insert(), [
+            {'message_id': inbox[0], 'user_id': row['id'], 'read_at': now} for row in spare])
+        db.session.execute(UnreadMessageCount.__table__.insert(), [{'user_id': row['id'], 'unread': 0} for row in spare])
+        db.session.execute(TokenRevocation.__table__.insert(), [{'user_id': row['id'], 'revoked_before': now} for row in spare])
+        db.session.commit()
+
+        inventory = db.session.execute(select(Inventory.id).order_by(Inventory.id).limit(10)).scalars().all()
+        return {
+            **first,
+            'seller_email': seller.email,
+            'password': BENCH_PASSWORD,
+            'driver_ids': drivers,
+            'spare_users': [row['id'] for row in spare],
+            'spare_sales': spare_sales,
+            'spare_purchases': spare_purchases,
+            'spare_inventory': last_ids(Inventory),
+            'inventory_ids': inventory,
+            'sale_id': db.session.execute(select(func.min(Sale.id))).scalar(),
+            'purchase_id': db.session.execute(select(func.min(Purchase.id))).scalar(),
+            'seller_message_id': inbox[0],
+            'seller_message_ids': inbox,
+            'latest_profile': lambda: request_profiler.profiles()[0]['id'],
+            'finished_export': lambda: _finished_export(app),
+        }
+
+
+def _finished_export(app):
+    # Jobs don't run in the background here (JOB_WORKERS=0); run the queued ones in the foreground
+    from models import db, Job
+    from utils.jobs import run_pending
+    with app.app_context():
+        run_pending()
+        return db.session.query(Job.id).filter(Job.kind == 'export', Job.status == 'succeeded') \
+            .order_by(Job.id.desc()).limit(1).scalar()
+
+
+def _tokens(app, ids):
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    from models import db, User
+    from utils.auth_state import token_claims
+    tokens = {}
+    with app.app_context():
+        for role in ('ceo', 'seller', 'purchaser', 'storekeeper', 'driver'):
+            user = db.session.get(User, ids[role])
+            tokens[role] = {
+                'access': create_access_token(identity=user.id, additional_claims=token_claims(role=user.role.value)),
+                'refresh': create_refresh_token(identity=user.id, additional_claims=token_claims()),
+            }
+    return tokens
+
+
+def _request(client, case, iteration, tokens):
+    path, body = case.resolve(iteration)
+    headers = dict(case.headers)
+    if case.role:
+        headers['Authorization'] = 'Bearer ' + tokens[case.role][case.token]
+    response = client.open(path, method=case.method, json=body, headers=headers)
+    size = len(response.get_data())  # drains streamed exports
+    return response.status_code, size
+
+
+def run_case(client, case, tokens, counter, repeat):
+    iterations = 1 if case.destructive else min(repeat, case.repeat or repeat)
+    if not case.destructive:
+        _request(client, case, 0, tokens)  # warm-up
+
+    latencies, queries, statuses, size = [], [], set(), 0
+    for iteration in range(1, iterations + 1):
+        counter.count = 0
+        start = time.perf_counter()
+        status, size = _request(client, case, iteration, tokens)
+        latencies.append((time.perf_counter() - start) * 1000)
+        queries.append(counter.count)
+        statuses.add(status)
+
+    peak_kib = None
+    if not case.destructive:
+        # Separate pass: tracemalloc slows allocation-heavy code down noticeably
+        tracemalloc.start()
+        _request(client, case, iterations + 1, tokens)
+        peak_kib = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+
+    return {
+        'name': case.name,
+        'method': case.method,
+        'path': case.resolve(0)[0],
+        'role': case.role,
+        'iterations': iterations,
+        'status': sorted(statuses),
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p90_ms': round(_percentile(latencies, 0.9), 3),
+        'p99_ms': round(_percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'max_ms': round(max(latencies), 3),
+        'queries': round(statistics.median(queries), 1),
+        'response_bytes': size,
+        'peak_kib': peak_kib,
+    }
+
+
+def uncovered_routes(app, cases):
+    """(METHOD, rule) of API routes no case exercises."""
+    adapter = app.url_map.bind('localhost')
+    covered = set()
+    for case in cases:
+        path = case.resolve(0)[0].split('?')[0]
+        try:
+            endpoint, _ = adapter.match(path, method=case.method)
+        except Exception:
+            continue
+        covered.add((case.method, endpoint))
+    missing = []
+    for rule in app.url_map.iter_rules():
+        # Skip the SPA/404 catch-alls
+        if not rule.rule.startswith('/api/') or 'path' in (rule.defaults or {}) or '<path:' in rule.rule:
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (method, rule.endpoint) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from benchmarks.seed import plan_counts
+    counts = plan_counts(args.rows, users=args.users, sales=args.sales, purchases=args.purchases,
+                         inventory=args.inventory, stock_movements=args.stock_movements,
+                         messages=args.messages, gradients=args.gradients)
+    db_path = os.path.abspath(args.db or os.path.join(
+        os.environ.get('TMPDIR', '/tmp'), f'fruittrack-bench-{args.rows}.db'))
+    if os.path.exists(db_path) and not args.reuse:
+        os.remove(db_path)
+    seeded = not os.path.exists(db_path)
+
+    # Config reads the environment at import time
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_BACKEND'] = 'none'
+    # Queued jobs would otherwise compete with the timed requests
+    os.environ['JOB_WORKERS'] = '0'
+    # Deletes that PostgreSQL would reject fail here too instead of passing silently
+    os.environ['SQLITE_FOREIGN_KEYS'] = 'true'
+    sys.path.insert(0, BACKEND_DIR)
+    from app import app
+    from models import db
+    from benchmarks.seed import seed
+    from benchmarks.cases import build_cases
+
+    seed_seconds = None
+    if seeded:
+        start = time.perf_counter()
+        with app.app_context():
+            seed(counts, random_seed=args.seed)
+        seed_seconds = round(time.perf_counter() - start, 2)
+        print(f'Seeded {sum(counts.values())} rows in {seed_seconds}s -> {db_path}', file=sys.stderr)
+
+    ids = _fixtures(app, db)
+    client = app.test_client()
+    tokens = _tokens(app, ids)
+    cases = build_cases(ids)
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+
+    selected = [case for case in cases if not args.only or args.only in case.name]
+    if args.skip_destructive:
+        selected = [case for case in selected if not case.destructive]
+    selected.sort(key=lambda case: case.destructive)
+
+    results = []
+    for case in selected:
+        result = run_case(client, case, tokens, counter, args.repeat)
+        results.append(result)
+        print(f"{case.name:<28} {result['p50_ms']:>9.2f} ms p50 {result['p99_ms']:>9.2f} ms p99 "
+              f"{result['queries']:>6} q  {result['status']}", file=sys.stderr)
+
+    report = {
+        'commit': _git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'database': 'sqlite',
+        'rows': counts if seeded else None,
+        'seed_seconds': seed_seconds,
+        'repeat': args.repeat,
+        'response_cache': args.cache,
+        'uncovered_routes': uncovered_routes(app, cases),
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{report['commit']}-{args.rows}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f'Wrote {output}', file=sys.stderr)
+    return report
+
+
+if __name__ == '__main__':
+    main()
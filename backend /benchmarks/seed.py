@@ -0,0 +1,181 @@
+"""Synthetic data generator for benchmark databases."""
+import random
+from datetime import date, datetime, timedelta
+
+from models import (
+    db, User, UserRole, Sale, Purchase, Inventory, StockMovement, Message, Gradient, TableVersion
+)
+from utils.passwords import hash_password
+from utils.rollups import ROLLUPS, rebuild_rollup
+
+BENCH_PASSWORD = 'bench'
+FRUITS = ['apple', 'banana', 'mango', 'orange', 'pineapple', 'avocado',
+          'papaya', 'watermelon', 'passion', 'grape', 'lemon', 'tangerine']
+LOCATIONS = ['Main store', 'Cold room', 'Market stall', 'Warehouse B', 'Depot']
+UNITS = ['kg'] * 8 + ['crate', 'box']
+ROLE_SHARES = [(UserRole.SELLER, 0.4), (UserRole.PURCHASER, 0.3), (UserRole.STOREKEEPER, 0.2), (UserRole.DRIVER, 0.1)]
+HISTORY_DAYS = 730
+BATCH_SIZE = 50_000
+
+# Share of `rows` given to each table when no explicit count is passed
+DEFAULT_SHARES = {
+    'sales': 0.35,
+    'purchases': 0.25,
+    'stock_movements': 0.2,
+    'messages': 0.12,
+    'inventory': 0.05,
+    'gradients': 0.03,
+}
+
+
+def plan_counts(rows, **overrides):
+    """Row count per table for a database of roughly `rows` rows; overrides win."""
+    counts = {name: max(1, int(rows * share)) for name, share in DEFAULT_SHARES.items()}
+    counts['users'] = max(len(ROLE_SHARES) + 1, rows // 2000)
+    counts.update({name: value for name, value in overrides.items() if value is not None})
+    return counts
+
+
+def _fast_sqlite(connection):
+    # Durability is irrelevant for a throwaway benchmark database
+    connection.exec_driver_sql('PRAGMA journal_mode=OFF')
+    connection.exec_driver_sql('PRAGMA synchronous=OFF')
+    connection.exec_driver_sql('PRAGMA cache_size=-200000')
+
+
+def _insert(connection, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            connection.execute(table.insert(), batch)
+            batch = []
+    if batch:
+        connection.execute(table.insert(), batch)
+
+
+def _day(rng, today):
+    return today - timedelta(days=rng.randrange(HISTORY_DAYS))
+
+
+def _stamp(day, rng):
+    return datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+
+
+def seed(counts, random_seed=42):
+    """
+    Create the schema and fill it with `counts` rows per table using Core executemany,
+    then rebuild the derived tables (rollups, version counters). Returns the ids of
+    the first user of each role for the benchmark runner. Call inside an app context
+    on an empty database.
+    """
+    rng = random.Random(random_seed)
+    today = date.today()
+    now = datetime.utcnow()
+    db.create_all()
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        _fast_sqlite(connection)
+
+    # Users: one CEO, the rest split by role; one shared hash keeps seeding fast
+    password_hash = hash_password(BENCH_PASSWORD)
+    users, by_role = [], {UserRole.CEO: [1]}
+    users.append({'id': 1, 'email': 'bench-ceo@example.com', 'name': 'Bench CEO', 'role': UserRole.CEO.name,
+                  'password_hash': password_hash, 'salary': 0.0, 'is_paid': False, 'is_active': True, 'created_at': now})
+    next_id = 2
+    remaining = counts['users'] - 1
+    for position, (role, share) in enumerate(ROLE_SHARES):
+        if position == len(ROLE_SHARES) - 1:
+            n = remaining - (next_id - 2)  # the last role takes the rounding remainder
+        else:
+            n = int(remaining * share)
+        for _ in range(max(1, n)):
+            users.append({'id': next_id, 'email': f'bench-{role.value}-{next_id}@example.com',
+                          'name': f'Bench {role.value} {next_id}', 'role': role.name,
+                          'password_hash': password_hash, 'salary': 1000.0, 'is_paid': False,
+                          'is_active': True, 'created_at': now})
+            by_role.setdefault(role, []).append(next_id)
+            next_id += 1
+    _insert(connection, User.__table__, users)
+    sellers, purchasers = by_role[UserRole.SELLER], by_role[UserRole.PURCHASER]
+    storekeepers, everyone = by_role[UserRole.STOREKEEPER], [user['id'] for user in users]
+
+    def sales():
+        for _ in range(counts['sales']):
+            day = _day(rng, today)
+            quantity = round(rng.uniform(1, 200), 1)
+            yield {'seller_id': rng.choice(sellers), 'assignment': f'Route {rng.randrange(50)}',
+                   'fruit_type': rng.choice(FRUITS), 'quantity': quantity, 'unit': rng.choice(UNITS),
+                   'revenue': round(quantity * rng.uniform(50, 300), 2), 'sale_date': day,
+                   'created_at': _stamp(day, rng)}
+
+    def purchases():
+        for _ in range(counts['purchases']):
+            day = _day(rng, today)
+            quantity = round(rng.uniform(10, 500), 1)
+            yield {'purchaser_id': rng.choice(purchasers), 'supplier_name': f'Supplier {rng.randrange(200)}',
+                   'fruit_type': rng.choice(FRUITS), 'quantity': quantity, 'unit': rng.choice(UNITS),
+                   'cost': round(quantity * rng.uniform(30, 200), 2), 'purchase_date': day,
+                   'created_at': _stamp(day, rng)}
+
+    _insert(connection, Sale.__table__, sales())
+    _insert(connection, Purchase.__table__, purchases())
+
+    # Inventory and its ledger together, so balances and remaining_stock are consistent
+    items, movements = [], []
+    per_item = max(1, counts['stock_movements'] // counts['inventory'])
+    for item_id in range(1, counts['inventory'] + 1):
+        unit = rng.choice(UNITS)
+        added_by = rng.choice(storekeepers)
+        day = _day(rng, today)
+        balance = 0.0
+        for index in range(per_item):
+            quantity = round(rng.uniform(5, 100), 1)
+            movement_type = 'in' if index == 0 or rng.random() < 0.55 or balance < quantity else 'out'
+            balance += quantity if movement_type == 'in' else -quantity
+            movements.append({'inventory_id': item_id, 'movement_type': movement_type, 'quantity': quantity,
+                              'unit': unit, 'remaining_stock': balance, 'date': day,
+                              'notes': None, 'added_by': added_by, 'created_at': _stamp(day, rng)})
+            day = min(today, day + timedelta(days=rng.randrange(3)))
+        items.append({'id': item_id, 'name': f'{rng.choice(FRUITS).title()} lot {item_id}',
+                      'quantity': balance, 'fruit_type': rng.choice(FRUITS), 'unit': unit,
+                      'location': rng.choice(LOCATIONS),
+                      'expiry_date': today + timedelta(days=rng.randrange(-10, 60)),
+                      'added_by': added_by, 'created_at': _stamp(_day(rng, today), rng),
+                      'movement_count': per_item})
+        if len(movements) >= BATCH_SIZE:
+            _insert(connection, Inventory.__table__, items)
+            _insert(connection, StockMovement.__table__, movements)
+            items, movements = [], []
+    _insert(connection, Inventory.__table__, items)
+    _insert(connection, StockMovement.__table__, movements)
+
+    def messages():
+        roles = [role.name for role, _ in ROLE_SHARES]
+        for _ in range(counts['messages']):
+            direct = rng.random() < 0.5
+            yield {'sender_id': rng.choice(everyone), 'message': 'Benchmark message ' * rng.randrange(1, 6),
+                   'recipient_id': rng.choice(everyone) if direct else None,
+                   'recipient_role': None if direct else rng.choice(roles),
+                   'is_read': False, 'created_at': _stamp(_day(rng, today), rng)}
+
+    def gradients():
+        for _ in range(counts['gradients']):
+            day = _day(rng, today)
+            yield {'fruit_type': rng.choice(FRUITS), 'gradient_type': rng.choice(['ripening', 'wax', 'fungicide']),
+                   'application_date': day, 'notes': None, 'applied_by': rng.choice(storekeepers),
+                   'created_at': _stamp(day, rng)}
+
+    _insert(connection, Message.__table__, messages())
+    _insert(connection, Gradient.__table__, gradients())
+
+    for spec in ROLLUPS:
+        rebuild_rollup(spec)
+    _insert(connection, TableVersion.__table__, [
+        {'name': table.name, 'version': 1, 'updated_at': now}
+        for table in db.metadata.sorted_tables if table.name != 'table_version'
+    ])
+    db.session.commit()
+    # Pooled connections would keep the seeding pragmas; reconnect with the engine profile's
+    db.engine.dispose()
+    return {role.value: ids[0] for role, ids in by_role.items()}
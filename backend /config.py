@@ -8,10 +8,110 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///fruittrack.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Engine tuning applied in create_app (utils/engine.py): 'auto' picks the profile for the
+    # database URL ('sqlite': WAL and per-connection pragmas, pooled connections;
+    # 'postgresql': bounded pool, pre-ping, server-side timeouts), 'none' keeps SQLAlchemy defaults.
+    # Keys set in SQLALCHEMY_ENGINE_OPTIONS override the profile.
+    DATABASE_ENGINE_PROFILE = os.environ.get('DATABASE_ENGINE_PROFILE', 'auto')
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KIB = int(os.environ.get('SQLITE_CACHE_SIZE_KIB', 64 * 1024))
+    # SQLite ignores foreign keys unless asked; turn them on to catch writes PostgreSQL would reject
+    SQLITE_FOREIGN_KEYS = os.environ.get('SQLITE_FOREIGN_KEYS', 'false').lower() == 'true'
+
+    # Read replica: GETs of API resources read from DATABASE_REPLICA_URL (utils/replica.py), except
+    # for callers who committed a write in the last READ_YOUR_WRITES_SECONDS. Writes always go to
+    # the primary. Locally, point it at a second SQLite file and refresh it with `flask replica sync`.
+    READ_REPLICA_ENABLED = os.environ.get('READ_REPLICA_ENABLED', 'false').lower() == 'true'
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    READ_YOUR_WRITES_SECONDS = float(os.environ.get('READ_YOUR_WRITES_SECONDS', 5))
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
-    # JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Short-lived access tokens are renewed through /api/auth/refresh without a password check
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.environ.get('JWT_ACCESS_TOKEN_MINUTES', 60)))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.environ.get('JWT_REFRESH_TOKEN_DAYS', 30)))
     # JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
+    # Authorize on the signed `role` JWT claim instead of loading the user in role_required.
+    # Deactivated or re-roled accounts are still caught by a cached user map refreshed every TTL seconds;
+    # the same map holds token revocations (logout), so other workers honor them within the TTL.
+    AUTH_TRUST_ROLE_CLAIM = os.environ.get('AUTH_TRUST_ROLE_CLAIM', 'true').lower() == 'true'
+    AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 30))
+
+    # Dashboard/summary response cache shared by all workers on a host.
+    # Backend: 'sqlite', 'memory', 'none' or a dotted path to a backend class.
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'sqlite')
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')  # defaults to <instance>/response_cache.sqlite
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000))
+
+    # Batch sales/purchase uploads: max records per request, records per INSERT/transaction
+    BULK_INGEST_MAX_ROWS = int(os.environ.get('BULK_INGEST_MAX_ROWS', 5000))
+    BULK_INGEST_CHUNK_SIZE = int(os.environ.get('BULK_INGEST_CHUNK_SIZE', 500))
+
+    # Checkpoint an item's stock balance every N movements (0 disables; `flask stock checkpoint` also runs nightly)
+    STOCK_CHECKPOINT_INTERVAL = int(os.environ.get('STOCK_CHECKPOINT_INTERVAL', 100))
+
+    # /api/messages/poll: default seconds a long-poll waits, and how often each worker
+    # re-reads the message version counter (shared by all its waiting clients).
+    # Long-polls hold a worker thread, so run threaded or async workers.
+    MESSAGE_POLL_TIMEOUT = float(os.environ.get('MESSAGE_POLL_TIMEOUT', 25))
+    MESSAGE_POLL_CHECK_INTERVAL = float(os.environ.get('MESSAGE_POLL_CHECK_INTERVAL', 1.0))
+
+    # Password hashing policy: werkzeug method string including its cost, and salt length.
+    # Changing either rehashes each user's password on their next successful login.
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:260000')
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+    # Login hashing runs on a per-worker process pool (0 = inline on the request thread).
+    # Logins beyond MAX_PENDING wait up to QUEUE_TIMEOUT seconds for a slot, then get 503.
+    PASSWORD_POOL_WORKERS = int(os.environ.get('PASSWORD_POOL_WORKERS', 2))
+    PASSWORD_POOL_MAX_PENDING = int(os.environ.get('PASSWORD_POOL_MAX_PENDING', 64))
+    PASSWORD_POOL_QUEUE_TIMEOUT = float(os.environ.get('PASSWORD_POOL_QUEUE_TIMEOUT', 0.5))
+    PASSWORD_POOL_TIMEOUT = float(os.environ.get('PASSWORD_POOL_TIMEOUT', 10))
+
+    # Opt-in per-request instrumentation: query count, DB, auth and serialization time in a
+    # Server-Timing header, and statements slower than SLOW_QUERY_MS logged as JSON lines
+    # to the 'fruittrack.slow_query' logger (and to SLOW_QUERY_LOG if set).
+    SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'false').lower() == 'true'
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+    SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG')
+
+    # Prometheus metrics at /metrics, optionally behind `Authorization: Bearer <METRICS_TOKEN>`.
+    # Under multi-worker gunicorn also set PROMETHEUS_MULTIPROC_DIR to a writable directory
+    # (see gunicorn.conf.py) so every scrape sums all workers.
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+    # On-demand profiling: CEO requests carrying PROFILE_HEADER, plus a PROFILE_SAMPLE_RATE share
+    # of all requests, run under cProfile and tracemalloc. Reports go to PROFILE_DIR
+    # (default <instance>/profiles), newest PROFILE_MAX_FILES kept, listed at /api/profiles.
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'true').lower() == 'true'
+    PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+    PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0.0))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')
+    PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 50))
+    PROFILE_TOP_ENTRIES = int(os.environ.get('PROFILE_TOP_ENTRIES', 30))
+
+    # Background jobs (utils/jobs.py): clears, async exports and rollup rebuilds run on JOB_WORKERS
+    # threads per process (0: only `flask jobs run`), JOB_BATCH_SIZE rows per committed batch. A job
+    # whose worker stopped heartbeating for JOB_STALE_SECONDS is resumed by another, at most
+    # JOB_MAX_ATTEMPTS times. Finished exports are kept in EXPORT_DIR (default <instance>/exports).
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_BATCH_SIZE = int(os.environ.get('JOB_BATCH_SIZE', 1000))
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 5))
+    JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 60))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+    ROLLUP_REBUILD_DAYS = int(os.environ.get('ROLLUP_REBUILD_DAYS', 31))
+    EXPORT_DIR = os.environ.get('EXPORT_DIR')
+
+    # Archival (utils/archive.py): sales, purchases and messages dated more than ARCHIVE_AFTER_DAYS
+    # ago (rounded down to whole months) move to their *_archive tables, one job batch at a time.
+    # Run it from cron with `flask archive run` or POST {"kind": "archive"} to /api/jobs.
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+
     CORS_ORIGINS = ["http://localhost:3000"]
 
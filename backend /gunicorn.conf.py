@@ -0,0 +1,19 @@
+"""Gunicorn settings, loaded automatically when gunicorn is started from this directory."""
+import glob
+import os
+
+
+def on_starting(server):
+    # Drop metric files left by workers of a previous run
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        os.makedirs(path, exist_ok=True)
+        for stale in glob.glob(os.path.join(path, '*.db')):
+            os.remove(stale)
+
+
+def child_exit(server, worker):
+    # Stop counting an exited worker's live gauges (in-flight requests, pool usage)
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,29 @@
+"""Per-user token revocation times
+
+Revision ID: 133184dad382
+Revises: c5dfcfac5e21
+Create Date: 2026-10-18 19:10:28.905301
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '133184dad382'
+down_revision = 'c5dfcfac5e21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('token_revocation',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('revoked_before', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('token_revocation')
@@ -0,0 +1,83 @@
+"""Stock ledger: movement counter on inventory and balance checkpoints
+
+Revision ID: 25138ecf31fd
+Revises: 365276f886b8
+Create Date: 2026-10-18 19:03:48.242023
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '25138ecf31fd'
+down_revision = '365276f886b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stock_checkpoint',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventory.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('inventory_id', 'date', name='uq_stock_checkpoint_inventory_id_date')
+    )
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('movement_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Existing quantities were edited directly; record the gap between each item's
+    # quantity and its movement history as an opening movement so the ledger explains it.
+    conn = op.get_bind()
+    items = conn.execute(sa.text(
+        "SELECT i.id, i.quantity, i.unit, i.added_by, i.created_at, "
+        "COALESCE(SUM(CASE WHEN m.movement_type = 'in' THEN m.quantity ELSE -m.quantity END), 0) AS net "
+        "FROM inventory i LEFT JOIN stock_movement m ON m.inventory_id = i.id "
+        "GROUP BY i.id, i.quantity, i.unit, i.added_by, i.created_at"
+    )).fetchall()
+    movements = sa.table('stock_movement',
+        sa.column('inventory_id', sa.Integer), sa.column('movement_type', sa.String),
+        sa.column('quantity', sa.Float), sa.column('unit', sa.String),
+        sa.column('remaining_stock', sa.Float), sa.column('date', sa.Date),
+        sa.column('notes', sa.Text), sa.column('added_by', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+    )
+    opening = []
+    for item in items:
+        gap = (item.quantity or 0) - item.net
+        if not gap:
+            continue
+        created_at = item.created_at
+        if isinstance(created_at, str):
+            created_at = datetime.fromisoformat(created_at)
+        opening.append({
+            'inventory_id': item.id,
+            'movement_type': 'in' if gap > 0 else 'out',
+            'quantity': abs(gap),
+            'unit': item.unit,
+            'remaining_stock': item.quantity,
+            'date': created_at.date() if created_at else date.today(),
+            'notes': 'Opening stock',
+            'added_by': item.added_by,
+            'created_at': datetime.utcnow(),
+        })
+    if opening:
+        op.bulk_insert(movements, opening)
+
+    op.execute(
+        "UPDATE inventory SET movement_count = "
+        "(SELECT COUNT(*) FROM stock_movement WHERE stock_movement.inventory_id = inventory.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.drop_column('movement_count')
+
+    op.drop_table('stock_checkpoint')
@@ -0,0 +1,24 @@
+"""Index inventory by expiry date for the expiring-soon query
+
+Revision ID: 3418556ff0ca
+Revises: 25138ecf31fd
+Create Date: 2026-10-18 19:04:59.204908
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3418556ff0ca'
+down_revision = '25138ecf31fd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_inventory_expiry_date', 'inventory', ['expiry_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_inventory_expiry_date', table_name='inventory')
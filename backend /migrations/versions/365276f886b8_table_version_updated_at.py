@@ -0,0 +1,26 @@
+"""Track last write time per table for Last-Modified validators
+
+Revision ID: 365276f886b8
+Revises: e307da21c53d
+Create Date: 2026-10-18 14:27:53.640127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '365276f886b8'
+down_revision = 'e307da21c53d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('table_version') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('table_version') as batch_op:
+        batch_op.drop_column('updated_at')
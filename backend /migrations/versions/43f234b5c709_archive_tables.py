@@ -0,0 +1,105 @@
+"""Archive tables
+
+Revision ID: 43f234b5c709
+Revises: 720076a27185
+Create Date: 2026-10-18 19:33:15.588745
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+ROLES = ('CEO', 'STOREKEEPER', 'SELLER', 'PURCHASER', 'DRIVER')
+# Reuses the enum type created with the user table
+userrole = sa.Enum(*ROLES, name='userrole').with_variant(
+    postgresql.ENUM(*ROLES, name='userrole', create_type=False), 'postgresql')
+
+
+# revision identifiers, used by Alembic.
+revision = '43f234b5c709'
+down_revision = '720076a27185'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('archive_watermark',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('archived_before', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.create_table('message_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('recipient_role', userrole, nullable=True),
+    sa.Column('recipient_id', sa.Integer(), nullable=True),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['recipient_id'], ['user.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('message_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_message_archive_created_at', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_message_archive_period', ['period'], unique=False)
+
+    op.create_table('purchase_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('purchaser_id', sa.Integer(), nullable=False),
+    sa.Column('supplier_name', sa.String(length=100), nullable=False),
+    sa.Column('fruit_type', sa.String(length=50), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('cost', sa.Float(), nullable=False),
+    sa.Column('purchase_date', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['purchaser_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('purchase_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_purchase_archive_period', ['period'], unique=False)
+        batch_op.create_index('ix_purchase_archive_purchase_date', ['purchase_date', 'id'], unique=False)
+
+    op.create_table('sale_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('assignment', sa.String(length=100), nullable=True),
+    sa.Column('fruit_type', sa.String(length=50), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('sale_date', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('period', sa.String(length=7), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['seller_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('sale_archive', schema=None) as batch_op:
+        batch_op.create_index('ix_sale_archive_period', ['period'], unique=False)
+        batch_op.create_index('ix_sale_archive_sale_date', ['sale_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('sale_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_sale_archive_sale_date')
+        batch_op.drop_index('ix_sale_archive_period')
+
+    op.drop_table('sale_archive')
+    with op.batch_alter_table('purchase_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_purchase_archive_purchase_date')
+        batch_op.drop_index('ix_purchase_archive_period')
+
+    op.drop_table('purchase_archive')
+    with op.batch_alter_table('message_archive', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_archive_period')
+        batch_op.drop_index('ix_message_archive_created_at')
+
+    op.drop_table('message_archive')
+    op.drop_table('archive_watermark')
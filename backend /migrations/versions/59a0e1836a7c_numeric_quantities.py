@@ -0,0 +1,112 @@
+"""Numeric quantity columns normalized to a base unit
+
+Revision ID: 59a0e1836a7c
+Revises: c3ac9b3cc090
+Create Date: 2026-10-18 10:12:04.311502
+
+"""
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+from utils.units import parse_quantity
+
+
+# revision identifiers, used by Alembic.
+revision = '59a0e1836a7c'
+down_revision = 'c3ac9b3cc090'
+branch_labels = None
+depends_on = None
+
+# table -> text columns converted to Float; each is backfilled from its old value
+QUANTITY_COLUMNS = {
+    'inventory': ['quantity'],
+    'sale': ['quantity'],
+    'purchase': ['quantity'],
+    'stock_movement': ['quantity', 'remaining_stock'],
+}
+BACKFILL_BATCH = 1000
+_NUMBER_RE = re.compile(r'[-+]?\d+(?:[.,]\d+)?')
+
+
+def _parse_legacy(text, unit):
+    """Best-effort parse of a free-text quantity; unparseable values fall back to 0."""
+    if text is None or str(text).strip() == '':
+        return None, unit
+    try:
+        return parse_quantity(text, unit)
+    except ValueError:
+        match = _NUMBER_RE.search(str(text))
+        amount = float(match.group(0).replace(',', '.')) if match else 0.0
+        try:
+            return parse_quantity(amount, unit)
+        except ValueError:
+            return amount, unit
+
+
+def upgrade():
+    op.add_column('sale', sa.Column('unit', sa.String(length=20), nullable=True))
+    op.add_column('purchase', sa.Column('unit', sa.String(length=20), nullable=True))
+    for table, columns in QUANTITY_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}_num', sa.Float(), nullable=True))
+
+    bind = op.get_bind()
+    for table, columns in QUANTITY_COLUMNS.items():
+        t = sa.table(table, sa.column('id'), sa.column('unit'),
+                     *[sa.column(c) for c in columns], *[sa.column(f'{c}_num') for c in columns])
+        last_id = 0
+        while True:
+            rows = bind.execute(
+                sa.select(t).where(t.c.id > last_id).order_by(t.c.id).limit(BACKFILL_BATCH)
+            ).mappings().all()
+            if not rows:
+                break
+            for row in rows:
+                values, unit = {}, row['unit']
+                for column in columns:
+                    amount, parsed_unit = _parse_legacy(row[column], unit)
+                    values[f'{column}_num'] = amount
+                    if column == 'quantity':
+                        unit = parsed_unit
+                values['unit'] = unit or 'kg'
+                bind.execute(t.update().where(t.c.id == row['id']).values(**values))
+            last_id = rows[-1]['id']
+
+    for table, columns in QUANTITY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.drop_column(column)
+                batch_op.alter_column(f'{column}_num', new_column_name=column,
+                                      existing_type=sa.Float(), nullable=(column != 'quantity'))
+            if table in ('sale', 'purchase'):
+                batch_op.alter_column('unit', existing_type=sa.String(length=20), nullable=False)
+
+
+def downgrade():
+    for table, columns in QUANTITY_COLUMNS.items():
+        for column in columns:
+            op.add_column(table, sa.Column(f'{column}_text', sa.String(length=50), nullable=True))
+
+    bind = op.get_bind()
+    for table, columns in QUANTITY_COLUMNS.items():
+        text_columns = [f'{c}_text' for c in columns]
+        t = sa.table(table, sa.column('id'), sa.column('unit'),
+                     *[sa.column(c) for c in columns], *[sa.column(c) for c in text_columns])
+        rows = bind.execute(sa.select(t.c.id, t.c.unit, *[t.c[c] for c in columns])).mappings().all()
+        for row in rows:
+            bind.execute(t.update().where(t.c.id == row['id']).values(**{
+                f'{c}_text': (f"{row[c]:g} {row['unit']}" if row['unit'] else f"{row[c]:g}") if row[c] is not None else None
+                for c in columns
+            }))
+
+    for table, columns in QUANTITY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.drop_column(column)
+                batch_op.alter_column(f'{column}_text', new_column_name=column,
+                                      existing_type=sa.String(length=50), nullable=(column != 'quantity'))
+    for table in ('purchase', 'sale'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('unit')
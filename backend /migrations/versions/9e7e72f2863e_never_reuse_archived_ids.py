@@ -0,0 +1,51 @@
+"""Never reuse archived ids
+
+Revision ID: 9e7e72f2863e
+Revises: 43f234b5c709
+Create Date: 2026-10-18 19:53:14.947100
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e7e72f2863e'
+down_revision = '43f234b5c709'
+branch_labels = None
+depends_on = None
+
+# Source table -> the archive table holding its moved rows, ids included
+ARCHIVED_TABLES = {
+    'sale': 'sale_archive',
+    'purchase': 'purchase_archive',
+    'message': 'message_archive',
+}
+
+
+def upgrade():
+    # SQLite hands out max(id) + 1 unless the table is AUTOINCREMENT, so ids of archived
+    # rows come back once the newest hot row is gone. PostgreSQL sequences never go back.
+    bind = op.get_bind()
+    if bind.dialect.name != 'sqlite':
+        return
+    for table, archive in ARCHIVED_TABLES.items():
+        with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        # Start the sequence above every id handed out so far, hot or archived
+        last_id = bind.execute(sa.text(
+            f'SELECT max(id) FROM (SELECT id FROM "{table}" UNION ALL SELECT id FROM "{archive}")'
+        )).scalar()
+        if last_id is None:
+            continue
+        bind.execute(sa.text('DELETE FROM sqlite_sequence WHERE name = :name'), {'name': table})
+        bind.execute(sa.text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                     {'name': table, 'seq': last_id})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in ARCHIVED_TABLES:
+        with op.batch_alter_table(table, recreate='always'):
+            pass
@@ -0,0 +1,48 @@
+"""Per-user message read receipts and unread counters
+
+Revision ID: c5dfcfac5e21
+Revises: 3418556ff0ca
+Create Date: 2026-10-18 19:07:41.273569
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5dfcfac5e21'
+down_revision = '3418556ff0ca'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('unread_message_count',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('message_read',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['message.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'message_id', name='uq_message_read_user_id_message_id')
+    )
+
+    # The shared is_read flag is only unambiguous for direct messages.
+    # Unread counters are computed on first read, so none are backfilled.
+    op.execute(
+        "INSERT INTO message_read (message_id, user_id, read_at) "
+        "SELECT id, recipient_id, created_at FROM message "
+        "WHERE recipient_id IS NOT NULL AND is_read = true"
+    )
+
+
+def downgrade():
+    op.drop_table('message_read')
+    op.drop_table('unread_message_count')
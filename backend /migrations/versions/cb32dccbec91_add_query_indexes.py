@@ -0,0 +1,42 @@
+"""Add secondary indexes for list, dashboard and summary queries
+
+Revision ID: cb32dccbec91
+Revises: 59a0e1836a7c
+Create Date: 2026-10-18 11:02:47.905113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb32dccbec91'
+down_revision = '59a0e1836a7c'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns) -- kept in sync with __table_args__ on the models
+INDEXES = [
+    ('ix_sale_seller_id_sale_date', 'sale', ['seller_id', 'sale_date', 'id']),
+    ('ix_sale_sale_date', 'sale', ['sale_date', 'id']),
+    ('ix_sale_fruit_type', 'sale', ['fruit_type', 'unit']),
+    ('ix_purchase_purchaser_id_purchase_date', 'purchase', ['purchaser_id', 'purchase_date', 'id']),
+    ('ix_purchase_purchase_date', 'purchase', ['purchase_date', 'id']),
+    ('ix_purchase_fruit_type', 'purchase', ['fruit_type', 'unit']),
+    ('ix_message_recipient_id_created_at', 'message', ['recipient_id', 'created_at']),
+    ('ix_message_recipient_role_created_at', 'message', ['recipient_role', 'created_at']),
+    ('ix_inventory_created_at', 'inventory', ['created_at', 'id']),
+    ('ix_inventory_fruit_type', 'inventory', ['fruit_type']),
+    ('ix_gradient_application_date', 'gradient', ['application_date', 'id']),
+    ('ix_stock_movement_inventory_id_date', 'stock_movement', ['inventory_id', 'date', 'id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,66 @@
+"""Daily sales and purchase rollup tables
+
+Revision ID: cdae5b9b56a6
+Revises: cb32dccbec91
+Create Date: 2026-10-18 12:20:31.552870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cdae5b9b56a6'
+down_revision = 'cb32dccbec91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_sales_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('fruit_type', sa.String(length=50), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('sale_count', sa.Integer(), nullable=False),
+    sa.Column('total_revenue', sa.Float(), nullable=False),
+    sa.Column('total_quantity', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['seller_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'fruit_type', 'seller_id', 'unit', name='uq_daily_sales_rollup_key')
+    )
+    op.create_index('ix_daily_sales_rollup_seller_id_day', 'daily_sales_rollup', ['seller_id', 'day'], unique=False)
+    op.create_table('daily_purchase_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('fruit_type', sa.String(length=50), nullable=False),
+    sa.Column('purchaser_id', sa.Integer(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('purchase_count', sa.Integer(), nullable=False),
+    sa.Column('total_cost', sa.Float(), nullable=False),
+    sa.Column('total_quantity', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['purchaser_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'fruit_type', 'purchaser_id', 'unit', name='uq_daily_purchase_rollup_key')
+    )
+    op.create_index('ix_daily_purchase_rollup_purchaser_id_day', 'daily_purchase_rollup', ['purchaser_id', 'day'], unique=False)
+
+    # Backfill from existing rows (same statement as `flask rollups rebuild`)
+    op.execute(
+        "INSERT INTO daily_sales_rollup (day, fruit_type, seller_id, unit, sale_count, total_revenue, total_quantity) "
+        "SELECT sale_date, fruit_type, seller_id, unit, COUNT(*), COALESCE(SUM(revenue), 0), COALESCE(SUM(quantity), 0) "
+        "FROM sale GROUP BY sale_date, fruit_type, seller_id, unit"
+    )
+    op.execute(
+        "INSERT INTO daily_purchase_rollup (day, fruit_type, purchaser_id, unit, purchase_count, total_cost, total_quantity) "
+        "SELECT purchase_date, fruit_type, purchaser_id, unit, COUNT(*), COALESCE(SUM(cost), 0), COALESCE(SUM(quantity), 0) "
+        "FROM purchase GROUP BY purchase_date, fruit_type, purchaser_id, unit"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_daily_purchase_rollup_purchaser_id_day', table_name='daily_purchase_rollup')
+    op.drop_table('daily_purchase_rollup')
+    op.drop_index('ix_daily_sales_rollup_seller_id_day', table_name='daily_sales_rollup')
+    op.drop_table('daily_sales_rollup')
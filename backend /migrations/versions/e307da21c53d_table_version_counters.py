@@ -0,0 +1,28 @@
+"""Table version counters for response cache invalidation
+
+Revision ID: e307da21c53d
+Revises: cdae5b9b56a6
+Create Date: 2026-10-18 13:41:09.118264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e307da21c53d'
+down_revision = 'cdae5b9b56a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_version',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_version')
@@ -4,5 +4,12 @@ from .inventory import Inventory
 from .sales import Sale
 from .purchases import Purchase
 from .stock_movement import StockMovement
+from .stock_checkpoint import StockCheckpoint
 from .gradient import Gradient
-from .message import Message
\ No newline at end of file
+from .message import Message
+from .message_read import MessageRead, UnreadMessageCount
+from .rollup import DailySalesRollup, DailyPurchaseRollup
+from .table_version import TableVersion
+from .token_revocation import TokenRevocation
+from .job import Job
+from .archive import SaleArchive, PurchaseArchive, MessageArchive, ArchiveWatermark
\ No newline at end of file
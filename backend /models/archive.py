@@ -0,0 +1,94 @@
+from datetime import datetime
+from .user import db, UserRole
+from .sales import Sale
+from .purchases import Purchase
+from .message import Message
+
+
+class SaleArchive(db.Model):
+    """Sales moved out of `sale` by utils.archive; same columns and ids, plus the period they fall in."""
+    __tablename__ = 'sale_archive'
+    serialize_relationships = ('seller',)
+    __table_args__ = (
+        db.Index('ix_sale_archive_period', 'period'),
+        db.Index('ix_sale_archive_sale_date', 'sale_date', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    assignment = db.Column(db.String(100))
+    fruit_type = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    revenue = db.Column(db.Float, nullable=False)
+    sale_date = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime)
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM of sale_date
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    seller = db.relationship('User')
+
+    def to_dict(self):
+        return {**Sale.to_dict(self), 'period': self.period}
+
+
+class PurchaseArchive(db.Model):
+    """Purchases moved out of `purchase` by utils.archive."""
+    __tablename__ = 'purchase_archive'
+    serialize_relationships = ('purchaser',)
+    __table_args__ = (
+        db.Index('ix_purchase_archive_period', 'period'),
+        db.Index('ix_purchase_archive_purchase_date', 'purchase_date', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    purchaser_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    supplier_name = db.Column(db.String(100), nullable=False)
+    fruit_type = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    cost = db.Column(db.Float, nullable=False)
+    purchase_date = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime)
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM of purchase_date
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    purchaser = db.relationship('User')
+
+    def to_dict(self):
+        return {**Purchase.to_dict(self), 'period': self.period}
+
+
+class MessageArchive(db.Model):
+    """Messages moved out of `message` by utils.archive; per-user read receipts are not kept."""
+    __tablename__ = 'message_archive'
+    serialize_relationships = ('sender', 'recipient')
+    __table_args__ = (
+        db.Index('ix_message_archive_period', 'period'),
+        db.Index('ix_message_archive_created_at', 'created_at', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    recipient_role = db.Column(db.Enum(UserRole))
+    recipient_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    message = db.Column(db.Text, nullable=False)
+    is_read = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime)
+    period = db.Column(db.String(7), nullable=False)  # YYYY-MM of created_at
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    sender = db.relationship('User', foreign_keys=[sender_id])
+    recipient = db.relationship('User', foreign_keys=[recipient_id])
+
+    def to_dict(self):
+        return {**Message.to_dict(self), 'period': self.period}
+
+
+class ArchiveWatermark(db.Model):
+    """Per source table, the date before which rows have been moved to its archive table."""
+    __tablename__ = 'archive_watermark'
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    archived_before = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
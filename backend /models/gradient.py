@@ -2,6 +2,13 @@ from datetime import datetime
 from .user import db
 
 class Gradient(db.Model):
+    # Relationships read by to_dict(), eager-loaded by list endpoints
+    serialize_relationships = ('applied_by_user',)
+
+    __table_args__ = (
+        db.Index('ix_gradient_application_date', 'application_date', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     fruit_type = db.Column(db.String(50), nullable=False)
     gradient_type = db.Column(db.String(50), nullable=False)
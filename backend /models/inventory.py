@@ -3,18 +3,26 @@ from .user import db # <-- CORRECTED LINE
 
 
 class Inventory(db.Model):
+    __table_args__ = (
+        db.Index('ix_inventory_created_at', 'created_at', 'id'),
+        db.Index('ix_inventory_fruit_type', 'fruit_type'),
+        db.Index('ix_inventory_expiry_date', 'expiry_date', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    quantity = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # current balance in `unit`, maintained by utils.stock
     fruit_type = db.Column(db.String(50), nullable=False)
     unit = db.Column(db.String(20))
     location = db.Column(db.String(100))
     expiry_date = db.Column(db.Date)
     added_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    movement_count = db.Column(db.Integer, nullable=False, default=0)
 
     # Relationships
     stock_movements = db.relationship('StockMovement', backref='inventory_item', lazy=True, cascade="all, delete-orphan")
+    stock_checkpoints = db.relationship('StockCheckpoint', lazy=True, cascade="all, delete-orphan")
 
     def to_dict(self):
         return {
@@ -0,0 +1,53 @@
+from datetime import datetime
+from .user import db
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+class Job(db.Model):
+    """
+    A background operation run in batches by utils.jobs. `state` is the resume
+    point, committed together with each batch, so a job picked up again after a
+    worker restart continues where it stopped.
+    """
+    __tablename__ = 'job'
+    __table_args__ = (
+        db.Index('ix_job_status_id', 'status', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    params = db.Column(db.JSON)
+    state = db.Column(db.JSON)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Integer)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    claimed_by = db.Column(db.String(100))
+    heartbeat_at = db.Column(db.DateTime)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'params': self.params or {},
+            'progress': self.progress,
+            'total': self.total,
+            'percent': round(100 * self.progress / self.total, 1) if self.total else None,
+            'result': self.result,
+            'error': self.error,
+            'attempts': self.attempts,
+            'created_by': self.created_by,
+            'created_at': _iso(self.created_at),
+            'started_at': _iso(self.started_at),
+            'finished_at': _iso(self.finished_at),
+        }
@@ -2,12 +2,22 @@ from datetime import datetime
 from .user import db, UserRole
 
 class Message(db.Model):
+    # Relationships read by to_dict(), eager-loaded by list endpoints
+    serialize_relationships = ('sender', 'recipient')
+
+    __table_args__ = (
+        db.Index('ix_message_recipient_id_created_at', 'recipient_id', 'created_at'),
+        db.Index('ix_message_recipient_role_created_at', 'recipient_role', 'created_at'),
+        # Ids are never reused: archived rows keep theirs (utils.archive)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     recipient_role = db.Column(db.Enum(UserRole))
     recipient_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True) # Optional for specific user
     message = db.Column(db.Text, nullable=False)
-    is_read = db.Column(db.Boolean, default=False)
+    is_read = db.Column(db.Boolean, default=False)  # legacy shared flag; read state is per user in message_read
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
@@ -0,0 +1,23 @@
+from datetime import datetime
+from .user import db
+
+
+class MessageRead(db.Model):
+    """One row per (message, user) the user has read; role broadcasts are read per recipient."""
+    __tablename__ = 'message_read'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'message_id', name='uq_message_read_user_id_message_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    message_id = db.Column(db.Integer, db.ForeignKey('message.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    read_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class UnreadMessageCount(db.Model):
+    """Unread messages per user; maintained by utils.inbox, recounted when missing."""
+    __tablename__ = 'unread_message_count'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
@@ -2,11 +2,23 @@ from datetime import datetime
 from .user import db
 
 class Purchase(db.Model):
+    # Relationships read by to_dict(), eager-loaded by list endpoints
+    serialize_relationships = ('purchaser',)
+
+    __table_args__ = (
+        db.Index('ix_purchase_purchaser_id_purchase_date', 'purchaser_id', 'purchase_date', 'id'),
+        db.Index('ix_purchase_purchase_date', 'purchase_date', 'id'),
+        db.Index('ix_purchase_fruit_type', 'fruit_type', 'unit'),
+        # Ids are never reused: archived rows keep theirs (utils.archive)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     purchaser_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     supplier_name = db.Column(db.String(100), nullable=False)
     fruit_type = db.Column(db.String(50), nullable=False)
-    quantity = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # in `unit`, normalized by utils.units
+    unit = db.Column(db.String(20), nullable=False, default='kg')
     cost = db.Column(db.Float, nullable=False)
     purchase_date = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -19,6 +31,7 @@ class Purchase(db.Model):
             'supplier_name': self.supplier_name,
             'fruit_type': self.fruit_type,
             'quantity': self.quantity,
+            'unit': self.unit,
             'cost': self.cost,
             'purchase_date': self.purchase_date.isoformat(),
             'created_at': self.created_at.isoformat()
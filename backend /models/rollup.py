@@ -0,0 +1,37 @@
+from .user import db
+
+
+class DailySalesRollup(db.Model):
+    """Sales aggregated per day x fruit_type x seller x unit; maintained by utils.rollups."""
+    __tablename__ = 'daily_sales_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'fruit_type', 'seller_id', 'unit', name='uq_daily_sales_rollup_key'),
+        db.Index('ix_daily_sales_rollup_seller_id_day', 'seller_id', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    fruit_type = db.Column(db.String(50), nullable=False)
+    seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    sale_count = db.Column(db.Integer, nullable=False, default=0)
+    total_revenue = db.Column(db.Float, nullable=False, default=0.0)
+    total_quantity = db.Column(db.Float, nullable=False, default=0.0)
+
+
+class DailyPurchaseRollup(db.Model):
+    """Purchases aggregated per day x fruit_type x purchaser x unit; maintained by utils.rollups."""
+    __tablename__ = 'daily_purchase_rollup'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'fruit_type', 'purchaser_id', 'unit', name='uq_daily_purchase_rollup_key'),
+        db.Index('ix_daily_purchase_rollup_purchaser_id_day', 'purchaser_id', 'day'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    fruit_type = db.Column(db.String(50), nullable=False)
+    purchaser_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    unit = db.Column(db.String(20), nullable=False)
+    purchase_count = db.Column(db.Integer, nullable=False, default=0)
+    total_cost = db.Column(db.Float, nullable=False, default=0.0)
+    total_quantity = db.Column(db.Float, nullable=False, default=0.0)
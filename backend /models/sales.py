@@ -2,11 +2,23 @@ from datetime import datetime
 from .user import db # <-- CORRECTED LINE
 
 class Sale(db.Model):
+    # Relationships read by to_dict(), eager-loaded by list endpoints
+    serialize_relationships = ('seller',)
+
+    __table_args__ = (
+        db.Index('ix_sale_seller_id_sale_date', 'seller_id', 'sale_date', 'id'),
+        db.Index('ix_sale_sale_date', 'sale_date', 'id'),
+        db.Index('ix_sale_fruit_type', 'fruit_type', 'unit'),
+        # Ids are never reused: archived rows keep theirs (utils.archive)
+        {'sqlite_autoincrement': True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     assignment = db.Column(db.String(100))
     fruit_type = db.Column(db.String(50), nullable=False)
-    quantity = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # in `unit`, normalized by utils.units
+    unit = db.Column(db.String(20), nullable=False, default='kg')
     revenue = db.Column(db.Float, nullable=False)
     sale_date = db.Column(db.Date, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -19,6 +31,7 @@ class Sale(db.Model):
             'assignment': self.assignment,
             'fruit_type': self.fruit_type,
             'quantity': self.quantity,
+            'unit': self.unit,
             'revenue': self.revenue,
             'sale_date': self.sale_date.isoformat(),
             'created_at': self.created_at.isoformat()
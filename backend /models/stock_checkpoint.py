@@ -0,0 +1,25 @@
+from datetime import datetime
+from .user import db
+
+
+class StockCheckpoint(db.Model):
+    """Balance of an inventory item at the end of `date`, so as-of lookups replay only later movements."""
+    __tablename__ = 'stock_checkpoint'
+    __table_args__ = (
+        db.UniqueConstraint('inventory_id', 'date', name='uq_stock_checkpoint_inventory_id_date'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    balance = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'inventory_id': self.inventory_id,
+            'date': self.date.isoformat(),
+            'balance': self.balance,
+            'created_at': self.created_at.isoformat()
+        }
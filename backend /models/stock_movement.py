@@ -2,12 +2,19 @@ from datetime import datetime
 from .user import db
 
 class StockMovement(db.Model):
+    # Relationships read by to_dict(), eager-loaded by list endpoints
+    serialize_relationships = ('inventory_item',)
+
+    __table_args__ = (
+        db.Index('ix_stock_movement_inventory_id_date', 'inventory_id', 'date', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False)
     movement_type = db.Column(db.String(10), nullable=False)  # 'in' or 'out'
-    quantity = db.Column(db.String(50), nullable=False)
+    quantity = db.Column(db.Float, nullable=False)  # in `unit`, normalized by utils.units
     unit = db.Column(db.String(20))
-    remaining_stock = db.Column(db.String(50))
+    remaining_stock = db.Column(db.Float)  # item balance right after this movement was recorded
     date = db.Column(db.Date, nullable=False)
     notes = db.Column(db.Text)
     added_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -0,0 +1,11 @@
+from datetime import datetime
+from .user import db
+
+
+class TableVersion(db.Model):
+    """Per-table write counter, bumped inside every transaction that changes the table."""
+    __tablename__ = 'table_version'
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,9 @@
+from .user import db
+
+
+class TokenRevocation(db.Model):
+    """One row per user: every token of theirs issued at or before `revoked_before` is rejected."""
+    __tablename__ = 'token_revocation'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    revoked_before = db.Column(db.DateTime, nullable=False)
@@ -1,15 +1,16 @@
 from flask import Blueprint, jsonify
 from flask_restful import Api
+from flask_restful.representations.json import output_json
 
 # Import all resource classes
-from .auth import LoginResource, MeResource
+from .auth import LoginResource, MeResource, RefreshResource, LogoutResource
 from .user import UserListResource, UserResource, UserSalaryResource, UserPaymentResource
-from .inventory import InventoryListResource, InventoryResource, ClearInventoryResource
-from .sales import SalesListResource, SalesResource, ClearSalesResource, SalesSummaryResource
-from .purchases import PurchaseListResource, PurchaseResource, ClearPurchasesResource, PurchaseSummaryResource
-from .stock import StockMovementListResource, ClearStockMovementsResource
+from .inventory import InventoryListResource, InventoryResource, ClearInventoryResource, InventoryExportResource, InventoryExpiringResource
+from .sales import SalesListResource, SalesResource, ClearSalesResource, SalesSummaryResource, SalesExportResource, SalesBatchResource, SalesArchiveResource
+from .purchases import PurchaseListResource, PurchaseResource, ClearPurchasesResource, PurchaseSummaryResource, PurchaseExportResource, PurchaseBatchResource, PurchaseArchiveResource
+from .stock import StockMovementListResource, ClearStockMovementsResource, StockMovementExportResource, InventoryStockResource
 from .gradients import GradientListResource, ClearGradientsResource
-from .messages import MessageListResource, MessageResource, ClearMessagesResource
+from .messages import MessageListResource, MessageResource, ClearMessagesResource, MessagePollResource, MessageReadResource, UnreadMessageCountResource, MessageArchiveResource
 from .dashboard import (
     CEODashboardResource,
     SellerDashboardResource,
@@ -18,14 +19,20 @@ from .dashboard import (
 )
 from .expenses import OtherExpensesResource, CarExpensesResource
 from .salaries import SalariesResource, SalaryPaymentsResource
+from .profiles import ProfileListResource, ProfileResource
+from .jobs import JobListResource, JobResource, JobDownloadResource
+from utils.instrumentation import timed_representation
 
 # Create blueprint & API
 api_bp = Blueprint('api', __name__)
 api = Api(api_bp)
+api.representations['application/json'] = timed_representation(output_json)
 
 # ----------- AUTHENTICATION ROUTES -----------
 api.add_resource(LoginResource, '/auth/login')
 api.add_resource(MeResource, '/auth/me')
+api.add_resource(RefreshResource, '/auth/refresh')
+api.add_resource(LogoutResource, '/auth/logout')
 
 # ----------- USER MANAGEMENT -----------
 api.add_resource(UserListResource, '/users')
@@ -37,10 +44,14 @@ api.add_resource(UserPaymentResource, '/users/<int:user_id>/payment')
 api.add_resource(InventoryListResource, '/inventory')
 api.add_resource(InventoryResource, '/inventory/<int:inv_id>')
 api.add_resource(ClearInventoryResource, '/inventory/clear')
+api.add_resource(InventoryExportResource, '/inventory/export')
+api.add_resource(InventoryExpiringResource, '/inventory/expiring')
 
 # ----------- STOCK MOVEMENTS -----------
 api.add_resource(StockMovementListResource, '/stock-movements')
 api.add_resource(ClearStockMovementsResource, '/stock-movements/clear')
+api.add_resource(StockMovementExportResource, '/stock-movements/export')
+api.add_resource(InventoryStockResource, '/inventory/<int:inv_id>/stock')
 
 # ----------- EXPENSES -----------
 api.add_resource(OtherExpensesResource, '/expenses/other')
@@ -55,12 +66,18 @@ api.add_resource(SalesListResource, '/sales')
 api.add_resource(SalesResource, '/sales/<int:sale_id>')
 api.add_resource(ClearSalesResource, '/sales/clear')
 api.add_resource(SalesSummaryResource, '/sales/summary')
+api.add_resource(SalesExportResource, '/sales/export')
+api.add_resource(SalesBatchResource, '/sales/batch')
+api.add_resource(SalesArchiveResource, '/sales/archive')
 
 # ----------- PURCHASES -----------
 api.add_resource(PurchaseListResource, '/purchases')
 api.add_resource(PurchaseResource, '/purchases/<int:purchase_id>')
 api.add_resource(ClearPurchasesResource, '/purchases/clear')
 api.add_resource(PurchaseSummaryResource, '/purchases/summary')
+api.add_resource(PurchaseExportResource, '/purchases/export')
+api.add_resource(PurchaseBatchResource, '/purchases/batch')
+api.add_resource(PurchaseArchiveResource, '/purchases/archive')
 
 # ----------- GRADIENTS -----------
 api.add_resource(GradientListResource, '/gradients')
@@ -70,6 +87,10 @@ api.add_resource(ClearGradientsResource, '/gradients/clear')
 api.add_resource(MessageListResource, '/messages')
 api.add_resource(MessageResource, '/messages/<int:message_id>')
 api.add_resource(ClearMessagesResource, '/messages/clear')
+api.add_resource(MessagePollResource, '/messages/poll')
+api.add_resource(MessageReadResource, '/messages/read')
+api.add_resource(UnreadMessageCountResource, '/messages/unread-count')
+api.add_resource(MessageArchiveResource, '/messages/archive')
 
 # ----------- DASHBOARDS -----------
 api.add_resource(CEODashboardResource, '/ceo/dashboard')
@@ -77,6 +98,15 @@ api.add_resource(SellerDashboardResource, '/seller/dashboard')
 api.add_resource(PurchaserDashboardResource, '/purchaser/dashboard')
 api.add_resource(StorekeeperDashboardResource, '/storekeeper/dashboard')
 
+# ----------- PROFILING -----------
+api.add_resource(ProfileListResource, '/profiles')
+api.add_resource(ProfileResource, '/profiles/<string:profile_id>')
+
+# ----------- BACKGROUND JOBS -----------
+api.add_resource(JobListResource, '/jobs')
+api.add_resource(JobResource, '/jobs/<int:job_id>')
+api.add_resource(JobDownloadResource, '/jobs/<int:job_id>/download')
+
 # ----------- CATCH-ALL (MUST BE LAST) -----------
 @api_bp.route('/', defaults={'path': ''})
 @api_bp.route('/<path:path>')
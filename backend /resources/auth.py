@@ -3,9 +3,13 @@ from flask_jwt_extended import (
     create_access_token, create_refresh_token,
     jwt_required, get_jwt_identity
 )
+from datetime import datetime
 from flask import current_app
-from models.user import User
+from models import db, User, TokenRevocation
+from utils.auth_state import active_users, token_claims
+from utils.sql import upsert_increment
 from utils.helpers import make_response_data, get_current_user
+from utils.passwords import PasswordPoolBusy, needs_rehash, rehash_password, verify_password
 
 from flask import make_response
 from datetime import timedelta
@@ -19,14 +23,48 @@ class LoginResource(Resource):
         data = parser.parse_args()
 
         user = User.query.filter_by(email=data['email']).first()
-        if user and user.check_password(data['password']):
-            access_token = create_access_token(identity=user.id, additional_claims={"role": user.role.value})
+        try:
+            valid = user is not None and verify_password(user.password_hash, data['password'])
+        except PasswordPoolBusy as e:
+            return make_response_data(success=False, message=str(e), status_code=503)
+
+        if valid and user.is_active is False:
+            return make_response_data(success=False, message="This account has been deactivated.", status_code=403)
+        if valid:
+            if needs_rehash(user.password_hash):
+                # Hashing policy changed since this password was set; upgrade it transparently
+                try:
+                    user.password_hash = rehash_password(data['password'])
+                    db.session.commit()
+                except PasswordPoolBusy:
+                    pass  # retried on the next login
+            access_token = create_access_token(identity=user.id, additional_claims=token_claims(role=user.role.value))
             return make_response_data(data={
                 'access_token': access_token,
+                'refresh_token': create_refresh_token(identity=user.id, additional_claims=token_claims()),
                 'user': user.to_dict()
             }, message="Login successful")
         return make_response_data(success=False, message="Invalid credentials", status_code=401)
 
+class RefreshResource(Resource):
+    @jwt_required(refresh=True)
+    def post(self):
+        # Deactivated users and revoked tokens were already rejected by the blocklist check.
+        # The role comes from the same cache, so role changes reach the new access token.
+        user_id = get_jwt_identity()
+        access_token = create_access_token(identity=user_id, additional_claims=token_claims(role=active_users.role_of(user_id)))
+        return make_response_data(data={'access_token': access_token}, message="Token refreshed")
+
+class LogoutResource(Resource):
+    @jwt_required(verify_type=False)
+    def post(self):
+        """Revoke every access and refresh token issued to the caller so far."""
+        upsert_increment(db.session.connection(), TokenRevocation.__table__,
+                         {'user_id': get_jwt_identity()}, {}, assign={'revoked_before': datetime.utcnow()})
+        db.session.commit()
+        active_users.invalidate()
+        return make_response_data(message="Logged out")
+
 class MeResource(Resource):
     @jwt_required()
     def get(self):
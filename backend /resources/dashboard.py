@@ -1,50 +1,50 @@
 from flask_restful import Resource
 from sqlalchemy import func
-from models import db, User, Inventory, Sale, Purchase, UserRole
+from models import db, User, Inventory, Sale, Purchase, UserRole, DailySalesRollup, DailyPurchaseRollup
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.cache import response_cache
+from utils.analytics import AnalyticsError, parse_range, range_totals, bucketed_totals, bucketed_fruit_totals
 
 
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from flask import Blueprint, jsonify
+from flask import Blueprint, request
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
+def _analytics_response(build, message):
+    try:
+        start, end, bucket = parse_range(request.args)
+    except AnalyticsError as e:
+        return make_response_data(success=False, message=str(e), status_code=400)
+    data = build(start, end, bucket)
+    meta = {'from': start.isoformat(), 'to': end.isoformat(), 'bucket': bucket}
+    return make_response_data(data=data, message=message, meta=meta)
+
 @dashboard_bp.route('/api/stats')
+@role_required('ceo')
+@response_cache.cached(tables=('user', 'sale', 'purchase'))
 def stats():
-    # Replace with real stats logic
-    return jsonify({
-        "users": 10,
-        "sales": 100,
-        "revenue": 5000
-    })
+    return _analytics_response(lambda start, end, bucket: range_totals(start, end, with_users=True), "Stats fetched.")
 
 @dashboard_bp.route('/api/performance/stats')
+@role_required('ceo')
+@response_cache.cached(tables=('sale', 'purchase'))
 def performance_stats():
-    # Replace with real performance stats logic
-    return jsonify({
-        "month": "June",
-        "total_sales": 120,
-        "total_revenue": 6000
-    })
+    return _analytics_response(lambda start, end, bucket: range_totals(start, end), "Performance stats fetched.")
 
 @dashboard_bp.route('/api/performance/fruit')
+@role_required('ceo')
+@response_cache.cached(tables=('sale', 'purchase'))
 def performance_fruit():
-    # Replace with real fruit performance logic
-    return jsonify({
-        "apples": 50,
-        "bananas": 30,
-        "oranges": 40
-    })
+    return _analytics_response(bucketed_fruit_totals, "Fruit performance fetched.")
 
 @dashboard_bp.route('/api/performance/monthly')
+@role_required('ceo')
+@response_cache.cached(tables=('sale', 'purchase'))
 def performance_monthly():
-    # Replace with real monthly performance logic
-    return jsonify([
-        {"month": "April", "sales": 80, "revenue": 4000},
-        {"month": "May", "sales": 100, "revenue": 5000},
-        {"month": "June", "sales": 120, "revenue": 6000}
-    ])
+    # Named for its default bucket; `bucket=day|week` is also accepted
+    return _analytics_response(bucketed_totals, "Performance over time fetched.")
 
 # class DashboardResource(Resource):
 #     @jwt_required()
@@ -101,11 +101,12 @@ class DashboardResource(Resource):
 
 class CEODashboardResource(Resource):
     @role_required('ceo')
+    @response_cache.cached(tables=('user', 'inventory', 'sale', 'purchase'))
     def get(self):
         total_users = User.query.count()
         total_inventory_items = Inventory.query.count()
-        total_revenue = db.session.query(func.sum(Sale.revenue)).scalar() or 0
-        total_cost = db.session.query(func.sum(Purchase.cost)).scalar() or 0
+        total_revenue = db.session.query(func.sum(DailySalesRollup.total_revenue)).scalar() or 0
+        total_cost = db.session.query(func.sum(DailyPurchaseRollup.total_cost)).scalar() or 0
         
         data = {
             "total_users": total_users,
@@ -118,10 +119,13 @@ class CEODashboardResource(Resource):
 
 class SellerDashboardResource(Resource):
     @role_required('seller')
+    @response_cache.cached(tables=('sale',), per_user=True)
     def get(self):
         current_user = get_current_user()
-        total_sales = Sale.query.filter_by(seller_id=current_user.id).count()
-        total_revenue = db.session.query(func.sum(Sale.revenue)).filter(Sale.seller_id == current_user.id).scalar() or 0
+        total_sales, total_revenue = db.session.query(
+            func.sum(DailySalesRollup.sale_count), func.sum(DailySalesRollup.total_revenue)
+        ).filter(DailySalesRollup.seller_id == current_user.id).one()
+        total_sales, total_revenue = total_sales or 0, total_revenue or 0
 
         data = {
             "my_total_sales_records": total_sales,
@@ -131,10 +135,13 @@ class SellerDashboardResource(Resource):
 
 class PurchaserDashboardResource(Resource):
     @role_required('purchaser')
+    @response_cache.cached(tables=('purchase',), per_user=True)
     def get(self):
         current_user = get_current_user()
-        total_purchases = Purchase.query.filter_by(purchaser_id=current_user.id).count()
-        total_cost = db.session.query(func.sum(Purchase.cost)).filter(Purchase.purchaser_id == current_user.id).scalar() or 0
+        total_purchases, total_cost = db.session.query(
+            func.sum(DailyPurchaseRollup.purchase_count), func.sum(DailyPurchaseRollup.total_cost)
+        ).filter(DailyPurchaseRollup.purchaser_id == current_user.id).one()
+        total_purchases, total_cost = total_purchases or 0, total_cost or 0
 
         data = {
             "my_total_purchases": total_purchases,
@@ -144,6 +151,7 @@ class PurchaserDashboardResource(Resource):
 
 class StorekeeperDashboardResource(Resource):
     @role_required('storekeeper')
+    @response_cache.cached(tables=('inventory',))
     def get(self):
         total_inventory_items = Inventory.query.count()
         
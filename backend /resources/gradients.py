@@ -3,6 +3,9 @@ from datetime import datetime
 from models import db, Gradient
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.cache import bump_versions
+from utils.serialization import eager_query, serialize_all
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError
 
 parser = reqparse.RequestParser()
 parser.add_argument('fruit_type', type=str, required=True)
@@ -10,11 +13,28 @@ parser.add_argument('gradient_type', type=str, required=True)
 parser.add_argument('application_date', type=str, required=True)
 parser.add_argument('notes', type=str)
 
+list_args = list_parser(('fruit_type', str), ('gradient_type', str), ('applied_by', int))
+
 class GradientListResource(Resource):
     @role_required('ceo', 'storekeeper')
     def get(self):
-        gradients = Gradient.query.order_by(Gradient.application_date.desc()).all()
-        return make_response_data(data=[g.to_dict() for g in gradients], message="Gradients fetched.")
+        args = list_args.parse_args()
+
+        query = eager_query(Gradient)
+        if args['fruit_type']:
+            query = query.filter(Gradient.fruit_type == args['fruit_type'])
+        if args['gradient_type']:
+            query = query.filter(Gradient.gradient_type == args['gradient_type'])
+        if args['applied_by']:
+            query = query.filter(Gradient.applied_by == args['applied_by'])
+
+        try:
+            query = apply_date_range(query, Gradient.application_date, args['date_from'], args['date_to'])
+            gradients, meta = keyset_paginate(query, Gradient.application_date, Gradient.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(gradients), message="Gradients fetched.", meta=meta)
 
     @role_required('storekeeper')
     def post(self):
@@ -41,5 +61,6 @@ class ClearGradientsResource(Resource):
     @role_required('ceo')
     def delete(self):
         num_deleted = Gradient.query.delete()
+        bump_versions('gradient')
         db.session.commit()
         return make_response_data(message=f"Successfully cleared {num_deleted} gradient records.")
\ No newline at end of file
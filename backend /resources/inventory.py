@@ -1,8 +1,17 @@
-from flask_restful import Resource, reqparse
-from datetime import datetime
-from models import db, Inventory, StockMovement
+from flask_restful import Resource, reqparse, inputs
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from models import db, Inventory
+from flask_jwt_extended import get_jwt_identity
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.units import parse_quantity
+from utils.stock import StockError, record_movement
+from utils.serialization import eager_query, serialize_all
+from utils.conditional import conditional_get
+from utils.export import export_parser, stream_export, register_export, export_query, export_job
+from utils.jobs import enqueue_job, job_accepted
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError
 
 parser = reqparse.RequestParser()
 parser.add_argument('name', type=str, required=True)
@@ -12,11 +21,49 @@ parser.add_argument('unit', type=str)
 parser.add_argument('location', type=str)
 parser.add_argument('expiry_date', type=str)
 
+list_args = list_parser(('fruit_type', str), ('location', str), ('added_by', int))
+export_args = export_parser(('fruit_type', str), ('location', str), ('added_by', int))
+
+def _export_query(args):
+    query = eager_query(Inventory)
+    if args['fruit_type']:
+        query = query.filter(Inventory.fruit_type == args['fruit_type'])
+    if args['location']:
+        query = query.filter(Inventory.location == args['location'])
+    if args['added_by']:
+        query = query.filter(Inventory.added_by == args['added_by'])
+    return apply_date_range(query, Inventory.created_at, args['date_from'], args['date_to'])
+
+register_export('inventory', _export_query, Inventory.created_at, Inventory.id)
+
+MAX_EXPIRY_DAYS = 365
+expiring_args = reqparse.RequestParser()
+expiring_args.add_argument('days', type=int, location='args', default=7)
+expiring_args.add_argument('include_expired', type=inputs.boolean, location='args', default=False)
+expiring_args.add_argument('fruit_type', type=str, location='args')
+expiring_args.add_argument('location', type=str, location='args')
+
 class InventoryListResource(Resource):
     @role_required('ceo', 'storekeeper')
+    @conditional_get(tables=('inventory',))
     def get(self):
-        inventory = Inventory.query.order_by(Inventory.created_at.desc()).all()
-        return make_response_data(data=[item.to_dict() for item in inventory], message="Inventory fetched.")
+        args = list_args.parse_args()
+
+        query = eager_query(Inventory)
+        if args['fruit_type']:
+            query = query.filter(Inventory.fruit_type == args['fruit_type'])
+        if args['location']:
+            query = query.filter(Inventory.location == args['location'])
+        if args['added_by']:
+            query = query.filter(Inventory.added_by == args['added_by'])
+
+        try:
+            query = apply_date_range(query, Inventory.created_at, args['date_from'], args['date_to'])
+            inventory, meta = keyset_paginate(query, Inventory.created_at, Inventory.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(inventory), message="Inventory fetched.", meta=meta)
 
     @role_required('storekeeper')
     def post(self):
@@ -29,17 +76,25 @@ class InventoryListResource(Resource):
                 expiry_date = datetime.strptime(data['expiry_date'], '%Y-%m-%d').date()
             except ValueError:
                 return make_response_data(success=False, message="Invalid date format for expiry_date. Use YYYY-MM-DD.", status_code=400)
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit'))
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
 
         new_item = Inventory(
             name=data['name'],
-            quantity=data['quantity'],
+            quantity=0,
             fruit_type=data['fruit_type'],
-            unit=data['unit'],
+            unit=unit,
             location=data['location'],
             expiry_date=expiry_date,
             added_by=current_user.id
         )
         db.session.add(new_item)
+        db.session.flush()
+        if quantity > 0:
+            # Initial stock enters through the ledger like any other movement
+            record_movement(new_item, 'in', quantity, date.today(), current_user.id, 'Opening stock')
         db.session.commit()
         return make_response_data(data=new_item.to_dict(), message="Inventory item added.", status_code=201)
 
@@ -48,11 +103,27 @@ class InventoryResource(Resource):
     def put(self, inv_id):
         item = Inventory.query.get_or_404(inv_id)
         data = parser.parse_args()
-        
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit') or item.unit)
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        if unit != item.unit and item.movement_count:
+            return make_response_data(success=False, message="The unit of an item with stock movements cannot be changed.", status_code=400)
+
+        # Quantity edits are stock corrections, recorded as movements so the ledger keeps explaining the balance
+        difference = quantity - item.quantity
+        if difference:
+            try:
+                record_movement(item, 'in' if difference > 0 else 'out', abs(difference), date.today(),
+                                get_current_user().id, 'Stock correction')
+            except StockError as e:
+                db.session.rollback()
+                return make_response_data(success=False, message=str(e), status_code=400)
+
         item.name = data['name']
-        item.quantity = data['quantity']
         item.fruit_type = data['fruit_type']
-        item.unit = data.get('unit', item.unit)
+        item.unit = unit
         item.location = data.get('location', item.location)
         if data.get('expiry_date'):
             item.expiry_date = datetime.strptime(data['expiry_date'], '%Y-%m-%d').date()
@@ -67,15 +138,72 @@ class InventoryResource(Resource):
         db.session.commit()
         return make_response_data(message="Inventory item deleted.")
 
+class InventoryExpiringResource(Resource):
+    @role_required('ceo', 'storekeeper')
+    @conditional_get(tables=('inventory',), daily=True)
+    def get(self):
+        args = expiring_args.parse_args()
+        if not 0 <= args['days'] <= MAX_EXPIRY_DAYS:
+            return make_response_data(success=False, message=f"days must be between 0 and {MAX_EXPIRY_DAYS}.", status_code=400)
+        today = date.today()
+        horizon = today + timedelta(days=args['days'])
+
+        # Range scan on ix_inventory_expiry_date, already in first-expired-first-out order
+        query = select(
+            Inventory.id, Inventory.name, Inventory.quantity, Inventory.unit,
+            Inventory.fruit_type, Inventory.location, Inventory.expiry_date,
+        ).where(
+            Inventory.expiry_date <= horizon,
+            Inventory.quantity > 0,
+        ).order_by(Inventory.expiry_date, Inventory.id)
+        if not args['include_expired']:
+            query = query.where(Inventory.expiry_date >= today)
+        if args['fruit_type']:
+            query = query.where(Inventory.fruit_type == args['fruit_type'])
+        if args['location']:
+            query = query.where(Inventory.location == args['location'])
+
+        # Groups come out ordered by their earliest expiry, items within a group FEFO
+        groups = {}
+        for row in db.session.execute(query):
+            group = groups.get((row.fruit_type, row.location))
+            if group is None:
+                group = groups[(row.fruit_type, row.location)] = {
+                    'fruit_type': row.fruit_type,
+                    'location': row.location,
+                    'earliest_expiry': row.expiry_date.isoformat(),
+                    'total_quantity': {},
+                    'items': [],
+                }
+            group['total_quantity'][row.unit] = group['total_quantity'].get(row.unit, 0) + row.quantity
+            group['items'].append({
+                'id': row.id,
+                'name': row.name,
+                'quantity': row.quantity,
+                'unit': row.unit,
+                'expiry_date': row.expiry_date.isoformat(),
+                'days_left': (row.expiry_date - today).days,
+            })
+
+        return make_response_data(data=list(groups.values()), message="Expiring inventory fetched.",
+                                  meta={'as_of': today.isoformat(), 'horizon': horizon.isoformat()})
+
+class InventoryExportResource(Resource):
+    @role_required('ceo', 'storekeeper')
+    def get(self):
+        args = export_args.parse_args()
+        try:
+            query = export_query('inventory', args)
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        if args['async']:
+            return export_job('inventory', args)
+        return stream_export(query, args['format'], 'inventory')
+
 class ClearInventoryResource(Resource):
     @role_required('ceo')
     def delete(self):
-        try:
-            # Must delete movements first due to foreign key constraints
-            StockMovement.query.delete()
-            num_deleted = Inventory.query.delete()
-            db.session.commit()
-            return make_response_data(message=f"Successfully cleared {num_deleted} inventory items and their movements.")
-        except Exception as e:
-            db.session.rollback()
-            return make_response_data(success=False, message="Failed to clear inventory.", errors=[str(e)], status_code=500)
\ No newline at end of file
+        # Batched in the background, each item together with its movements and checkpoints
+        job = enqueue_job('clear_inventory', user_id=int(get_jwt_identity()))
+        return job_accepted(job, "Clearing inventory items and their movements.")
\ No newline at end of file
@@ -0,0 +1,82 @@
+from flask import send_file
+from flask_restful import Resource, reqparse
+from models import Job, UserRole
+from utils.helpers import make_response_data, get_current_user
+from utils.decorators import role_required
+from utils.jobs import JOB_STATUSES, enqueue_job, job_accepted
+from utils.export import EXPORT_FORMATS, export_path
+from utils.pagination import list_parser, keyset_paginate, PaginationError
+import utils.clearing  # noqa: F401  registers the clear_* job kinds
+
+# Kinds that are started directly rather than by the endpoint they belong to
+SUBMITTABLE_KINDS = ('rebuild_rollups', 'archive')
+
+list_args = list_parser(('status', str), ('kind', str))
+
+submit_args = reqparse.RequestParser()
+submit_args.add_argument('kind', type=str, required=True, choices=SUBMITTABLE_KINDS)
+
+def _visible_job(job_id):
+    # Jobs are private to whoever started them; the CEO sees all of them
+    current_user = get_current_user()
+    job = Job.query.get(job_id)
+    if job is None or (current_user.role != UserRole.CEO and job.created_by != current_user.id):
+        return None
+    return job
+
+class JobListResource(Resource):
+    # Progress must not lag behind the worker's commits
+    replica_reads = False
+
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def get(self):
+        current_user = get_current_user()
+        args = list_args.parse_args()
+
+        query = Job.query
+        if current_user.role != UserRole.CEO:
+            query = query.filter(Job.created_by == current_user.id)
+        if args['status']:
+            if args['status'] not in JOB_STATUSES:
+                return make_response_data(success=False, message=f"status must be one of {', '.join(JOB_STATUSES)}.", status_code=400)
+            query = query.filter(Job.status == args['status'])
+        if args['kind']:
+            query = query.filter(Job.kind == args['kind'])
+
+        try:
+            jobs, meta = keyset_paginate(query, Job.created_at, Job.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=[job.to_dict() for job in jobs], message="Jobs fetched.", meta=meta)
+
+    @role_required('ceo')
+    def post(self):
+        args = submit_args.parse_args()
+        job = enqueue_job(args['kind'], user_id=get_current_user().id)
+        return job_accepted(job, "Job queued.")
+
+class JobResource(Resource):
+    replica_reads = False
+
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def get(self, job_id):
+        job = _visible_job(job_id)
+        if job is None:
+            return make_response_data(success=False, message="Job not found.", status_code=404)
+        return make_response_data(data=job.to_dict(), message="Job fetched.")
+
+class JobDownloadResource(Resource):
+    replica_reads = False
+
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def get(self, job_id):
+        job = _visible_job(job_id)
+        if job is None or job.kind != 'export':
+            return make_response_data(success=False, message="Export not found.", status_code=404)
+        path = export_path(job)
+        if path is None:
+            return make_response_data(success=False, message=f"Export is {job.status}, not ready for download.", status_code=409)
+        fmt = job.params['format']
+        return send_file(path, as_attachment=True, download_name=f"{job.params['source']}.{fmt}",
+                         mimetype=EXPORT_FORMATS[fmt])
@@ -1,25 +1,54 @@
-from flask_restful import Resource, reqparse
-from sqlalchemy import or_
-from models import db, Message, UserRole
+import time
+from flask import current_app
+from flask_restful import Resource, reqparse, inputs
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import func
+from models import db, Message, MessageArchive, UserRole
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.serialization import eager_query, serialize_all
+from utils.inbox import inbox_filter, mark_read, serialize_for, unread_count
+from utils.conditional import conditional_get
+from utils.notify import message_changes
+from utils.jobs import enqueue_job, job_accepted
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError, MAX_PAGE_SIZE
 
 parser = reqparse.RequestParser()
 parser.add_argument('message', type=str, required=True)
 parser.add_argument('recipient_role', type=str, choices=[r.value for r in UserRole])
 parser.add_argument('recipient_id', type=int)
 
+list_args = list_parser(('sender_id', int))
+archive_args = list_parser(('sender_id', int), ('recipient_id', int), ('period', str))
+
+MAX_POLL_TIMEOUT = 60
+POLL_BATCH_SIZE = 100
+poll_args = reqparse.RequestParser()
+poll_args.add_argument('since', type=int, location='args')
+poll_args.add_argument('timeout', type=float, location='args')
+
+read_parser = reqparse.RequestParser()
+read_parser.add_argument('ids', type=int, action='append')
+read_parser.add_argument('all', type=inputs.boolean, default=False)
+
 class MessageListResource(Resource):
     @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    @conditional_get(tables=('message', 'message_read', 'user'))
     def get(self):
         current_user = get_current_user()
-        messages = Message.query.filter(
-            or_(
-                Message.recipient_id == current_user.id,
-                Message.recipient_role == current_user.role
-            )
-        ).order_by(Message.created_at.desc()).all()
-        return make_response_data(data=[m.to_dict() for m in messages], message="Messages fetched.")
+        args = list_args.parse_args()
+
+        query = eager_query(Message).filter(inbox_filter(current_user))
+        if args['sender_id']:
+            query = query.filter(Message.sender_id == args['sender_id'])
+
+        try:
+            query = apply_date_range(query, Message.created_at, args['date_from'], args['date_to'])
+            messages, meta = keyset_paginate(query, Message.created_at, Message.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_for(current_user, messages), message="Messages fetched.", meta=meta)
 
     @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
     def post(self):
@@ -39,6 +68,53 @@ class MessageListResource(Resource):
         db.session.commit()
         return make_response_data(data=new_message.to_dict(), message="Message sent.", status_code=201)
 
+class MessagePollResource(Resource):
+    # Waits on the primary's version counter, so it must read the rows it signals from there too
+    replica_reads = False
+
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def get(self):
+        """
+        Long-poll for messages newer than the `since` message id. Returns as soon as
+        any exist, or with an empty list after `timeout` seconds; clients pass the
+        returned cursor as the next `since`. Without `since`, waits for messages
+        arriving after the call.
+        """
+        current_user = get_current_user()
+        args = poll_args.parse_args()
+        timeout = args['timeout'] if args['timeout'] is not None else current_app.config.get('MESSAGE_POLL_TIMEOUT', 25)
+        timeout = min(max(timeout, 0), MAX_POLL_TIMEOUT)
+
+        # Read the version before querying so a message committed in between still wakes us
+        seen_version = message_changes.version()
+        since = args['since']
+        if since is None:
+            since = db.session.query(func.coalesce(func.max(Message.id), 0)).scalar()
+
+        def fetch():
+            return (eager_query(Message)
+                    .filter(Message.id > since, inbox_filter(current_user))
+                    .order_by(Message.id)
+                    .limit(POLL_BATCH_SIZE + 1)
+                    .all())
+
+        messages = fetch()
+        deadline = time.monotonic() + timeout
+        while not messages:
+            # Return the connection to the pool while idle
+            db.session.close()
+            remaining = deadline - time.monotonic()
+            version = message_changes.wait_for_change(seen_version, remaining) if remaining > 0 else seen_version
+            if version == seen_version:
+                break
+            seen_version = version
+            messages = fetch()
+
+        has_more = len(messages) > POLL_BATCH_SIZE
+        messages = messages[:POLL_BATCH_SIZE]
+        meta = {'cursor': messages[-1].id if messages else since, 'has_more': has_more}
+        return make_response_data(data=serialize_for(current_user, messages), message="Messages fetched.", meta=meta)
+
 class MessageResource(Resource):
     @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
     def put(self, message_id): # Mark as read
@@ -47,15 +123,59 @@ class MessageResource(Resource):
 
         # Ensure user is the recipient before marking as read
         if message.recipient_id == current_user.id or message.recipient_role == current_user.role:
-            message.is_read = True
+            mark_read(current_user, [message.id])
             db.session.commit()
-            return make_response_data(data=message.to_dict(), message="Message marked as read.")
+            return make_response_data(data=serialize_for(current_user, [message])[0], message="Message marked as read.")
         else:
             return make_response_data(success=False, message="You are not the recipient of this message.", status_code=403)
 
+class MessageReadResource(Resource):
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def post(self):
+        """Mark many messages read: {"ids": [...]} or {"all": true} for the whole inbox."""
+        current_user = get_current_user()
+        data = read_parser.parse_args()
+        if not data['all'] and not data['ids']:
+            return make_response_data(success=False, message="Either ids or all is required.", status_code=400)
+        if data['ids'] and len(data['ids']) > MAX_PAGE_SIZE:
+            return make_response_data(success=False, message=f"At most {MAX_PAGE_SIZE} ids per request.", status_code=400)
+
+        marked = mark_read(current_user, None if data['all'] else data['ids'])
+        db.session.commit()
+        return make_response_data(data={'marked': marked, 'unread': unread_count(current_user.id)},
+                                  message=f"{marked} messages marked as read.")
+
+class UnreadMessageCountResource(Resource):
+    @role_required('ceo', 'storekeeper', 'seller', 'purchaser', 'driver')
+    def get(self):
+        # Served from the counter row alone; no User lookup
+        return make_response_data(data={'unread': unread_count(int(get_jwt_identity()))}, message="Unread count fetched.")
+
 class ClearMessagesResource(Resource):
     @role_required('ceo')
     def delete(self):
-        num_deleted = Message.query.delete()
-        db.session.commit()
-        return make_response_data(message=f"Successfully cleared {num_deleted} messages.")
\ No newline at end of file
+        # Batched in the background, each message together with its read receipts
+        job = enqueue_job('clear_messages', user_id=int(get_jwt_identity()))
+        return job_accepted(job, "Clearing messages.")
+
+class MessageArchiveResource(Resource):
+    @role_required('ceo')
+    @conditional_get(tables=('message_archive', 'user'))
+    def get(self):
+        args = archive_args.parse_args()
+
+        query = eager_query(MessageArchive)
+        if args['sender_id']:
+            query = query.filter(MessageArchive.sender_id == args['sender_id'])
+        if args['recipient_id']:
+            query = query.filter(MessageArchive.recipient_id == args['recipient_id'])
+        if args['period']:
+            query = query.filter(MessageArchive.period == args['period'])
+
+        try:
+            query = apply_date_range(query, MessageArchive.created_at, args['date_from'], args['date_to'])
+            messages, meta = keyset_paginate(query, MessageArchive.created_at, MessageArchive.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(messages), message="Archived messages fetched.", meta=meta)
\ No newline at end of file
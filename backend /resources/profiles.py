@@ -0,0 +1,24 @@
+from flask import send_file
+from flask_restful import Resource, reqparse
+from utils.helpers import make_response_data
+from utils.decorators import role_required
+from utils.profiler import request_profiler
+
+download_args = reqparse.RequestParser()
+download_args.add_argument('format', type=str, location='args', choices=('txt', 'pstats'), default='txt')
+
+class ProfileListResource(Resource):
+    @role_required('ceo')
+    def get(self):
+        return make_response_data(data=request_profiler.profiles(), message="Profiles fetched.")
+
+class ProfileResource(Resource):
+    @role_required('ceo')
+    def get(self, profile_id):
+        args = download_args.parse_args()
+        path = request_profiler.path(profile_id, args['format'])
+        if path is None:
+            return make_response_data(success=False, message="Profile not found.", status_code=404)
+        # .txt is the readable report; .pstats loads into pstats, snakeviz, etc.
+        return send_file(path, as_attachment=True, download_name=f"{profile_id}.{args['format']}",
+                         mimetype='text/plain' if args['format'] == 'txt' else 'application/octet-stream')
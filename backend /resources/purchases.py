@@ -1,28 +1,76 @@
-from flask_restful import Resource, reqparse
+from flask_restful import Resource, reqparse, inputs
 from datetime import datetime
 from sqlalchemy import func
-from models import db, Purchase, UserRole
+from models import db, Purchase, PurchaseArchive, UserRole
+from flask_jwt_extended import get_jwt_identity
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.units import parse_quantity
+from utils.rollups import PURCHASES_ROLLUP
+from utils.cache import response_cache
+from utils.serialization import eager_query, serialize_all
+from utils.conditional import conditional_get
+from utils.export import export_parser, stream_export, register_export, export_query, export_job
+from utils.jobs import enqueue_job, job_accepted
+from utils.bulk import (
+    BulkIngestError, read_batch_rows, validate_rows, insert_in_chunks, batch_response,
+    required_field, number_field, date_field
+)
+from utils.archive import summary_rows
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError
 
 parser = reqparse.RequestParser()
 parser.add_argument('supplier_name', type=str, required=True)
 parser.add_argument('fruit_type', type=str, required=True)
 parser.add_argument('quantity', type=str, required=True)
+parser.add_argument('unit', type=str)
 parser.add_argument('cost', type=float, required=True)
 parser.add_argument('purchase_date', type=str, required=True)
 
+list_args = list_parser(('fruit_type', str), ('purchaser_id', int), ('supplier_name', str))
+archive_args = list_parser(('fruit_type', str), ('purchaser_id', int), ('supplier_name', str), ('period', str))
+export_args = export_parser(('fruit_type', str), ('purchaser_id', int), ('supplier_name', str))
+
+summary_args = reqparse.RequestParser()
+summary_args.add_argument('include_archived', type=inputs.boolean, location='args', default=False)
+
+def _export_query(args):
+    query = eager_query(Purchase)
+    if args['purchaser_id']:
+        query = query.filter(Purchase.purchaser_id == args['purchaser_id'])
+    if args['fruit_type']:
+        query = query.filter(Purchase.fruit_type == args['fruit_type'])
+    if args['supplier_name']:
+        query = query.filter(Purchase.supplier_name == args['supplier_name'])
+    return apply_date_range(query, Purchase.purchase_date, args['date_from'], args['date_to'])
+
+register_export('purchases', _export_query, Purchase.purchase_date, Purchase.id)
+
 class PurchaseListResource(Resource):
     @role_required('ceo', 'purchaser')
+    @conditional_get(tables=('purchase', 'user'))
     def get(self):
         current_user = get_current_user()
-        
+        args = list_args.parse_args()
+
+        query = eager_query(Purchase)
         if current_user.role == UserRole.CEO:
-            purchases = Purchase.query.order_by(Purchase.purchase_date.desc()).all()
+            if args['purchaser_id']:
+                query = query.filter(Purchase.purchaser_id == args['purchaser_id'])
         else: # Purchaser
-            purchases = Purchase.query.filter_by(purchaser_id=current_user.id).order_by(Purchase.purchase_date.desc()).all()
-            
-        return make_response_data(data=[p.to_dict() for p in purchases], message="Purchases fetched.")
+            query = query.filter(Purchase.purchaser_id == current_user.id)
+        if args['fruit_type']:
+            query = query.filter(Purchase.fruit_type == args['fruit_type'])
+        if args['supplier_name']:
+            query = query.filter(Purchase.supplier_name == args['supplier_name'])
+
+        try:
+            query = apply_date_range(query, Purchase.purchase_date, args['date_from'], args['date_to'])
+            purchases, meta = keyset_paginate(query, Purchase.purchase_date, Purchase.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(purchases), message="Purchases fetched.", meta=meta)
 
     @role_required('purchaser')
     def post(self):
@@ -33,12 +81,17 @@ class PurchaseListResource(Resource):
             purchase_date = datetime.strptime(data['purchase_date'], '%Y-%m-%d').date()
         except ValueError:
             return make_response_data(success=False, message="Invalid date format for purchase_date. Use YYYY-MM-DD.", status_code=400)
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit'))
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
 
         new_purchase = Purchase(
             purchaser_id=current_user.id,
             supplier_name=data['supplier_name'],
             fruit_type=data['fruit_type'],
-            quantity=data['quantity'],
+            quantity=quantity,
+            unit=unit,
             cost=data['cost'],
             purchase_date=purchase_date
         )
@@ -46,15 +99,47 @@ class PurchaseListResource(Resource):
         db.session.commit()
         return make_response_data(data=new_purchase.to_dict(), message="Purchase recorded.", status_code=201)
 
+def _validate_purchase_row(purchaser_id):
+    def validate(row):
+        quantity, unit = parse_quantity(required_field(row, 'quantity'), row.get('unit') or None)
+        return {
+            'purchaser_id': purchaser_id,
+            'supplier_name': required_field(row, 'supplier_name'),
+            'fruit_type': required_field(row, 'fruit_type'),
+            'quantity': quantity,
+            'unit': unit,
+            'cost': number_field(row, 'cost'),
+            'purchase_date': date_field(row, 'purchase_date'),
+        }
+    return validate
+
+class PurchaseBatchResource(Resource):
+    @role_required('purchaser')
+    def post(self):
+        current_user = get_current_user()
+        try:
+            rows = read_batch_rows()
+        except BulkIngestError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        valid, errors = validate_rows(rows, _validate_purchase_row(current_user.id))
+        inserted, insert_errors = insert_in_chunks(PURCHASES_ROLLUP, valid)
+        return batch_response(len(rows), inserted, errors + insert_errors)
+
 class PurchaseResource(Resource):
     @role_required('ceo')
     def put(self, purchase_id):
         purchase = Purchase.query.get_or_404(purchase_id)
         data = parser.parse_args()
-        
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit'))
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
         purchase.supplier_name = data['supplier_name']
         purchase.fruit_type = data['fruit_type']
-        purchase.quantity = data['quantity']
+        purchase.quantity = quantity
+        purchase.unit = unit
         purchase.cost = data['cost']
         purchase.purchase_date = datetime.strptime(data['purchase_date'], '%Y-%m-%d').date()
         
@@ -71,18 +156,73 @@ class PurchaseResource(Resource):
 class ClearPurchasesResource(Resource):
     @role_required('ceo')
     def delete(self):
-        num_deleted = Purchase.query.delete()
-        db.session.commit()
-        return make_response_data(message=f"Successfully cleared {num_deleted} purchase records.")
+        # Batched in the background; the rollup is kept in step with each batch
+        job = enqueue_job('clear_purchases', user_id=int(get_jwt_identity()))
+        return job_accepted(job, "Clearing purchase records.")
+
+class PurchaseExportResource(Resource):
+    @role_required('ceo')
+    def get(self):
+        args = export_args.parse_args()
+        try:
+            query = export_query('purchases', args)
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        if args['async']:
+            return export_job('purchases', args)
+        return stream_export(query, args['format'], 'purchases')
 
 class PurchaseSummaryResource(Resource):
     @role_required('ceo')
+    @response_cache.cached(tables=('purchase',))
     def get(self):
-        total_cost = db.session.query(func.sum(Purchase.cost)).scalar() or 0
-        cost_by_fruit = db.session.query(Purchase.fruit_type, func.sum(Purchase.cost)).group_by(Purchase.fruit_type).all()
-        
+        args = summary_args.parse_args()
+        # One GROUP BY over the daily rollup; the totals are folded from its (few) rows.
+        # The rollup also covers archived purchases; by default only the hot ones count
+        hot, archived_before = summary_rows(PURCHASES_ROLLUP, ('fruit_type', 'unit'), args['include_archived'])
+        rows = db.session.query(
+            hot.c.fruit_type, hot.c.unit, func.sum(hot.c.total_cost), func.sum(hot.c.total_quantity)
+        ).group_by(hot.c.fruit_type, hot.c.unit).all()
+
+        cost_by_fruit, volume_by_unit = {}, {}
+        for fruit, unit, cost, quantity in rows:
+            cost_by_fruit[fruit] = cost_by_fruit.get(fruit, 0) + (cost or 0)
+            volume_by_unit[unit] = volume_by_unit.get(unit, 0) + (quantity or 0)
+
         summary = {
-            'total_cost': total_cost,
-            'cost_by_fruit': [{'fruit_type': fruit, 'total_cost': cost} for fruit, cost in cost_by_fruit]
+            'total_cost': sum(cost_by_fruit.values()),
+            'total_volume': volume_by_unit,
+            'cost_by_fruit': [{'fruit_type': fruit, 'total_cost': cost} for fruit, cost in cost_by_fruit.items()],
+            'volume_by_fruit': [
+                {'fruit_type': fruit, 'unit': unit, 'total_quantity': quantity or 0}
+                for fruit, unit, _, quantity in rows
+            ]
         }
-        return make_response_data(data=summary, message="Purchase summary fetched.")
\ No newline at end of file
+        meta = {'include_archived': args['include_archived'],
+                'archived_before': archived_before.isoformat() if archived_before else None}
+        return make_response_data(data=summary, message="Purchase summary fetched.", meta=meta)
+
+class PurchaseArchiveResource(Resource):
+    @role_required('ceo')
+    @conditional_get(tables=('purchase_archive', 'user'))
+    def get(self):
+        args = archive_args.parse_args()
+
+        query = eager_query(PurchaseArchive)
+        if args['purchaser_id']:
+            query = query.filter(PurchaseArchive.purchaser_id == args['purchaser_id'])
+        if args['fruit_type']:
+            query = query.filter(PurchaseArchive.fruit_type == args['fruit_type'])
+        if args['supplier_name']:
+            query = query.filter(PurchaseArchive.supplier_name == args['supplier_name'])
+        if args['period']:
+            query = query.filter(PurchaseArchive.period == args['period'])
+
+        try:
+            query = apply_date_range(query, PurchaseArchive.purchase_date, args['date_from'], args['date_to'])
+            purchases, meta = keyset_paginate(query, PurchaseArchive.purchase_date, PurchaseArchive.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(purchases), message="Archived purchases fetched.", meta=meta)
\ No newline at end of file
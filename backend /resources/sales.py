@@ -1,28 +1,72 @@
-from flask_restful import Resource, reqparse
+from flask_restful import Resource, reqparse, inputs
 from datetime import datetime
 from sqlalchemy import func
-from models import db, Sale, UserRole
+from models import db, Sale, SaleArchive, UserRole
+from flask_jwt_extended import get_jwt_identity
 from utils.helpers import make_response_data, get_current_user
 from utils.decorators import role_required
+from utils.units import parse_quantity
+from utils.rollups import SALES_ROLLUP
+from utils.cache import response_cache
+from utils.serialization import eager_query, serialize_all
+from utils.conditional import conditional_get
+from utils.export import export_parser, stream_export, register_export, export_query, export_job
+from utils.jobs import enqueue_job, job_accepted
+from utils.bulk import (
+    BulkIngestError, read_batch_rows, validate_rows, insert_in_chunks, batch_response,
+    required_field, number_field, date_field
+)
+from utils.archive import summary_rows
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError
 
 parser = reqparse.RequestParser()
 parser.add_argument('assignment', type=str, required=True)
 parser.add_argument('fruit_type', type=str, required=True)
 parser.add_argument('quantity', type=str, required=True)
+parser.add_argument('unit', type=str)
 parser.add_argument('revenue', type=float, required=True)
 parser.add_argument('sale_date', type=str, required=True)
 
+list_args = list_parser(('fruit_type', str), ('seller_id', int))
+archive_args = list_parser(('fruit_type', str), ('seller_id', int), ('period', str))
+export_args = export_parser(('fruit_type', str), ('seller_id', int))
+
+summary_args = reqparse.RequestParser()
+summary_args.add_argument('include_archived', type=inputs.boolean, location='args', default=False)
+
+def _export_query(args):
+    query = eager_query(Sale)
+    if args['seller_id']:
+        query = query.filter(Sale.seller_id == args['seller_id'])
+    if args['fruit_type']:
+        query = query.filter(Sale.fruit_type == args['fruit_type'])
+    return apply_date_range(query, Sale.sale_date, args['date_from'], args['date_to'])
+
+register_export('sales', _export_query, Sale.sale_date, Sale.id)
+
 class SalesListResource(Resource):
     @role_required('ceo', 'seller')
+    @conditional_get(tables=('sale', 'user'))
     def get(self):
         current_user = get_current_user()
-        
+        args = list_args.parse_args()
+
+        query = eager_query(Sale)
         if current_user.role == UserRole.CEO:
-            sales = Sale.query.order_by(Sale.sale_date.desc()).all()
+            if args['seller_id']:
+                query = query.filter(Sale.seller_id == args['seller_id'])
         else: # Seller
-            sales = Sale.query.filter_by(seller_id=current_user.id).order_by(Sale.sale_date.desc()).all()
-            
-        return make_response_data(data=[sale.to_dict() for sale in sales], message="Sales fetched successfully.")
+            query = query.filter(Sale.seller_id == current_user.id)
+        if args['fruit_type']:
+            query = query.filter(Sale.fruit_type == args['fruit_type'])
+
+        try:
+            query = apply_date_range(query, Sale.sale_date, args['date_from'], args['date_to'])
+            sales, meta = keyset_paginate(query, Sale.sale_date, Sale.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(sales), message="Sales fetched successfully.", meta=meta)
 
     @role_required('seller')
     def post(self):
@@ -33,12 +77,17 @@ class SalesListResource(Resource):
             sale_date = datetime.strptime(data['sale_date'], '%Y-%m-%d').date()
         except ValueError:
             return make_response_data(success=False, message="Invalid date format for sale_date. Use YYYY-MM-DD.", status_code=400)
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit'))
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
 
         new_sale = Sale(
             seller_id=current_user.id,
             assignment=data['assignment'],
             fruit_type=data['fruit_type'],
-            quantity=data['quantity'],
+            quantity=quantity,
+            unit=unit,
             revenue=data['revenue'],
             sale_date=sale_date
         )
@@ -46,15 +95,47 @@ class SalesListResource(Resource):
         db.session.commit()
         return make_response_data(data=new_sale.to_dict(), message="Sale recorded successfully.", status_code=201)
 
+def _validate_sale_row(seller_id):
+    def validate(row):
+        quantity, unit = parse_quantity(required_field(row, 'quantity'), row.get('unit') or None)
+        return {
+            'seller_id': seller_id,
+            'assignment': required_field(row, 'assignment'),
+            'fruit_type': required_field(row, 'fruit_type'),
+            'quantity': quantity,
+            'unit': unit,
+            'revenue': number_field(row, 'revenue'),
+            'sale_date': date_field(row, 'sale_date'),
+        }
+    return validate
+
+class SalesBatchResource(Resource):
+    @role_required('seller')
+    def post(self):
+        current_user = get_current_user()
+        try:
+            rows = read_batch_rows()
+        except BulkIngestError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        valid, errors = validate_rows(rows, _validate_sale_row(current_user.id))
+        inserted, insert_errors = insert_in_chunks(SALES_ROLLUP, valid)
+        return batch_response(len(rows), inserted, errors + insert_errors)
+
 class SalesResource(Resource):
     @role_required('ceo') # Only CEO can edit/delete sales records
     def put(self, sale_id):
         sale = Sale.query.get_or_404(sale_id)
         data = parser.parse_args()
-        
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit'))
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
         sale.assignment = data['assignment']
         sale.fruit_type = data['fruit_type']
-        sale.quantity = data['quantity']
+        sale.quantity = quantity
+        sale.unit = unit
         sale.revenue = data['revenue']
         sale.sale_date = datetime.strptime(data['sale_date'], '%Y-%m-%d').date()
         
@@ -71,18 +152,71 @@ class SalesResource(Resource):
 class ClearSalesResource(Resource):
     @role_required('ceo')
     def delete(self):
-        num_deleted = Sale.query.delete()
-        db.session.commit()
-        return make_response_data(message=f"Successfully cleared {num_deleted} sales records.")
+        # Batched in the background; the rollup is kept in step with each batch
+        job = enqueue_job('clear_sales', user_id=int(get_jwt_identity()))
+        return job_accepted(job, "Clearing sales records.")
+
+class SalesExportResource(Resource):
+    @role_required('ceo')
+    def get(self):
+        args = export_args.parse_args()
+        try:
+            query = export_query('sales', args)
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        if args['async']:
+            return export_job('sales', args)
+        return stream_export(query, args['format'], 'sales')
 
 class SalesSummaryResource(Resource):
     @role_required('ceo')
+    @response_cache.cached(tables=('sale',))
     def get(self):
-        total_revenue = db.session.query(func.sum(Sale.revenue)).scalar() or 0
-        sales_by_fruit = db.session.query(Sale.fruit_type, func.sum(Sale.revenue)).group_by(Sale.fruit_type).all()
-        
+        args = summary_args.parse_args()
+        # One GROUP BY over the daily rollup; the totals are folded from its (few) rows.
+        # The rollup also covers archived sales; by default only the hot ones count
+        hot, archived_before = summary_rows(SALES_ROLLUP, ('fruit_type', 'unit'), args['include_archived'])
+        rows = db.session.query(
+            hot.c.fruit_type, hot.c.unit, func.sum(hot.c.total_revenue), func.sum(hot.c.total_quantity)
+        ).group_by(hot.c.fruit_type, hot.c.unit).all()
+
+        revenue_by_fruit, volume_by_unit = {}, {}
+        for fruit, unit, revenue, quantity in rows:
+            revenue_by_fruit[fruit] = revenue_by_fruit.get(fruit, 0) + (revenue or 0)
+            volume_by_unit[unit] = volume_by_unit.get(unit, 0) + (quantity or 0)
+
         summary = {
-            'total_revenue': total_revenue,
-            'revenue_by_fruit': [{'fruit_type': fruit, 'total_revenue': revenue} for fruit, revenue in sales_by_fruit]
+            'total_revenue': sum(revenue_by_fruit.values()),
+            'total_volume': volume_by_unit,
+            'revenue_by_fruit': [{'fruit_type': fruit, 'total_revenue': revenue} for fruit, revenue in revenue_by_fruit.items()],
+            'volume_by_fruit': [
+                {'fruit_type': fruit, 'unit': unit, 'total_quantity': quantity or 0}
+                for fruit, unit, _, quantity in rows
+            ]
         }
-        return make_response_data(data=summary, message="Sales summary fetched.")
\ No newline at end of file
+        meta = {'include_archived': args['include_archived'],
+                'archived_before': archived_before.isoformat() if archived_before else None}
+        return make_response_data(data=summary, message="Sales summary fetched.", meta=meta)
+
+class SalesArchiveResource(Resource):
+    @role_required('ceo')
+    @conditional_get(tables=('sale_archive', 'user'))
+    def get(self):
+        args = archive_args.parse_args()
+
+        query = eager_query(SaleArchive)
+        if args['seller_id']:
+            query = query.filter(SaleArchive.seller_id == args['seller_id'])
+        if args['fruit_type']:
+            query = query.filter(SaleArchive.fruit_type == args['fruit_type'])
+        if args['period']:
+            query = query.filter(SaleArchive.period == args['period'])
+
+        try:
+            query = apply_date_range(query, SaleArchive.sale_date, args['date_from'], args['date_to'])
+            sales, meta = keyset_paginate(query, SaleArchive.sale_date, SaleArchive.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(sales), message="Archived sales fetched.", meta=meta)
\ No newline at end of file
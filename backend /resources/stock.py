@@ -1,20 +1,154 @@
-from flask_restful import Resource
-from flask_jwt_extended import jwt_required
+from flask_restful import Resource, reqparse
+from datetime import date, datetime
+from sqlalchemy import func, literal, select
+from models import db, Inventory, StockMovement, StockCheckpoint
+from utils.helpers import make_response_data, get_current_user
+from utils.decorators import role_required
+from utils.units import parse_quantity
+from utils.cache import bump_versions
+from utils.stock import MOVEMENT_TYPES, StockError, record_movement, stock_as_of
+from utils.serialization import eager_query, serialize_all
+from utils.conditional import conditional_get
+from utils.export import export_parser, stream_export, register_export, export_query, export_job
+from utils.pagination import list_parser, apply_date_range, keyset_paginate, PaginationError
+
+parser = reqparse.RequestParser()
+parser.add_argument('inventory_id', type=int, required=True)
+parser.add_argument('movement_type', type=str, required=True, choices=MOVEMENT_TYPES)
+parser.add_argument('quantity', type=str, required=True)
+parser.add_argument('unit', type=str)
+parser.add_argument('date', type=str)
+parser.add_argument('notes', type=str)
+
+list_args = list_parser(('inventory_id', int), ('movement_type', str))
+export_args = export_parser(('inventory_id', int), ('movement_type', str))
+
+def _export_query(args):
+    query = eager_query(StockMovement)
+    if args['inventory_id']:
+        query = query.filter(StockMovement.inventory_id == args['inventory_id'])
+    if args['movement_type']:
+        query = query.filter(StockMovement.movement_type == args['movement_type'])
+    return apply_date_range(query, StockMovement.date, args['date_from'], args['date_to'])
+
+register_export('stock_movements', _export_query, StockMovement.date, StockMovement.id)
+
+stock_args = reqparse.RequestParser()
+stock_args.add_argument('as_of', type=str, location='args')
 
 class StockMovementListResource(Resource):
-    @jwt_required()
+    @role_required('ceo', 'storekeeper')
+    @conditional_get(tables=('stock_movement', 'inventory'))
     def get(self):
-        # TODO: Implement actual database query
-        return {
-            'success': True,
-            'data': [
-                {"id": 1, "product": "Laptop", "movement_type": "IN", "quantity": 10, "date": "2025-08-01"},
-                {"id": 2, "product": "Mouse", "movement_type": "OUT", "quantity": 5, "date": "2025-08-02"}
-            ]
-        }
+        args = list_args.parse_args()
+
+        query = eager_query(StockMovement)
+        if args['inventory_id']:
+            query = query.filter(StockMovement.inventory_id == args['inventory_id'])
+        if args['movement_type']:
+            query = query.filter(StockMovement.movement_type == args['movement_type'])
+
+        try:
+            query = apply_date_range(query, StockMovement.date, args['date_from'], args['date_to'])
+            movements, meta = keyset_paginate(query, StockMovement.date, StockMovement.id, args['cursor'], args['limit'])
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        return make_response_data(data=serialize_all(movements), message="Stock movements fetched.", meta=meta)
+
+    @role_required('storekeeper')
+    def post(self):
+        data = parser.parse_args()
+        current_user = get_current_user()
+        item = Inventory.query.get_or_404(data['inventory_id'])
+
+        movement_date = date.today()
+        if data.get('date'):
+            try:
+                movement_date = datetime.strptime(data['date'], '%Y-%m-%d').date()
+            except ValueError:
+                return make_response_data(success=False, message="Invalid date format for date. Use YYYY-MM-DD.", status_code=400)
+        try:
+            quantity, unit = parse_quantity(data['quantity'], data.get('unit') or item.unit)
+        except ValueError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+        if unit != (item.unit or 'kg'):
+            return make_response_data(success=False, message=f"{item.name} is stocked in '{item.unit}', not '{unit}'.", status_code=400)
+
+        try:
+            movement = record_movement(item, data['movement_type'], quantity, movement_date, current_user.id, data.get('notes'))
+        except StockError as e:
+            db.session.rollback()
+            return make_response_data(success=False, message=str(e), status_code=400)
+        db.session.commit()
+        return make_response_data(data=movement.to_dict(), message="Stock movement recorded.", status_code=201)
 
 class ClearStockMovementsResource(Resource):
-    @jwt_required()
+    @role_required('ceo')
     def delete(self):
-        # TODO: Implement actual clearing logic
-        return {'success': True, 'message': 'All stock movements cleared'}
\ No newline at end of file
+        current_user = get_current_user()
+        try:
+            StockCheckpoint.query.delete()
+            num_deleted = StockMovement.query.delete()
+
+            # Carry current balances forward so the emptied ledger still explains them
+            inventory = Inventory.__table__
+            opening = select(
+                inventory.c.id, literal('in'), inventory.c.quantity, inventory.c.unit, inventory.c.quantity,
+                literal(date.today()), literal('Opening stock'), literal(current_user.id), literal(datetime.utcnow()),
+            ).where(inventory.c.quantity > 0)
+            db.session.execute(StockMovement.__table__.insert().from_select(
+                ['inventory_id', 'movement_type', 'quantity', 'unit', 'remaining_stock',
+                 'date', 'notes', 'added_by', 'created_at'],
+                opening,
+            ))
+            db.session.execute(inventory.update().values(
+                movement_count=select(func.count(StockMovement.id))
+                .where(StockMovement.inventory_id == inventory.c.id)
+                .scalar_subquery()
+            ))
+
+            bump_versions('stock_movement', 'inventory')
+            db.session.commit()
+            return make_response_data(message=f"Successfully cleared {num_deleted} stock movements; current balances carried forward.")
+        except Exception as e:
+            db.session.rollback()
+            return make_response_data(success=False, message="Failed to clear stock movements.", errors=[str(e)], status_code=500)
+
+class InventoryStockResource(Resource):
+    @role_required('ceo', 'storekeeper')
+    def get(self, inv_id):
+        item = Inventory.query.get_or_404(inv_id)
+        args = stock_args.parse_args()
+
+        if not args['as_of']:
+            # Current balance is materialized on the item
+            return make_response_data(data={
+                'inventory_id': item.id, 'as_of': None, 'balance': item.quantity, 'unit': item.unit,
+            }, message="Stock balance fetched.")
+
+        try:
+            as_of = datetime.strptime(args['as_of'], '%Y-%m-%d').date()
+        except ValueError:
+            return make_response_data(success=False, message="Invalid date format for as_of. Use YYYY-MM-DD.", status_code=400)
+        balance, checkpoint_date = stock_as_of(item.id, as_of)
+        return make_response_data(data={
+            'inventory_id': item.id,
+            'as_of': as_of.isoformat(),
+            'balance': balance,
+            'unit': item.unit,
+            'checkpoint_date': checkpoint_date.isoformat() if checkpoint_date else None,
+        }, message="Stock balance fetched.")
+
+class StockMovementExportResource(Resource):
+    @role_required('ceo', 'storekeeper')
+    def get(self):
+        args = export_args.parse_args()
+        try:
+            query = export_query('stock_movements', args)
+        except PaginationError as e:
+            return make_response_data(success=False, message=str(e), status_code=400)
+
+        if args['async']:
+            return export_job('stock_movements', args)
+        return stream_export(query, args['format'], 'stock_movements')
@@ -1,7 +1,11 @@
 from flask_restful import Resource, reqparse
 from models.user import db, User, UserRole
+from models import TokenRevocation
 from utils.decorators import role_required
 from utils.helpers import make_response_data
+from utils.auth_state import active_users
+from utils.inbox import forget_reader
+from utils.archive import delete_user_archives
 
 parser = reqparse.RequestParser()
 parser.add_argument('email', type=str, required=True)
@@ -33,6 +37,7 @@ class UserListResource(Resource):
         user.set_password(data['password'])
         db.session.add(user)
         db.session.commit()
+        active_users.invalidate()
         return make_response_data(data=user.to_dict(), message="User created successfully.", status_code=201)
 
 class UserResource(Resource):
@@ -55,13 +60,20 @@ class UserResource(Resource):
             user.set_password(data['password'])
 
         db.session.commit()
+        active_users.invalidate()
         return make_response_data(data=user.to_dict(), message="User updated successfully.")
 
     @role_required('ceo')
     def delete(self, user_id):
         user = User.query.get_or_404(user_id)
+        # Read state and token revocations have no relationship to cascade through,
+        # and would block the delete
+        forget_reader(user.id)
+        db.session.execute(TokenRevocation.__table__.delete().where(TokenRevocation.user_id == user.id))
+        delete_user_archives(user.id)
         db.session.delete(user)
         db.session.commit()
+        active_users.invalidate()
         return make_response_data(message=f"User {user.name} deleted successfully.")
 
 class UserSalaryResource(Resource):
@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+from sqlalchemy import Date, cast, func, literal, select, union_all
+
+from models import db, User, DailySalesRollup, DailyPurchaseRollup
+
+BUCKETS = ('day', 'week', 'month')
+DEFAULT_RANGE_DAYS = 365
+
+
+class AnalyticsError(ValueError):
+    pass
+
+
+def parse_range(args):
+    """Read `from`, `to` (YYYY-MM-DD, inclusive) and `bucket` from request args."""
+    try:
+        end = date.fromisoformat(args['to']) if args.get('to') else date.today()
+        start = date.fromisoformat(args['from']) if args.get('from') else end - timedelta(days=DEFAULT_RANGE_DAYS)
+    except ValueError:
+        raise AnalyticsError("Invalid date format for from/to. Use YYYY-MM-DD.")
+    if start > end:
+        raise AnalyticsError("'from' must not be after 'to'.")
+    bucket = args.get('bucket') or 'month'
+    if bucket not in BUCKETS:
+        raise AnalyticsError(f"Invalid bucket '{bucket}'. Use one of: {', '.join(BUCKETS)}.")
+    return start, end, bucket
+
+
+def bucket_start(column, bucket):
+    """SQL expression mapping a DATE column to the first day of its bucket (weeks start Monday)."""
+    if bucket == 'day':
+        return column
+    if db.engine.dialect.name == 'sqlite':
+        if bucket == 'week':
+            return func.date(column, 'weekday 0', '-6 days')
+        return func.strftime('%Y-%m-01', column)
+    return cast(func.date_trunc(bucket, column), Date)
+
+
+def bucket_label(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+def _activity(start, end):
+    """Sales and purchase rollup rows in range as one UNION ALL with aligned columns."""
+    zero, zero_f = literal(0), literal(0.0)
+    sales = select(
+        DailySalesRollup.day.label('day'),
+        DailySalesRollup.fruit_type.label('fruit_type'),
+        DailySalesRollup.sale_count.label('sale_count'),
+        DailySalesRollup.total_revenue.label('revenue'),
+        zero.label('purchase_count'),
+        zero_f.label('cost'),
+    ).where(DailySalesRollup.day.between(start, end))
+    purchases = select(
+        DailyPurchaseRollup.day,
+        DailyPurchaseRollup.fruit_type,
+        zero,
+        zero_f,
+        DailyPurchaseRollup.purchase_count,
+        DailyPurchaseRollup.total_cost,
+    ).where(DailyPurchaseRollup.day.between(start, end))
+    return union_all(sales, purchases).subquery()
+
+
+def _totals(activity):
+    return [
+        func.coalesce(func.sum(activity.c.sale_count), 0).label('sales'),
+        func.coalesce(func.sum(activity.c.revenue), 0).label('revenue'),
+        func.coalesce(func.sum(activity.c.purchase_count), 0).label('purchases'),
+        func.coalesce(func.sum(activity.c.cost), 0).label('cost'),
+    ]
+
+
+def _row_dict(row):
+    return {
+        'sales': int(row.sales),
+        'revenue': float(row.revenue),
+        'purchases': int(row.purchases),
+        'cost': float(row.cost),
+        'net_profit': float(row.revenue) - float(row.cost),
+    }
+
+
+def range_totals(start, end, with_users=False):
+    activity = _activity(start, end)
+    columns = _totals(activity)
+    if with_users:
+        columns.append(select(func.count(User.id)).scalar_subquery().label('users'))
+    row = db.session.execute(select(*columns)).one()
+    data = _row_dict(row)
+    if with_users:
+        data['users'] = row.users
+    return data
+
+
+def bucketed_totals(start, end, bucket):
+    activity = _activity(start, end)
+    period = bucket_start(activity.c.day, bucket).label('period')
+    rows = db.session.execute(
+        select(period, *_totals(activity)).group_by(period).order_by(period)
+    ).all()
+    return [{'period': bucket_label(row.period), **_row_dict(row)} for row in rows]
+
+
+def bucketed_fruit_totals(start, end, bucket):
+    activity = _activity(start, end)
+    period = bucket_start(activity.c.day, bucket).label('period')
+    rows = db.session.execute(
+        select(period, activity.c.fruit_type, *_totals(activity))
+        .group_by(period, activity.c.fruit_type)
+        .order_by(period, activity.c.fruit_type)
+    ).all()
+    return [{'period': bucket_label(row.period), 'fruit_type': row.fruit_type, **_row_dict(row)} for row in rows]
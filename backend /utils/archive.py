@@ -0,0 +1,169 @@
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, select, union_all
+
+from models import (
+    db, Sale, Purchase, Message, SaleArchive, PurchaseArchive, MessageArchive, ArchiveWatermark, Job
+)
+from utils.cache import bump_versions
+from utils.inbox import forget_messages
+from utils.jobs import enqueue_job, job_kind, run_pending
+from utils.rollups import SALES_ROLLUP, PURCHASES_ROLLUP, apply_deleted_rows
+from utils.sql import upsert_increment
+
+
+class ArchiveSpec:
+    """Rows of `source` dated (by `date_column`) before the cutoff move to `archive`."""
+
+    def __init__(self, source, archive, date_column, before_delete=None, owner_column=None, rollup=None):
+        self.source = source
+        self.archive = archive
+        self.date_column = date_column
+        self.before_delete = before_delete  # called with the ids of each batch, same transaction
+        self.owner_column = owner_column    # user whose deletion takes the rows along, if any
+        self.rollup = rollup                # RollupSpec still counting the archived rows
+
+    @property
+    def name(self):
+        return self.source.__tablename__
+
+    def older_than(self, cutoff):
+        column = self.source.__table__.c[self.date_column]
+        if column.type.python_type is datetime:
+            cutoff = datetime.combine(cutoff, datetime.min.time())
+        return column < cutoff
+
+
+ARCHIVES = {spec.name: spec for spec in (
+    ArchiveSpec(Sale, SaleArchive, 'sale_date', owner_column='seller_id', rollup=SALES_ROLLUP),
+    ArchiveSpec(Purchase, PurchaseArchive, 'purchase_date', owner_column='purchaser_id', rollup=PURCHASES_ROLLUP),
+    ArchiveSpec(Message, MessageArchive, 'created_at', before_delete=forget_messages),
+)}
+
+
+def archive_cutoff(today=None):
+    """
+    First day still kept hot: ARCHIVE_AFTER_DAYS before today, rounded down to the
+    start of its month, so whole periods are archived at a time.
+    """
+    today = today or date.today()
+    return (today - timedelta(days=current_app.config.get('ARCHIVE_AFTER_DAYS', 365))).replace(day=1)
+
+
+def archived_before(name):
+    """Date before which `name` rows live in the archive table, or None if never archived."""
+    return db.session.execute(
+        select(ArchiveWatermark.archived_before).where(ArchiveWatermark.table_name == name)
+    ).scalar()
+
+
+def _prepare_archive(params):
+    cutoff = date.fromisoformat(params['before']) if params.get('before') else archive_cutoff()
+    names = [name for name in params.get('tables') or ARCHIVES if name in ARCHIVES]
+    total = sum(db.session.execute(
+        select(func.count()).select_from(ARCHIVES[name].source.__table__).where(ARCHIVES[name].older_than(cutoff))
+    ).scalar() for name in names)
+    return {'before': cutoff.isoformat(), 'pending': names}, total
+
+
+def _finish_archive(params, state):
+    return {'archived_before': state['before'], 'tables': list(params.get('tables') or ARCHIVES)}
+
+
+@job_kind('archive', prepare=_prepare_archive, finish=_finish_archive)
+def archive_batch(params, state, batch_size):
+    """
+    Copy the oldest `batch_size` archivable rows of the first pending table into its
+    archive table and delete them, in one transaction. Rollups are left alone:
+    they keep covering archived rows. Once a table has nothing older than the
+    cutoff left, its watermark moves up to the cutoff.
+    """
+    if not state['pending']:
+        return state, 0, True
+    spec = ARCHIVES[state['pending'][0]]
+    cutoff = date.fromisoformat(state['before'])
+    table = spec.source.__table__
+
+    ids = list(db.session.execute(
+        select(table.c.id).where(spec.older_than(cutoff)).order_by(table.c.id).limit(batch_size)
+    ).scalars())
+    if ids:
+        now = datetime.utcnow()
+        rows = db.session.execute(select(table).where(table.c.id.in_(ids))).mappings().all()
+        db.session.execute(spec.archive.__table__.insert(), [
+            {**row, 'period': f'{row[spec.date_column]:%Y-%m}', 'archived_at': now} for row in rows
+        ])
+        if spec.before_delete:
+            spec.before_delete(ids)
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+
+    if len(ids) < batch_size:
+        # An earlier cutoff than a previous run's leaves the watermark where it was
+        watermark = max(cutoff, archived_before(spec.name) or cutoff)
+        upsert_increment(db.session.connection(), ArchiveWatermark.__table__, {'table_name': spec.name}, {},
+                         assign={'archived_before': watermark, 'updated_at': datetime.utcnow()})
+        state = {**state, 'pending': state['pending'][1:]}
+    bump_versions(spec.name, spec.archive.__tablename__)
+    return state, len(ids), not state['pending']
+
+
+def delete_user_archives(user_id):
+    """
+    Delete a user's archived sales and purchases, as deleting the user cascades to the
+    hot ones, and take them out of the rollups. Call before deleting the user.
+    """
+    for spec in ARCHIVES.values():
+        if spec.owner_column is None:
+            continue
+        table = spec.archive.__table__
+        ids = list(db.session.execute(select(table.c.id).where(table.c[spec.owner_column] == user_id)).scalars())
+        if ids:
+            apply_deleted_rows(spec.rollup, db.session.connection(), ids, spec.archive)
+            db.session.execute(table.delete().where(table.c.id.in_(ids)))
+            bump_versions(spec.name, spec.archive.__tablename__)
+
+
+archive_cli = AppGroup('archive', help='Move old sales, purchases and messages to the archive tables.')
+
+
+@archive_cli.command('run')
+@click.option('--before', help='Archive rows dated before YYYY-MM-DD (default: from ARCHIVE_AFTER_DAYS).')
+@click.option('--table', 'tables', multiple=True, type=click.Choice(sorted(ARCHIVES)),
+              help='Only this table; repeatable (default: all).')
+def run_archive(before, tables):
+    """Queue an archive job and run it in this process."""
+    if before:
+        try:
+            date.fromisoformat(before)
+        except ValueError:
+            raise click.BadParameter('Use YYYY-MM-DD.', param_hint='--before')
+    job_id = enqueue_job('archive', {'before': before, 'tables': list(tables)}, start=False).id
+    run_pending()
+    job = db.session.get(Job, job_id)
+    click.echo(f"Job {job.id} {job.status}: {job.progress} row(s) archived"
+               + (f' ({job.error})' if job.error else ''))
+
+
+def summary_rows(spec, group_by, include_archived=False):
+    """
+    Subquery of the `group_by` key columns and summed measures of rollup `spec`, for
+    the caller to GROUP BY. The rollup also covers archived rows, so unless
+    `include_archived` only the days from the watermark on are taken, plus the source
+    rows still hot but dated before it, written with an old date after the last run.
+    The next run archives them.
+    Returns (subquery, archived_before); the date is None when nothing is cut off.
+    """
+    rollup = spec.rollup.__table__
+    query = select(*[rollup.c[column] for column in (*group_by, *spec.sums)])
+    cutoff = None if include_archived else archived_before(spec.source.__tablename__)
+    if cutoff is None:
+        return query.subquery(), None
+
+    source = spec.source.__table__
+    late = select(
+        *[source.c[spec.keys[column]] for column in group_by], *[source.c[attr] for attr in spec.sums.values()]
+    ).where(source.c[spec.keys['day']] < cutoff)
+    return union_all(query.where(rollup.c.day >= cutoff), late).subquery(), cutoff
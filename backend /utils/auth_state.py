@@ -0,0 +1,91 @@
+import threading
+import time
+from datetime import datetime
+from models import db, User, TokenRevocation
+from utils.metrics import cache_result
+from utils.replica import use_primary
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def token_claims(**claims):
+    """
+    Extra claims for a new token: `claims` plus `iat_ms`, its issue time in
+    milliseconds. `iat` has whole seconds only, so it cannot tell a token issued
+    just after a logout from one issued just before it in the same second.
+    """
+    return {**claims, 'iat_ms': time.time() * 1000}
+
+
+def issued_at_ms(jwt_payload):
+    # Tokens from before `iat_ms` existed fall back to their whole-second `iat`
+    return jwt_payload.get('iat_ms', jwt_payload['iat'] * 1000)
+
+
+class ActiveUserCache:
+    """
+    Process-local map of active user id -> role value, plus per-user token
+    revocation times, reloaded at most once per `ttl` seconds. Lets the auth
+    path reject deactivated, deleted or re-roled accounts and logged-out tokens
+    without a per-request DB lookup.
+    """
+
+    # Unknown ids (e.g. a user created after the last load) trigger an early
+    # reload, but no more often than this many seconds.
+    MISS_RELOAD_INTERVAL = 1.0
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._roles = {}
+        self._revoked_before = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.ttl = app.config.get('AUTH_USER_CACHE_TTL', self.ttl)
+
+    def _age(self):
+        return float('inf') if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    def _reload_if_older_than(self, seconds):
+        with self._lock:
+            if self._age() > seconds:
+                # Never from a lagging replica: revocations and deactivations must apply at once
+                with use_primary():
+                    self._load()
+
+    def _load(self):
+        rows = db.session.query(User.id, User.role).filter(User.is_active.isnot(False)).all()
+        self._roles = {row.id: row.role.value for row in rows}
+        self._revoked_before = {
+            row.user_id: (row.revoked_before - EPOCH).total_seconds() * 1000
+            for row in db.session.query(TokenRevocation.user_id, TokenRevocation.revoked_before)
+        }
+        self._loaded_at = time.monotonic()
+
+    def role_of(self, user_id):
+        """Current role of an active user, or None if the user is inactive or unknown."""
+        hit = True
+        if self._age() > self.ttl:
+            hit = False
+            self._reload_if_older_than(self.ttl)
+        user_id = int(user_id)
+        if user_id not in self._roles:
+            hit = False
+            self._reload_if_older_than(self.MISS_RELOAD_INTERVAL)
+        cache_result('auth_users', hit)
+        return self._roles.get(user_id)
+
+    def is_token_revoked(self, user_id, issued_at_ms):
+        """True if the user is no longer active or revoked their tokens at or after `issued_at_ms`."""
+        if self.role_of(user_id) is None:
+            return True
+        revoked_before = self._revoked_before.get(int(user_id))
+        return revoked_before is not None and issued_at_ms <= revoked_before
+
+    def invalidate(self):
+        """Force a reload on next check; call after changing a user's role or status."""
+        self._loaded_at = None
+
+
+active_users = ActiveUserCache()
@@ -0,0 +1,112 @@
+import csv
+import io
+from datetime import datetime
+
+from flask import current_app, request
+
+from models import db
+from utils.cache import bump_versions
+from utils.helpers import make_response_data
+from utils.rollups import apply_inserted_rows
+
+
+class BulkIngestError(ValueError):
+    pass
+
+
+def read_batch_rows():
+    """
+    Rows of a batch upload: a CSV file in the `file` form field, or a JSON body
+    that is either a list of objects or {"records": [...]}.
+    """
+    if 'file' in request.files:
+        try:
+            text = request.files['file'].read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise BulkIngestError("CSV upload must be UTF-8 encoded.")
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        body = request.get_json(silent=True)
+        rows = body.get('records') if isinstance(body, dict) else body
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise BulkIngestError("Send a JSON array of records, {\"records\": [...]}, or a CSV file in 'file'.")
+
+    if not rows:
+        raise BulkIngestError("The batch contains no records.")
+    limit = current_app.config.get('BULK_INGEST_MAX_ROWS', 5000)
+    if len(rows) > limit:
+        raise BulkIngestError(f"A batch may contain at most {limit} records.")
+    return rows
+
+
+def required_field(row, name):
+    value = row.get(name)
+    if value is None or str(value).strip() == '':
+        raise ValueError(f"Missing required field '{name}'.")
+    return str(value).strip() if isinstance(value, str) else value
+
+
+def number_field(row, name):
+    value = required_field(row, name)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Field '{name}' must be a number.")
+
+
+def date_field(row, name):
+    value = required_field(row, name)
+    try:
+        return datetime.strptime(str(value), '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Invalid date format for {name}. Use YYYY-MM-DD.")
+
+
+def validate_rows(rows, validate):
+    """
+    Run `validate(row) -> values` on every row. It raises ValueError with a
+    message for a bad row. Returns (valid [(index, values)], errors).
+    """
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, validate(row)))
+        except ValueError as e:
+            errors.append({'row': index, 'errors': [str(e)]})
+    return valid, errors
+
+
+def insert_in_chunks(spec, valid):
+    """
+    Insert validated rows with one executemany INSERT and one transaction per chunk.
+    Also updates the rollup and version counters that ORM flushes would normally
+    maintain. A failing chunk is rolled back and reported without stopping the rest.
+    Returns (inserted_count, errors).
+    """
+    chunk_size = current_app.config.get('BULK_INGEST_CHUNK_SIZE', 500)
+    table = spec.source.__table__
+    inserted, errors = 0, []
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        values = [row for _, row in chunk]
+        try:
+            connection = db.session.connection()
+            connection.execute(table.insert(), values)
+            apply_inserted_rows(spec, connection, values)
+            bump_versions(table.name)
+            db.session.commit()
+            inserted += len(chunk)
+        except Exception as e:
+            db.session.rollback()
+            errors.extend({'row': index, 'errors': [f"Not saved: {e.__class__.__name__}"]} for index, _ in chunk)
+    return inserted, errors
+
+
+def batch_response(total, inserted, errors):
+    errors = sorted(errors, key=lambda error: error['row'])
+    data = {'received': total, 'inserted': inserted, 'failed': len(errors)}
+    if inserted == 0:
+        return make_response_data(success=False, data=data, errors=errors, message="No records were saved.", status_code=400)
+    message = "Batch saved." if not errors else f"Batch saved with {len(errors)} rejected records."
+    return make_response_data(data=data, errors=errors, message=message, status_code=201)
@@ -0,0 +1,225 @@
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from functools import wraps
+
+from flask import request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from werkzeug.utils import import_string
+
+from models import db, TableVersion
+from utils.sql import upsert_increment
+from utils.metrics import cache_result
+
+# ---------------------------------------------------------------------------
+# Table version counters
+#
+# Every flush bumps the counter of each table it touched, in the same
+# transaction, so a reader that can see a commit also sees its new version.
+# Cache keys embed the versions they were computed at, which means an entry
+# can never be served once any of its tables has changed.
+# ---------------------------------------------------------------------------
+
+# Tables whose writes are derived bookkeeping, not data a response depends on
+_UNVERSIONED_TABLES = {'table_version', 'daily_sales_rollup', 'daily_purchase_rollup', 'stock_checkpoint',
+                       'unread_message_count', 'token_revocation', 'job'}
+
+
+def bump_versions(*tables, connection=None, session=None):
+    """Bump version counters; call explicitly for bulk writes that bypass the ORM."""
+    if connection is None:
+        session = db.session()
+        connection = session.connection()
+    if session is not None:
+        # Read by utils.notify after commit to wake long-poll waiters
+        session.info.setdefault('bumped_tables', set()).update(tables)
+    for name in tables:
+        upsert_increment(connection, TableVersion.__table__, {'name': name}, {'version': 1},
+                         assign={'updated_at': datetime.utcnow()})
+
+
+@event.listens_for(Session, 'after_flush')
+def _bump_flushed_tables(session, flush_context):
+    changed = [*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj))]
+    tables = {obj.__table__.name for obj in changed if hasattr(obj, '__table__')} - _UNVERSIONED_TABLES
+    if tables:
+        bump_versions(*sorted(tables), connection=session.connection(), session=session)
+
+
+def table_state(tables):
+    """{table: (version, updated_at)} for `tables`; never-written tables are (0, None)."""
+    rows = db.session.execute(
+        select(TableVersion.name, TableVersion.version, TableVersion.updated_at).where(TableVersion.name.in_(tables))
+    ).all()
+    state = {row.name: (row.version, row.updated_at) for row in rows}
+    return {name: state.get(name, (0, None)) for name in tables}
+
+
+def table_versions(tables):
+    return {name: version for name, (version, _) in table_state(tables).items()}
+
+
+# ---------------------------------------------------------------------------
+# Storage backends
+# ---------------------------------------------------------------------------
+
+class MemoryCacheBackend:
+    """Per-process LRU; only suitable for a single worker or tests."""
+
+    def __init__(self, max_entries=1000, **_):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """
+    Approximate LRU store in a local SQLite file, shared by every worker process on
+    the host. Hits only write when an entry's recency is more than `touch_after`
+    seconds old, so hot keys don't take the write lock on every request. Overflow is
+    trimmed every `evict_every` inserts per process rather than counted on each one,
+    so the file can briefly hold a few more than `max_entries` entries.
+    """
+
+    def __init__(self, max_entries=1000, path='response_cache.sqlite', touch_after=10.0, evict_every=50, **_):
+        self.max_entries = max_entries
+        self.path = path
+        self.touch_after = touch_after
+        self.evict_every = evict_every
+        self._inserts = itertools.count(1)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entry '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed_at ON cache_entry (accessed_at)')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connection()
+        row = conn.execute('SELECT value, accessed_at FROM cache_entry WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[1] >= self.touch_after:
+            conn.execute('UPDATE cache_entry SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, accessed_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), time.time()),
+        )
+        if next(self._inserts) % self.evict_every == 0:
+            # Everything past the newest max_entries, found by walking the accessed_at index
+            conn.execute(
+                'DELETE FROM cache_entry WHERE key IN '
+                '(SELECT key FROM cache_entry ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+
+CACHE_BACKENDS = {
+    'memory': MemoryCacheBackend,
+    'sqlite': SQLiteCacheBackend,
+}
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        name = app.config.get('RESPONSE_CACHE_BACKEND', 'sqlite')
+        if not name or name == 'none':
+            self.backend = None
+            return
+        backend_class = CACHE_BACKENDS.get(name) or import_string(name)
+        path = app.config.get('RESPONSE_CACHE_PATH') or os.path.join(app.instance_path, 'response_cache.sqlite')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.backend = backend_class(max_entries=app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1000), path=path)
+
+    def _key(self, tables, per_user):
+        claims = get_jwt()
+        parts = {
+            'endpoint': request.endpoint,
+            'role': claims.get('role'),
+            'user': get_jwt_identity() if per_user else None,
+            'args': sorted(request.args.items(multi=True)),
+            'versions': table_versions(tables),
+            # Endpoints default their date ranges to "today"
+            'today': date.today().isoformat(),
+        }
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+    def cached(self, tables, per_user=False):
+        """
+        Cache a successful (body, 200) response keyed by endpoint, role, query args,
+        the caller's id when `per_user`, and the current versions of `tables`.
+        Apply beneath role_required so authorization always runs first.
+        """
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return f(*args, **kwargs)
+                key = self._key(tables, per_user)
+                body = self.backend.get(key)
+                cache_result('response', body is not None)
+                if body is not None:
+                    self.hits += 1
+                    return body, 200
+                self.misses += 1
+                result = f(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                    self.backend.set(key, result[0])
+                return result
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
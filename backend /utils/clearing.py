@@ -0,0 +1,71 @@
+from sqlalchemy import func, select
+
+from models import (
+    db, Sale, Purchase, Message, MessageRead, UnreadMessageCount,
+    Inventory, StockMovement, StockCheckpoint
+)
+from utils.cache import bump_versions
+from utils.jobs import job_kind
+from utils.rollups import SALES_ROLLUP, PURCHASES_ROLLUP, apply_deleted_rows
+
+
+def _prepare_clear(model):
+    # Rows created after the job was queued are kept
+    def prepare(params):
+        upto, total = db.session.execute(select(func.max(model.id), func.count(model.id))).one()
+        return {'upto': upto or 0}, total
+    return prepare
+
+
+def _next_ids(model, state, batch_size):
+    return list(db.session.execute(
+        select(model.id).where(model.id <= state['upto']).order_by(model.id).limit(batch_size)
+    ).scalars())
+
+
+def _delete(model, ids):
+    db.session.execute(model.__table__.delete().where(model.__table__.c.id.in_(ids)))
+
+
+@job_kind('clear_sales', prepare=_prepare_clear(Sale))
+def clear_sales_batch(params, state, batch_size):
+    ids = _next_ids(Sale, state, batch_size)
+    if ids:
+        apply_deleted_rows(SALES_ROLLUP, db.session.connection(), ids)
+        _delete(Sale, ids)
+        bump_versions('sale')
+    return state, len(ids), len(ids) < batch_size
+
+
+@job_kind('clear_purchases', prepare=_prepare_clear(Purchase))
+def clear_purchases_batch(params, state, batch_size):
+    ids = _next_ids(Purchase, state, batch_size)
+    if ids:
+        apply_deleted_rows(PURCHASES_ROLLUP, db.session.connection(), ids)
+        _delete(Purchase, ids)
+        bump_versions('purchase')
+    return state, len(ids), len(ids) < batch_size
+
+
+@job_kind('clear_messages', prepare=_prepare_clear(Message))
+def clear_messages_batch(params, state, batch_size):
+    ids = _next_ids(Message, state, batch_size)
+    if ids:
+        db.session.execute(MessageRead.__table__.delete().where(MessageRead.message_id.in_(ids)))
+        _delete(Message, ids)
+        # Counter rows are recounted on their next read
+        db.session.execute(UnreadMessageCount.__table__.delete())
+        bump_versions('message', 'message_read')
+    return state, len(ids), len(ids) < batch_size
+
+
+@job_kind('clear_inventory', prepare=_prepare_clear(Inventory))
+def clear_inventory_batch(params, state, batch_size):
+    ids = _next_ids(Inventory, state, batch_size)
+    if ids:
+        # Must delete movements and checkpoints first due to foreign key constraints
+        db.session.execute(StockCheckpoint.__table__.delete().where(StockCheckpoint.inventory_id.in_(ids)))
+        db.session.execute(StockMovement.__table__.delete().where(StockMovement.inventory_id.in_(ids)))
+        _delete(Inventory, ids)
+        bump_versions('stock_movement', 'inventory')
+    return state, len(ids), len(ids) < batch_size
@@ -0,0 +1,68 @@
+import hashlib
+import json
+from datetime import date, datetime, timedelta, timezone
+from functools import wraps
+
+from flask import Response, request
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from werkzeug.http import http_date
+
+from utils.cache import table_state
+from utils.metrics import cache_result
+
+
+def _last_modified(state):
+    stamps = [updated_at for _, updated_at in state.values() if updated_at]
+    if not stamps:
+        return None
+    return max(stamps).replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def conditional_get(tables, daily=False):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 from the version counters of
+    `tables` before the wrapped GET loads or serializes any rows. The ETag covers
+    the caller (lists are filtered per user/role) and the query string.
+    Pass `daily` for responses relative to today: the ETag then also covers the
+    date and no Last-Modified is sent. Apply beneath role_required.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            state = table_state(tables)
+            parts = {
+                'endpoint': request.endpoint,
+                'user': get_jwt_identity(),
+                'role': get_jwt().get('role'),
+                'args': sorted(request.args.items(multi=True)),
+                'versions': {name: version for name, (version, _) in state.items()},
+                'today': date.today().isoformat() if daily else None,
+            }
+            etag = hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+            last_modified = None if daily else _last_modified(state)
+            # A timestamp from the current second could still be followed by another
+            # write within that second, so it is not a safe validator yet.
+            if last_modified and datetime.now(timezone.utc) - last_modified < timedelta(seconds=1):
+                last_modified = None
+
+            headers = {'ETag': f'"{etag}"', 'Cache-Control': 'private, no-cache'}
+            if last_modified:
+                headers['Last-Modified'] = http_date(last_modified)
+
+            # If-None-Match takes precedence over If-Modified-Since (RFC 7232 section 6)
+            if request.if_none_match:
+                fresh = request.if_none_match.contains(etag)
+            else:
+                fresh = bool(request.if_modified_since and last_modified and last_modified <= request.if_modified_since)
+            if request.if_none_match or request.if_modified_since:
+                # The client's copy acts as a cache; count whether it could be reused
+                cache_result('conditional_get', fresh)
+            if fresh:
+                return Response(status=304, headers=headers)
+
+            result = f(*args, **kwargs)
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], 200, headers
+            return result
+        return wrapper
+    return decorator
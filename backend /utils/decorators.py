@@ -1,14 +1,28 @@
 from functools import wraps
-from flask_jwt_extended import jwt_required
+from flask import current_app
+from flask_jwt_extended import verify_jwt_in_request, get_jwt, get_jwt_identity
 from utils.helpers import get_current_user, make_response_data
+from utils.auth_state import active_users
+from utils.instrumentation import timed
+
+def has_allowed_role(allowed_roles):
+    if current_app.config.get('AUTH_TRUST_ROLE_CLAIM'):
+        # Fast path: the role claim is signed at login, so no User lookup is needed.
+        # The cached role also catches accounts deactivated or re-roled since login.
+        role = get_jwt().get('role')
+        return role in allowed_roles and active_users.role_of(get_jwt_identity()) == role
+
+    current_user = get_current_user()
+    return bool(current_user and current_user.is_active and current_user.role.value in allowed_roles)
 
 def role_required(*allowed_roles):
     def decorator(f):
         @wraps(f)
-        @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user = get_current_user()
-            if not current_user or current_user.role.value not in allowed_roles:
+            with timed('auth'):
+                verify_jwt_in_request()
+                allowed = has_allowed_role(allowed_roles)
+            if not allowed:
                 return make_response_data(
                     success=False, 
                     message='Access denied: Insufficient permissions.', 
@@ -17,4 +31,4 @@ def role_required(*allowed_roles):
                 )
             return f(*args, **kwargs)
         return decorated_function
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,126 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+
+def _pool_options(config):
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 10),
+    }
+
+
+def _sqlite_profile(config, url):
+    """
+    WAL lets readers keep going while a sale is being committed, and NORMAL
+    synchronous only fsyncs at checkpoints (a power cut can lose the last
+    commits, never corrupt the file). Connections are pooled, so the pragmas
+    run once per connection rather than once per request.
+    """
+    busy_timeout_ms = config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    pragmas = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        f'PRAGMA busy_timeout={int(busy_timeout_ms)}',
+        f"PRAGMA mmap_size={int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+        # Negative sizes are KiB rather than pages
+        f"PRAGMA cache_size=-{int(config.get('SQLITE_CACHE_SIZE_KIB', 64 * 1024))}",
+    ]
+    if config.get('SQLITE_FOREIGN_KEYS'):
+        pragmas.append('PRAGMA foreign_keys=ON')
+    if url.database in (None, '', ':memory:'):
+        # Flask-SQLAlchemy pins in-memory databases to one StaticPool connection
+        return {}, pragmas[1:]
+    options = {
+        'poolclass': QueuePool,
+        **_pool_options(config),
+        # Pooled connections move between request threads, one thread at a time
+        'connect_args': {'check_same_thread': False, 'timeout': busy_timeout_ms / 1000},
+    }
+    return options, pragmas
+
+
+def _postgresql_profile(config, url):
+    """
+    Bounded pool with pre-ping (survives server restarts and idle disconnects)
+    and server-side timeouts so one runaway summary cannot hold a connection
+    or locks indefinitely.
+    """
+    settings = {
+        'statement_timeout': config.get('DB_STATEMENT_TIMEOUT_MS', 30000),
+        'idle_in_transaction_session_timeout': config.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000),
+    }
+    options = {
+        **_pool_options(config),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+        'connect_args': {'options': ' '.join(f'-c {name}={int(value)}' for name, value in settings.items())},
+    }
+    return options, []
+
+
+ENGINE_PROFILES = {
+    'sqlite': _sqlite_profile,
+    'postgresql': _postgresql_profile,
+}
+
+
+def _profile_for(config, url):
+    name = config.get('DATABASE_ENGINE_PROFILE', 'auto')
+    if name == 'auto':
+        name = url.get_backend_name()
+    return ENGINE_PROFILES.get(name)
+
+
+def _merge(options, explicit):
+    connect_args = {**options.get('connect_args', {}), **explicit.get('connect_args', {})}
+    merged = {**options, **explicit}
+    if connect_args:
+        merged['connect_args'] = connect_args
+    return merged
+
+
+def apply_engine_profile(app):
+    """
+    Merge the engine profile (DATABASE_ENGINE_PROFILE: 'auto' picks by database URL,
+    'none' disables) into SQLALCHEMY_ENGINE_OPTIONS and each SQLALCHEMY_BINDS entry.
+    Options set there explicitly win. Call before db.init_app, which creates the engines.
+    """
+    config = app.config
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    profile = _profile_for(config, url)
+    if profile is not None:
+        options, _ = profile(config, url)
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = _merge(options, config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+
+    binds = {}
+    for key, value in (config.get('SQLALCHEMY_BINDS') or {}).items():
+        explicit = dict(value) if isinstance(value, dict) else {'url': value}
+        url = make_url(explicit['url'])
+        profile = _profile_for(config, url)
+        binds[key] = _merge(profile(config, url)[0], explicit) if profile else explicit
+    if binds:
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def register_connection_setup(app):
+    """Run each engine's profile statements on every new connection; call after db.init_app."""
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        profile = _profile_for(app.config, engine.url)
+        statements = profile(app.config, engine.url)[1] if profile else []
+        if statements:
+            event.listen(engine, 'connect', _run_statements(statements))
+
+
+def _run_statements(statements):
+    def setup(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
+    return setup
@@ -1,7 +1,8 @@
+from flask import g
 from flask_jwt_extended import get_jwt_identity
 from models.user import User
 
-def make_response_data(data=None, success=True, message="", errors=None, status_code=200):
+def make_response_data(data=None, success=True, message="", errors=None, status_code=200, meta=None):
     """Return plain dict + status_code (not Flask Response) to support Flask-RESTful."""
     response = {
         "success": success,
@@ -9,8 +10,12 @@ def make_response_data(data=None, success=True, message="", errors=None, status_
         "data": data or {},
         "errors": errors or []
     }
+    if meta is not None:
+        response["meta"] = meta
     return response, status_code  # ✅ NO jsonify()
 
 def get_current_user():
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    """Authenticated user, loaded at most once per request and cached on `g`."""
+    if 'current_user' not in g:
+        g.current_user = User.query.get(get_jwt_identity())
+    return g.current_user
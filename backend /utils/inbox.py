@@ -0,0 +1,143 @@
+from datetime import datetime
+
+from sqlalchemy import event, exists, func, inspect, literal, or_, select
+from sqlalchemy.orm import Session
+
+from models import db, Message, MessageRead, UnreadMessageCount, User
+from utils.cache import bump_versions
+from utils.replica import use_primary
+from utils.sql import upsert_select
+
+
+def inbox_filter(user):
+    """Messages addressed to `user` directly or to their role."""
+    return or_(Message.recipient_id == user.id, Message.recipient_role == user.role)
+
+
+def _not_read_by(user_id):
+    # Correlated to every enclosing statement, however deeply nested
+    return ~exists().where(
+        MessageRead.message_id == Message.id, MessageRead.user_id == user_id
+    ).correlate_except(MessageRead)
+
+
+def _recipients(message):
+    conditions = []
+    if message.recipient_id is not None:
+        conditions.append(User.id == message.recipient_id)
+    if message.recipient_role is not None:
+        conditions.append(User.role == message.recipient_role)
+    return select(User.id).where(or_(*conditions)) if conditions else None
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_unread_counts(session, flush_context):
+    # Same transaction as the message insert, one UPDATE per message however many recipients
+    counts = UnreadMessageCount.__table__
+    for obj in session.new:
+        if isinstance(obj, Message):
+            recipients = _recipients(obj)
+            if recipients is not None:
+                session.connection().execute(
+                    counts.update().where(counts.c.user_id.in_(recipients)).values(unread=counts.c.unread + 1)
+                )
+    # A new role changes which broadcasts are in the inbox; recount on next read
+    stale = [obj.id for obj in session.dirty
+             if isinstance(obj, User) and inspect(obj).attrs.role.history.has_changes()]
+    if stale:
+        session.connection().execute(counts.delete().where(counts.c.user_id.in_(stale)))
+
+
+def recount_unread(user):
+    # Count and store in one statement: a message committed in between would
+    # otherwise be missed by both the count and _maintain_unread_counts
+    count = select(
+        literal(user.id).label('user_id'), func.count(Message.id).label('unread')
+    ).where(inbox_filter(user), _not_read_by(user.id))
+    upsert_select(db.session.connection(), UnreadMessageCount.__table__, ['user_id'], count)
+    return db.session.execute(
+        select(UnreadMessageCount.unread).where(UnreadMessageCount.user_id == user.id)
+    ).scalar()
+
+
+def unread_count(user_id):
+    """
+    A user's unread count from its counter row, recounting once if the row is missing.
+    Read from the primary: the counter is written there, and a lagging replica would
+    report a missing row (and trigger a recount) or a stale count.
+    """
+    with use_primary():
+        unread = db.session.execute(
+            select(UnreadMessageCount.unread).where(UnreadMessageCount.user_id == user_id)
+        ).scalar()
+        if unread is None:
+            unread = recount_unread(db.session.get(User, user_id))
+            db.session.commit()
+    return unread
+
+
+def mark_read(user, message_ids=None):
+    """
+    Record `user` as having read `message_ids` (or the whole inbox when None) with
+    one INSERT ... SELECT that skips messages outside the inbox or already read.
+    Returns the number of messages newly marked read.
+    """
+    query = select(Message.id, literal(user.id), literal(datetime.utcnow())).where(
+        inbox_filter(user), _not_read_by(user.id)
+    )
+    if message_ids is not None:
+        query = query.where(Message.id.in_(message_ids))
+    marked = db.session.execute(
+        MessageRead.__table__.insert().from_select(['message_id', 'user_id', 'read_at'], query)
+    ).rowcount
+    if marked:
+        counts = UnreadMessageCount.__table__
+        db.session.execute(
+            counts.update().where(counts.c.user_id == user.id).values(unread=counts.c.unread - marked)
+        )
+        bump_versions('message_read')
+    return marked
+
+
+def forget_messages(ids):
+    """
+    Take messages about to be deleted out of the unread counters of the recipients
+    who had not read them, then drop their read receipts. Only the counter rows of
+    users the messages were addressed to, directly or by role, are touched.
+    """
+    counts = UnreadMessageCount.__table__
+    removed = select(Message.recipient_id, Message.recipient_role).where(Message.id.in_(ids)).subquery()
+    role = select(User.role).where(User.id == counts.c.user_id).correlate(counts).scalar_subquery()
+    unread = select(func.count(Message.id)).where(
+        Message.id.in_(ids),
+        or_(Message.recipient_id == counts.c.user_id, Message.recipient_role == role),
+        _not_read_by(counts.c.user_id),
+    ).scalar_subquery()
+    addressed = or_(
+        counts.c.user_id.in_(select(removed.c.recipient_id)),
+        counts.c.user_id.in_(select(User.id).where(User.role.in_(select(removed.c.recipient_role)))),
+    )
+    db.session.execute(counts.update().where(addressed).values(unread=counts.c.unread - unread))
+    db.session.execute(MessageRead.__table__.delete().where(MessageRead.message_id.in_(ids)))
+    bump_versions('message_read')
+
+
+def forget_reader(user_id):
+    """Drop a user's read receipts and unread counter; call before deleting the user."""
+    db.session.execute(MessageRead.__table__.delete().where(MessageRead.user_id == user_id))
+    db.session.execute(UnreadMessageCount.__table__.delete().where(UnreadMessageCount.user_id == user_id))
+    bump_versions('message_read')
+
+
+def serialize_for(user, messages):
+    """to_dict() of `messages` with `is_read` reflecting `user`'s own read state."""
+    ids = [message.id for message in messages]
+    read = set(db.session.execute(
+        select(MessageRead.message_id).where(MessageRead.user_id == user.id, MessageRead.message_id.in_(ids))
+    ).scalars()) if ids else set()
+    data = []
+    for message in messages:
+        item = message.to_dict()
+        item['is_read'] = message.id in read
+        data.append(item)
+    return data
@@ -0,0 +1,141 @@
+import json
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+slow_query_log = logging.getLogger('fruittrack.slow_query')
+
+
+class RequestTimings:
+    __slots__ = ('started', 'queries', 'db_seconds', 'segments')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.segments = {}
+
+    def server_timing(self):
+        total = time.perf_counter() - self.started
+        noun = 'query' if self.queries == 1 else 'queries'
+        parts = [f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} {noun}"']
+        parts += [f'{name};dur={seconds * 1000:.1f}' for name, seconds in self.segments.items()]
+        parts.append(f'app;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def _current():
+    return g.get('request_timings') if has_request_context() else None
+
+
+@contextmanager
+def timed(name):
+    """
+    Add the time spent in the block to the request's `name` Server-Timing entry.
+    Queries run inside the block count towards `db` only, so lazy loads during
+    serialization are not reported twice. A no-op when instrumentation is off.
+    """
+    timings = _current()
+    if timings is None:
+        yield
+        return
+    start, db_before = time.perf_counter(), timings.db_seconds
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start - (timings.db_seconds - db_before)
+        timings.segments[name] = timings.segments.get(name, 0.0) + elapsed
+
+
+def timed_representation(output):
+    """Wrap a Flask-RESTful representation so JSON encoding counts as serialization."""
+    def wrapper(data, code, headers=None):
+        with timed('serialize'):
+            return output(data, code, headers)
+    return wrapper
+
+
+class SqlInstrumentation:
+    """
+    Opt-in per-request profiling. With SQL_INSTRUMENTATION on, every response carries
+    a Server-Timing header with the query count and DB time, plus the time spent
+    authorizing (`auth`) and serializing (`serialize`) outside the database, and
+    statements slower than SLOW_QUERY_MS are logged as one JSON object per line.
+    When off, no listeners or hooks are installed.
+
+    Streamed exports send their headers before the rows are read, so their header
+    only covers the work done up to the first chunk.
+    """
+
+    def __init__(self):
+        self.slow_query_ms = None
+
+    def init_app(self, app):
+        if not app.config.get('SQL_INSTRUMENTATION'):
+            return
+        self.slow_query_ms = app.config.get('SLOW_QUERY_MS', 200)
+        log_path = app.config.get('SLOW_QUERY_LOG')
+        if log_path and not any(getattr(handler, 'baseFilename', None) == log_path
+                                for handler in slow_query_log.handlers):
+            handler = logging.FileHandler(log_path)
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            slow_query_log.addHandler(handler)
+
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._before_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_execute)
+            event.listen(engine, 'handle_error', self._execute_failed)
+        app.before_request(self._start_request)
+        app.after_request(self._add_header)
+
+    def _start_request(self):
+        g.request_timings = RequestTimings()
+
+    def _add_header(self, response):
+        timings = g.pop('request_timings', None)
+        if timings is not None:
+            response.headers['Server-Timing'] = timings.server_timing()
+        return response
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _finish_execute(self, conn):
+        duration = time.perf_counter() - conn.info['query_started'].pop()
+        timings = _current()
+        if timings is not None:
+            timings.queries += 1
+            timings.db_seconds += duration
+        return duration
+
+    def _execute_failed(self, exception_context):
+        # after_cursor_execute is skipped when the statement raises; without this the
+        # start time would stay on the connection's stack for as long as it is pooled
+        conn = exception_context.connection
+        if conn is not None and conn.info.get('query_started'):
+            self._finish_execute(conn)
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = self._finish_execute(conn)
+        if duration * 1000 >= self.slow_query_ms:
+            in_request = has_request_context()
+            # Parameters are left out: they can hold password hashes and personal data
+            slow_query_log.warning(json.dumps({
+                'event': 'slow_query',
+                'duration_ms': round(duration * 1000, 1),
+                'endpoint': request.endpoint if in_request else None,
+                'method': request.method if in_request else None,
+                'path': request.path if in_request else None,
+                'statement': ' '.join(statement.split()),
+                'executemany': executemany,
+            }))
+
+
+sql_instrumentation = SqlInstrumentation()
@@ -0,0 +1,246 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import or_, select, update
+
+from models import db, Job
+from utils.helpers import make_response_data
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+
+class JobKind:
+    """
+    A kind of background job. `run_batch(params, state, batch_size)` does one
+    batch of work on db.session without committing and returns
+    `(state, processed, done)`; the runner commits it together with the job's
+    progress and new state. `prepare(params)` returns the initial `(state, total)`
+    and `finish(params, state)` the job's result, both inside the runner's
+    transactions.
+    """
+
+    def __init__(self, name, run_batch, prepare=None, finish=None):
+        self.name = name
+        self.run_batch = run_batch
+        self.prepare = prepare
+        self.finish = finish
+
+
+JOB_KINDS = {}
+
+
+def job_kind(name, prepare=None, finish=None):
+    """Register the decorated function as the `run_batch` of job kind `name`."""
+    def decorator(run_batch):
+        JOB_KINDS[name] = JobKind(name, run_batch, prepare, finish)
+        return run_batch
+    return decorator
+
+
+class LostClaim(RuntimeError):
+    """Another worker reclaimed the job (this one was presumed dead); stop without committing."""
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a per-process thread pool. Enqueued jobs start at once
+    in the enqueuing process; a poller thread also claims queued jobs and jobs
+    whose worker stopped heartbeating for JOB_STALE_SECONDS (e.g. after a
+    restart), so work resumes from the last committed batch. Claims are
+    conditional UPDATEs, so several gunicorn workers can share the queue.
+    With JOB_WORKERS = 0 nothing runs in the web process; use `flask jobs run`.
+    """
+
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._running = 0
+
+    def init_app(self, app):
+        self.app = app
+        app.before_request(self._ensure_started)
+
+    def _ensure_started(self):
+        # First request of each process: resume jobs a previous process left unfinished
+        if self._pid != os.getpid():
+            self.wake(current_app._get_current_object())
+
+    def _config(self, name, default):
+        return self.app.config.get(name, default)
+
+    def _start(self):
+        # Lazily, so every forked server worker gets its own threads
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._running = 0
+                self._executor = ThreadPoolExecutor(max_workers=self._config('JOB_WORKERS', 2),
+                                                    thread_name_prefix='job')
+                threading.Thread(target=self._poll, name='job-poller', daemon=True).start()
+        return self._executor
+
+    def wake(self, app=None):
+        """Try to start queued jobs now, in `app` (default: the one passed to init_app)."""
+        app = app or self.app
+        if app is None or not self._config('JOB_WORKERS', 2):
+            return
+        executor = self._start()
+        with self._lock:
+            if self._running >= self._config('JOB_WORKERS', 2):
+                return  # a running job's thread picks up more work when it finishes
+            self._running += 1
+        executor.submit(self._work, app)
+
+    def _poll(self):
+        while True:
+            time.sleep(self._config('JOB_POLL_INTERVAL', 5))
+            self.wake()
+
+    def _work(self, app):
+        try:
+            with app.app_context():
+                run_pending()
+        finally:
+            with self._lock:
+                self._running -= 1
+
+
+job_runner = JobRunner()
+
+
+def _worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+
+
+def enqueue_job(kind, params=None, user_id=None, start=True):
+    """Queue a job, commit, and (with `start`) start it in the background. Returns the Job."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}'.")
+    job = Job(kind=kind, status='queued', params=params or {}, created_by=user_id)
+    db.session.add(job)
+    db.session.commit()
+    if start:
+        job_runner.wake(current_app._get_current_object())
+    return job
+
+
+def job_accepted(job, message):
+    """202 response for an enqueued job, pointing at its status endpoint."""
+    body, status = make_response_data(data=job.to_dict(), message=message, status_code=202)
+    return body, status, {'Location': f'/api/jobs/{job.id}'}
+
+
+def _claimable(stale_before):
+    return or_(Job.status == 'queued', (Job.status == 'running') & (Job.heartbeat_at < stale_before))
+
+
+def claim_next(worker):
+    """Claim the oldest runnable job for `worker`; returns its id or None."""
+    stale_before = datetime.utcnow() - timedelta(seconds=current_app.config.get('JOB_STALE_SECONDS', 60))
+    while True:
+        job_id = db.session.execute(
+            select(Job.id).where(_claimable(stale_before)).order_by(Job.id).limit(1)
+        ).scalar()
+        if job_id is None:
+            return None
+        now = datetime.utcnow()
+        # Repeats the predicate so only one worker wins a race for the same row
+        claimed = db.session.execute(
+            update(Job).where(Job.id == job_id, _claimable(stale_before)).values(
+                status='running', claimed_by=worker, heartbeat_at=now, attempts=Job.attempts + 1,
+                started_at=db.func.coalesce(Job.started_at, now),
+            ).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+
+
+def _heartbeat(job_id, worker, **values):
+    # Fails if a stale-job reclaim handed the job to another worker meanwhile
+    updated = db.session.execute(
+        update(Job).where(Job.id == job_id, Job.claimed_by == worker)
+        .values(heartbeat_at=datetime.utcnow(), **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not updated:
+        raise LostClaim(f'Job {job_id} was claimed by another worker.')
+
+
+def run_job(job_id, worker):
+    """Run a claimed job batch by batch until it finishes, fails or is lost."""
+    job = db.session.get(Job, job_id)
+    kind = JOB_KINDS.get(job.kind)
+    params = job.params or {}
+    batch_size = current_app.config.get('JOB_BATCH_SIZE', 1000)
+    try:
+        if kind is None:
+            raise ValueError(f"Unknown job kind '{job.kind}'.")
+        if job.attempts > current_app.config.get('JOB_MAX_ATTEMPTS', 3):
+            raise RuntimeError(f'Gave up after {job.attempts - 1} interrupted attempts.')
+        state, progress = job.state, job.progress
+        if state is None:
+            state, total = kind.prepare(params) if kind.prepare else ({}, None)
+            _heartbeat(job_id, worker, state=state, total=total)
+            db.session.commit()
+        while True:
+            state, processed, done = kind.run_batch(params, state, batch_size)
+            progress += processed
+            if not done:
+                _heartbeat(job_id, worker, state=state, progress=progress)
+                db.session.commit()
+                continue
+            result = kind.finish(params, state) if kind.finish else None
+            _heartbeat(job_id, worker, state=state, progress=progress, status='succeeded',
+                       result=result if result is not None else {'processed': progress},
+                       finished_at=datetime.utcnow())
+            db.session.commit()
+            return
+    except LostClaim:
+        db.session.rollback()
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception('Job %s failed', job_id)
+        try:
+            _heartbeat(job_id, worker, status='failed', error=str(e), finished_at=datetime.utcnow())
+            db.session.commit()
+        except LostClaim:
+            db.session.rollback()
+
+
+def run_pending(limit=None):
+    """Claim and run jobs until none are runnable (or `limit` ran). Returns how many ran."""
+    worker, ran = _worker_name(), 0
+    while limit is None or ran < limit:
+        job_id = claim_next(worker)
+        if job_id is None:
+            break
+        run_job(job_id, worker)
+        db.session.remove()
+        ran += 1
+    return ran
+
+
+jobs_cli = AppGroup('jobs', help='Run background jobs outside the web process.')
+
+
+@jobs_cli.command('run')
+@click.option('--forever', is_flag=True, help='Keep polling for new jobs instead of exiting when idle.')
+def run_command(forever):
+    """Run queued (and stale) jobs in this process."""
+    while True:
+        ran = run_pending()
+        if ran:
+            click.echo(f'Ran {ran} job(s)')
+        if not forever:
+            break
+        time.sleep(current_app.config.get('JOB_POLL_INTERVAL', 5))
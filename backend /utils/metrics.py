@@ -0,0 +1,106 @@
+import hmac
+import os
+import time
+
+from flask import Response, current_app, g, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+from models import db
+
+# prometheus_client switches to file-backed values when PROMETHEUS_MULTIPROC_DIR is set
+# (one file per worker, summed at scrape time), so metrics stay correct under gunicorn
+# whichever worker answers /metrics. Gauges therefore declare how workers combine.
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time until the response headers were ready, by resource and method.',
+    ['resource', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+REQUESTS = Counter('http_requests_total', 'Responses by resource, method and status code.',
+                   ['resource', 'method', 'status'])
+IN_PROGRESS = Gauge('http_requests_in_progress', 'Requests being handled.', multiprocess_mode='livesum')
+POOL_IN_USE = Gauge('db_pool_connections_in_use', 'Database connections checked out of the pool.',
+                    multiprocess_mode='livesum')
+POOL_SIZE = Gauge('db_pool_size', 'Persistent connections the pools may hold (QueuePool only).',
+                  multiprocess_mode='livesum')
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache and result (hit or miss).',
+                         ['cache', 'result'])
+
+
+def cache_result(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+class Metrics:
+    """
+    Prometheus metrics for the API: request latency and status counts per
+    Flask-RESTful resource and method, in-flight requests, pool usage and cache
+    hit rates, exposed at /metrics. Streamed exports are timed to their first chunk.
+    """
+
+    def __init__(self):
+        self._labels = {}
+        self._pool_sized_pid = None
+        self._engines = []
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        with app.app_context():
+            engines = list(db.engines.values())
+        for engine in engines:
+            event.listen(engine, 'checkout', lambda *args: POOL_IN_USE.inc())
+            event.listen(engine, 'checkin', lambda *args: POOL_IN_USE.dec())
+        self._engines = engines
+
+        app.before_request(self._start_request)
+        app.after_request(self._record_response)
+        app.teardown_request(self._finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _resource(self):
+        # The resource class name, not the path, so ids in URLs don't create new series
+        endpoint = request.endpoint
+        if endpoint not in self._labels:
+            view = current_app.view_functions.get(endpoint)
+            view_class = getattr(view, 'view_class', None)
+            self._labels[endpoint] = view_class.__name__ if view_class else (endpoint or 'unmatched')
+        return self._labels[endpoint]
+
+    def _start_request(self):
+        if self._pool_sized_pid != os.getpid():
+            # Once per worker process, after any fork
+            self._pool_sized_pid = os.getpid()
+            POOL_SIZE.set(sum(engine.pool.size() for engine in self._engines if isinstance(engine.pool, QueuePool)))
+        g.metrics_started = time.perf_counter()
+        IN_PROGRESS.inc()
+
+    def _record_response(self, response):
+        started = g.get('metrics_started')
+        if started is not None:
+            resource, method = self._resource(), request.method
+            REQUEST_LATENCY.labels(resource, method).observe(time.perf_counter() - started)
+            REQUESTS.labels(resource, method, str(response.status_code)).inc()
+        return response
+
+    def _finish_request(self, exc):
+        if g.pop('metrics_started', None) is not None:
+            IN_PROGRESS.dec()
+
+    def metrics_view(self):
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return jsonify({'success': False, 'message': 'Invalid metrics token', 'error': 'authorization_required'}), 401
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+metrics = Metrics()
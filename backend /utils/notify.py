@@ -0,0 +1,75 @@
+import threading
+import time
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from models import db, TableVersion
+
+
+class TableChangeNotifier:
+    """
+    Lets long-poll requests sleep until a table's version counter moves.
+
+    Waiters share one cached copy of the counter, re-read from the database at most
+    once per `check_interval` seconds, so an idle process costs one primary-key
+    lookup per interval however many clients are waiting. Commits made by this
+    process wake its waiters immediately; commits from other workers are seen on
+    the next re-read.
+    """
+
+    def __init__(self, table, check_interval=1.0, interval_config=None):
+        self.table = table
+        self.check_interval = check_interval
+        self.interval_config = interval_config  # config key overriding check_interval
+        self._version = None
+        self._checked_at = None
+        self._condition = threading.Condition()
+
+    def init_app(self, app):
+        if self.interval_config:
+            self.check_interval = app.config.get(self.interval_config, self.check_interval)
+
+    def version(self):
+        with self._condition:
+            stale = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+            if stale:
+                # Own short-lived connection, so waiting requests hold no session connection
+                with db.engine.connect() as connection:
+                    self._version = connection.execute(
+                        select(TableVersion.version).where(TableVersion.name == self.table)
+                    ).scalar() or 0
+                self._checked_at = time.monotonic()
+            return self._version
+
+    def wait_for_change(self, seen_version, timeout):
+        """Block until the version differs from `seen_version` or `timeout` passes; returns the version."""
+        deadline = time.monotonic() + timeout
+        while True:
+            version = self.version()
+            remaining = deadline - time.monotonic()
+            if version != seen_version or remaining <= 0:
+                return version
+            with self._condition:
+                self._condition.wait(min(remaining, self.check_interval))
+
+    def notify(self):
+        with self._condition:
+            self._checked_at = None
+            self._condition.notify_all()
+
+
+message_changes = TableChangeNotifier('message', interval_config='MESSAGE_POLL_CHECK_INTERVAL')
+NOTIFIERS = {notifier.table: notifier for notifier in (message_changes,)}
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_committed_tables(session):
+    for table in session.info.pop('bumped_tables', ()):
+        if table in NOTIFIERS:
+            NOTIFIERS[table].notify()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_bumped_tables(session):
+    session.info.pop('bumped_tables', None)
@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import date, datetime, timedelta
+from flask_restful import reqparse
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def list_parser(*extra_args):
+    """Query-string parser shared by the list endpoints: cursor, limit, date range plus any extra filters."""
+    parser = reqparse.RequestParser()
+    parser.add_argument('cursor', type=str, location='args')
+    parser.add_argument('limit', type=int, location='args', default=DEFAULT_PAGE_SIZE)
+    parser.add_argument('date_from', type=str, location='args')
+    parser.add_argument('date_to', type=str, location='args')
+    for name, arg_type in extra_args:
+        parser.add_argument(name, type=arg_type, location='args')
+    return parser
+
+
+def parse_date_arg(value, field):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise PaginationError(f"Invalid date format for {field}. Use YYYY-MM-DD.")
+
+
+def apply_date_range(query, column, date_from, date_to):
+    """Filter `column` to [date_from, date_to]; DateTime columns include the whole of date_to."""
+    start = parse_date_arg(date_from, 'date_from')
+    end = parse_date_arg(date_to, 'date_to')
+    is_datetime = column.type.python_type is datetime
+    if start:
+        query = query.filter(column >= (datetime.combine(start, datetime.min.time()) if is_datetime else start))
+    if end:
+        if is_datetime:
+            query = query.filter(column < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+        else:
+            query = query.filter(column <= end)
+    return query
+
+
+def encode_cursor(sort_value, row_id):
+    raw = json.dumps([sort_value.isoformat() if sort_value else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, column):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if sort_value is not None:
+            parse = datetime.fromisoformat if column.type.python_type is datetime else date.fromisoformat
+            sort_value = parse(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise PaginationError("Invalid pagination cursor.")
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Newest-first keyset pagination over (sort_column, id_column).
+    Returns (rows, meta) where meta carries the cursor for the next page.
+    """
+    if limit is None or limit < 1:
+        limit = DEFAULT_PAGE_SIZE
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column)
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists without a COUNT(*)
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return rows, {'limit': limit, 'next_cursor': next_cursor, 'has_more': has_more}
@@ -0,0 +1,105 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:260000'
+DEFAULT_SALT_LENGTH = 16
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when the verification pool is saturated; callers should answer 503."""
+
+
+def _policy():
+    config = current_app.config
+    return (config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+            config.get('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH))
+
+
+def hash_password(password):
+    """Hash with the configured policy (method string with cost, and salt length)."""
+    method, salt_length = _policy()
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+_policy_prefixes = {}
+
+
+def needs_rehash(password_hash):
+    """True if `password_hash` was produced under a different method, cost or salt length."""
+    policy = _policy()
+    if policy not in _policy_prefixes:
+        # werkzeug fills in default costs, so compare against a hash it actually produced
+        method, salt, _ = generate_password_hash('', method=policy[0], salt_length=policy[1]).split('$', 2)
+        _policy_prefixes[policy] = (method, len(salt))
+    parts = (password_hash or '').split('$', 2)
+    return len(parts) != 3 or (parts[0], len(parts[1])) != _policy_prefixes[policy]
+
+
+class PasswordPool:
+    """
+    Runs password hashing and verification in a small process pool so a burst of
+    logins uses at most `workers` cores and never holds the GIL that other request
+    threads need. At most `max_pending` jobs may be queued or running; beyond that
+    callers get PasswordPoolBusy instead of waiting. With 0 workers jobs run inline.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._executor is None:
+                config = current_app.config
+                workers = config.get('PASSWORD_POOL_WORKERS', 2)
+                # Created lazily so each server worker process gets its own pool after fork.
+                # The children only ever run hashing functions from this module.
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+                self._slots = threading.BoundedSemaphore(config.get('PASSWORD_POOL_MAX_PENDING', 64))
+        return self._executor
+
+    def run(self, fn, *args):
+        config = current_app.config
+        if not config.get('PASSWORD_POOL_WORKERS', 2):
+            return fn(*args)
+        executor = self._start()
+        if not self._slots.acquire(timeout=config.get('PASSWORD_POOL_QUEUE_TIMEOUT', 0.5)):
+            raise PasswordPoolBusy("Too many concurrent logins, please retry shortly.")
+        try:
+            return executor.submit(fn, *args).result(timeout=config.get('PASSWORD_POOL_TIMEOUT', 10))
+        except FutureTimeoutError:
+            raise PasswordPoolBusy("Password verification timed out, please retry shortly.")
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+password_pool = PasswordPool()
+
+
+def verify_password(password_hash, password):
+    """check_password_hash on the process pool; may raise PasswordPoolBusy."""
+    if not password_hash:
+        return False
+    return password_pool.run(check_password_hash, password_hash, password)
+
+
+def rehash_password(password):
+    """hash_password on the process pool, for rehash-on-login."""
+    method, salt_length = _policy()
+    return password_pool.run(_generate, password, method, salt_length)
+
+
+def _generate(password, method, salt_length):
+    # Module-level so it can be pickled into the pool
+    return generate_password_hash(password, method=method, salt_length=salt_length)
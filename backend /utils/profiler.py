@@ -0,0 +1,160 @@
+import cProfile
+import glob
+import io
+import itertools
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+from flask import g, request
+from flask_jwt_extended import verify_jwt_in_request
+
+from utils.decorators import has_allowed_role
+
+PROFILE_ID = re.compile(r'^[0-9]{8}T[0-9]{6}-[0-9]+-[0-9]+$')
+
+
+class RequestProfiler:
+    """
+    Profiles single requests on demand: those sent by a CEO with the PROFILE_HEADER
+    header, plus a PROFILE_SAMPLE_RATE share of all requests. Each profile is written
+    to PROFILE_DIR as `<id>.pstats` (cProfile), `<id>.txt` (top functions and top
+    allocations from tracemalloc) and `<id>.json` (request metadata); only the newest
+    PROFILE_MAX_FILES are kept. The id is returned in the X-Profile-Id header.
+
+    Unprofiled requests cost a header lookup (and a random draw when sampling).
+    tracemalloc is process-wide, so a worker profiles one request at a time and
+    skips the others. Streamed exports are profiled up to their first chunk.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self._busy = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def init_app(self, app):
+        config = app.config
+        if not config.get('PROFILER_ENABLED', True):
+            return
+        self.header = config.get('PROFILE_HEADER', 'X-Profile')
+        self.sample_rate = config.get('PROFILE_SAMPLE_RATE', 0.0)
+        self.max_files = max(1, config.get('PROFILE_MAX_FILES', 50))
+        self.top = config.get('PROFILE_TOP_ENTRIES', 30)
+        self.directory = config.get('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+        os.makedirs(self.directory, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._abandon)
+
+    def _requested(self):
+        if self.header in request.headers:
+            try:
+                verify_jwt_in_request(optional=True)
+            except Exception:
+                return False  # the resource itself will reject the token
+            return has_allowed_role(('ceo',))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _start(self):
+        if not self._requested() or not self._busy.acquire(blocking=False):
+            return
+        g.profile_trace_memory = not tracemalloc.is_tracing()
+        if g.profile_trace_memory:
+            tracemalloc.start()
+        g.profile = cProfile.Profile()
+        g.profile_started = time.perf_counter()
+        g.profile.enable()
+
+    def _stop(self):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return None, None
+        profile.disable()
+        snapshot = None
+        if g.pop('profile_trace_memory'):
+            snapshot = tracemalloc.take_snapshot(), tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self._busy.release()
+        return profile, snapshot
+
+    def _finish(self, response):
+        if 'profile' not in g:
+            return response
+        duration = time.perf_counter() - g.pop('profile_started')
+        profile, snapshot = self._stop()
+        profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}-{next(self._sequence):06d}"
+        self._write(profile_id, profile, snapshot, {
+            'id': profile_id,
+            'created_at': datetime.utcnow().isoformat(),
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'sampled': self.header not in request.headers,
+        })
+        response.headers['X-Profile-Id'] = profile_id
+        return response
+
+    def _abandon(self, exc):
+        # The request failed before after_request ran; don't leave the profilers on
+        self._stop()
+
+    def _write(self, profile_id, profile, snapshot, meta):
+        base = os.path.join(self.directory, profile_id)
+        profile.dump_stats(base + '.pstats')
+
+        report = io.StringIO()
+        report.write(f"{meta['method']} {meta['path']} -> {meta['status']} in {meta['duration_ms']} ms\n\n")
+        pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(self.top)
+        if snapshot is not None:
+            allocations, peak = snapshot
+            meta['peak_kib'] = round(peak / 1024, 1)
+            report.write(f"Top allocations (peak traced memory {meta['peak_kib']} KiB)\n")
+            for stat in allocations.statistics('lineno')[:self.top]:
+                report.write(f'{stat}\n')
+        with open(base + '.txt', 'w') as handle:
+            handle.write(report.getvalue())
+        # Metadata last: listing only shows profiles whose files are complete
+        with open(base + '.json', 'w') as handle:
+            json.dump(meta, handle)
+        self._prune()
+
+    def _prune(self):
+        # Ids start with their UTC timestamp, so name order is age order
+        profiles = sorted(glob.glob(os.path.join(self.directory, '*.json')))
+        for stale in profiles[:-self.max_files]:
+            for path in glob.glob(stale[:-len('.json')] + '.*'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass  # pruned concurrently by another worker
+
+    def profiles(self):
+        """Metadata of the stored profiles, newest first."""
+        profiles = []
+        if self.directory is None:
+            return profiles
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            try:
+                with open(path) as handle:
+                    profiles.append(json.load(handle))
+            except (FileNotFoundError, ValueError):
+                continue
+        return sorted(profiles, key=lambda meta: meta['created_at'], reverse=True)
+
+    def path(self, profile_id, kind):
+        """File of a stored profile (`kind` is 'pstats' or 'txt'), or None."""
+        if self.directory is None or not PROFILE_ID.match(profile_id):
+            return None
+        path = os.path.join(self.directory, f'{profile_id}.{kind}')
+        return path if os.path.exists(path) else None
+
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,154 @@
+import sqlite3
+import time
+from contextlib import contextmanager
+
+import click
+from flask import current_app, g, has_request_context, request
+from flask.cli import AppGroup
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+REPLICA_BIND = 'replica'
+PRIMARY_COOKIE = 'primary_until'
+
+
+def _reading_from_replica():
+    return has_request_context() and g.get('use_replica', False)
+
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs to the read replica while the current request is routed there
+    (see ReadReplicaRouter). Flushes, DML, raw connections (`session.connection()`,
+    used for upserts and version bumps) and everything outside such requests use
+    the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and _reading_from_replica()
+                and clause is not None and getattr(clause, 'is_select', False)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary inside the block, e.g. for security state that must not lag."""
+    routed = _reading_from_replica()
+    if routed:
+        g.use_replica = False
+    try:
+        yield
+    finally:
+        if routed:
+            g.use_replica = True
+
+
+def configure_read_replica(app):
+    """Add the replica bind when READ_REPLICA_ENABLED; call before db.init_app."""
+    url = app.config.get('DATABASE_REPLICA_URL')
+    if app.config.get('READ_REPLICA_ENABLED') and url:
+        app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), REPLICA_BIND: url}
+
+
+class ReadReplicaRouter:
+    """
+    Routes GET requests to Flask-RESTful resources to the replica, unless the
+    resource sets `replica_reads = False` or the caller committed a write within
+    the last READ_YOUR_WRITES_SECONDS. Writers are remembered per process by user
+    id and across workers by a short-lived cookie, so a seller who just recorded
+    a sale sees it in their list even before the replica catches up.
+    """
+
+    def __init__(self):
+        self.window = 5
+        self._recent_writers = {}
+
+    def init_app(self, app):
+        if REPLICA_BIND not in app.config.get('SQLALCHEMY_BINDS', {}):
+            return
+        self.window = app.config.get('READ_YOUR_WRITES_SECONDS', 5)
+        app.before_request(self._route)
+        app.after_request(self._remember_writer)
+
+    def _identity(self):
+        try:
+            verify_jwt_in_request(optional=True)
+            return get_jwt_identity()
+        except Exception:
+            return None  # the resource reports bad tokens itself
+
+    def _route(self):
+        g.use_replica = False
+        if request.method not in ('GET', 'HEAD'):
+            return
+        view_class = getattr(current_app.view_functions.get(request.endpoint), 'view_class', None)
+        if view_class is None or not getattr(view_class, 'replica_reads', True):
+            return
+        try:
+            if float(request.cookies.get(PRIMARY_COOKIE, 0)) > time.time():
+                return
+        except ValueError:
+            pass
+        user_id = self._identity()
+        if user_id is not None and self._recent_writers.get(user_id, 0) > time.monotonic():
+            return
+        g.use_replica = True
+
+    def _remember_writer(self, response):
+        if g.pop('committed', False):
+            user_id = self._identity()
+            if user_id is not None:
+                now = time.monotonic()
+                self._recent_writers[user_id] = now + self.window
+                if len(self._recent_writers) > 10000:
+                    self._recent_writers = {key: until for key, until in self._recent_writers.items() if until > now}
+            response.set_cookie(PRIMARY_COOKIE, str(time.time() + self.window), max_age=int(self.window) + 1,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+@event.listens_for(OrmSession, 'after_commit')
+def _flag_commit(session):
+    # Read by ReadReplicaRouter after the request to pin the writer to the primary
+    if has_request_context():
+        g.committed = True
+
+
+read_replica = ReadReplicaRouter()
+
+
+# ---------------------------------------------------------------------------
+# Local stand-in: two SQLite files, the replica refreshed by copying
+# ---------------------------------------------------------------------------
+
+replica_cli = AppGroup('replica', help='Local SQLite read-replica stand-in.')
+
+
+@replica_cli.command('sync')
+@click.option('--every', type=float, help='Keep copying every N seconds, to mimic replication lag.')
+def sync_replica(every):
+    """Copy the primary SQLite database into the replica file."""
+    from models import db  # models imports RoutingSession from here
+    engines = db.engines
+    if REPLICA_BIND not in engines:
+        raise click.ClickException('Set READ_REPLICA_ENABLED and DATABASE_REPLICA_URL first.')
+    primary, replica = engines[None].url, engines[REPLICA_BIND].url
+    if primary.get_backend_name() != 'sqlite' or replica.get_backend_name() != 'sqlite':
+        raise click.ClickException('sync only copies SQLite files; use real replication for other databases.')
+    while True:
+        source, target = sqlite3.connect(primary.database), sqlite3.connect(replica.database)
+        try:
+            # Online backup: consistent even while the app is writing to the primary
+            source.backup(target)
+        finally:
+            source.close()
+            target.close()
+        click.echo(f'Copied {primary.database} -> {replica.database}')
+        if not every:
+            break
+        time.sleep(every)
@@ -0,0 +1,255 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import and_, event, func, inspect, select, union_all
+from sqlalchemy.orm import Session
+
+from models import db, Sale, Purchase, DailySalesRollup, DailyPurchaseRollup, SaleArchive, PurchaseArchive
+from utils.sql import upsert_increment
+from utils.cache import bump_versions
+from utils.jobs import job_kind
+
+
+class RollupSpec:
+    """How rows of `source` fold into `rollup`: key columns and summed measures."""
+
+    def __init__(self, source, rollup, keys, count_column, sums, archive=None):
+        self.source = source
+        self.rollup = rollup
+        self.archive = archive            # rows moved out of `source` by utils.archive, still counted
+        self.keys = keys                  # rollup column -> source attribute
+        self.count_column = count_column  # rollup column holding the row count
+        self.sums = sums                  # rollup column -> summed source attribute
+
+    @property
+    def attributes(self):
+        return set(self.keys.values()) | set(self.sums.values())
+
+    def all_rows(self, day_from=None, day_to=None):
+        """Subquery over the key and summed columns of `source` and its archive table."""
+        columns = [*self.keys.values(), *self.sums.values()]
+        selects = []
+        for model in (self.source, self.archive):
+            if model is None:
+                continue
+            table = model.__table__
+            query = select(*[table.c[column] for column in columns])
+            if day_from is not None:
+                # Filtered per branch so each one can use its date index
+                query = query.where(table.c[self.keys['day']].between(day_from, day_to))
+            selects.append(query)
+        return union_all(*selects).subquery()
+
+
+SALES_ROLLUP = RollupSpec(
+    Sale, DailySalesRollup,
+    keys={'day': 'sale_date', 'fruit_type': 'fruit_type', 'seller_id': 'seller_id', 'unit': 'unit'},
+    count_column='sale_count',
+    sums={'total_revenue': 'revenue', 'total_quantity': 'quantity'},
+    archive=SaleArchive,
+)
+PURCHASES_ROLLUP = RollupSpec(
+    Purchase, DailyPurchaseRollup,
+    keys={'day': 'purchase_date', 'fruit_type': 'fruit_type', 'purchaser_id': 'purchaser_id', 'unit': 'unit'},
+    count_column='purchase_count',
+    sums={'total_cost': 'cost', 'total_quantity': 'quantity'},
+    archive=PurchaseArchive,
+)
+ROLLUPS = (SALES_ROLLUP, PURCHASES_ROLLUP)
+
+
+def _new_values(spec, obj):
+    key = tuple(getattr(obj, attr) for attr in spec.keys.values())
+    measures = {column: getattr(obj, attr) or 0 for column, attr in spec.sums.items()}
+    return key, measures
+
+
+def _stored_values(spec, connection, ids, model=None):
+    """Key and measures of rows as currently stored, read straight from the table."""
+    source = (model or spec.source).__table__
+    columns = [source.c[attr] for attr in spec.keys.values()] + [source.c[attr] for attr in spec.sums.values()]
+    rows = connection.execute(select(*columns).where(source.c.id.in_(ids))).all()
+    width = len(spec.keys)
+    return [
+        (tuple(row[:width]), {column: amount or 0 for column, amount in zip(spec.sums, row[width:])})
+        for row in rows
+    ]
+
+
+def _is_changed(spec, obj):
+    state = inspect(obj)
+    return any(state.attrs[attr].history.has_changes() for attr in spec.attributes)
+
+
+def _add(deltas, spec, key, measures, sign):
+    bucket = deltas[spec][key]
+    bucket[spec.count_column] += sign
+    for column, amount in measures.items():
+        bucket[column] += sign * amount
+
+
+def _empty_deltas():
+    return {spec: defaultdict(lambda: defaultdict(float)) for spec in ROLLUPS}
+
+
+def apply_delta(connection, spec, key, delta):
+    """Add `delta` to the rollup row for `key`, creating it if needed (upsert)."""
+    table = spec.rollup.__table__
+    key_values = dict(zip(spec.keys, key))
+    delta = {column: amount for column, amount in delta.items() if amount}
+    if not delta:
+        return
+
+    # Columns absent from the delta still need a value if the row is created
+    upsert_increment(connection, table, key_values, {
+        column: delta.get(column, 0) for column in [spec.count_column, *spec.sums]
+    })
+
+    # A bucket whose last row was removed carries no information
+    if delta.get(spec.count_column, 0) < 0:
+        connection.execute(table.delete().where(and_(
+            *[table.c[column] == value for column, value in key_values.items()],
+            table.c[spec.count_column] <= 0,
+        )))
+
+
+@event.listens_for(Session, 'before_flush')
+def _snapshot_removed_rows(session, flush_context, instances):
+    # Deleted rows leave the rollup right away: a bucket they empty must be gone before
+    # the flush deletes the seller or purchaser it points at (user deletes cascade to
+    # their sales and purchases). Old values of changed rows are read from the table
+    # before the flush overwrites them; attribute history is not enough because expired
+    # attributes carry no previous value.
+    deltas = _empty_deltas()
+    for spec in ROLLUPS:
+        deleted = [obj.id for obj in session.deleted if isinstance(obj, spec.source) and obj.id is not None]
+        if deleted:
+            apply_deleted_rows(spec, session.connection(), deleted)
+        changed = [obj.id for obj in session.dirty
+                   if isinstance(obj, spec.source) and obj not in session.deleted and _is_changed(spec, obj)]
+        if changed:
+            for key, measures in _stored_values(spec, session.connection(), changed):
+                _add(deltas, spec, key, measures, -1)
+    session.info['rollup_deltas'] = deltas
+
+
+@event.listens_for(Session, 'after_flush')
+def _maintain_rollups(session, flush_context):
+    # Runs inside the flush's transaction, so rollups commit or roll back with the rows
+    deltas = session.info.pop('rollup_deltas', None) or _empty_deltas()
+    for spec in ROLLUPS:
+        for obj in session.new:
+            if isinstance(obj, spec.source):
+                _add(deltas, spec, *_new_values(spec, obj), 1)
+        for obj in session.dirty:
+            if isinstance(obj, spec.source) and obj not in session.deleted and _is_changed(spec, obj):
+                _add(deltas, spec, *_new_values(spec, obj), 1)
+
+    for spec, by_key in deltas.items():
+        if not by_key:
+            continue
+        connection = session.connection()
+        for key, delta in by_key.items():
+            apply_delta(connection, spec, key, delta)
+
+
+def apply_inserted_rows(spec, connection, rows):
+    """Fold rows written by a bulk INSERT (which bypasses flush events) into the rollup."""
+    deltas = _empty_deltas()
+    for row in rows:
+        key = tuple(row[attr] for attr in spec.keys.values())
+        measures = {column: row[attr] or 0 for column, attr in spec.sums.items()}
+        _add(deltas, spec, key, measures, 1)
+    for key, delta in deltas[spec].items():
+        apply_delta(connection, spec, key, delta)
+
+
+def apply_deleted_rows(spec, connection, ids, model=None):
+    """
+    Take rows about to be removed by a bulk DELETE (which bypasses flush events) out of
+    the rollup. `model` is where they are stored when not `spec.source`: its archive.
+    """
+    deltas = _empty_deltas()
+    for key, measures in _stored_values(spec, connection, ids, model):
+        _add(deltas, spec, key, measures, -1)
+    for key, delta in deltas[spec].items():
+        apply_delta(connection, spec, key, delta)
+
+
+def clear_rollup(spec):
+    """Empty a rollup table; call alongside bulk deletes that bypass the ORM."""
+    return db.session.execute(spec.rollup.__table__.delete())
+
+
+def rebuild_rollup(spec, day_from=None, day_to=None):
+    """
+    Recompute a rollup table from its source and archive tables with one
+    INSERT ... SELECT; with `day_from`/`day_to`, only the days in that range.
+    """
+    source = spec.all_rows(day_from, day_to)
+    target = spec.rollup.__table__
+    key_columns = [source.c[attr] for attr in spec.keys.values()]
+    query = select(
+        *key_columns,
+        func.count(),
+        *[func.coalesce(func.sum(source.c[attr]), 0) for attr in spec.sums.values()],
+    ).group_by(*key_columns)
+
+    if day_from is None:
+        clear_rollup(spec)
+    else:
+        db.session.execute(target.delete().where(target.c.day.between(day_from, day_to)))
+    db.session.execute(target.insert().from_select([*spec.keys, spec.count_column, *spec.sums], query))
+
+
+def _day_bounds(spec):
+    """First and last day present in the source, archive or rollup table, or (None, None)."""
+    columns = [spec.rollup.__table__.c.day] + [
+        model.__table__.c[spec.keys['day']] for model in (spec.source, spec.archive) if model is not None]
+    bounds = [db.session.execute(select(func.min(column), func.max(column))).one() for column in columns]
+    days = [day for pair in bounds for day in pair if day is not None]
+    return (min(days), max(days)) if days else (None, None)
+
+
+def _prepare_rebuild(params):
+    ranges = []
+    for index, spec in enumerate(ROLLUPS):
+        first, last = _day_bounds(spec)
+        if first is not None:
+            ranges.append([index, first.isoformat(), last.isoformat()])
+    total = sum((date.fromisoformat(last) - date.fromisoformat(first)).days + 1 for _, first, last in ranges)
+    return {'ranges': ranges}, total
+
+
+def _finish_rebuild(params, state):
+    # Rollup tables are unversioned; cached summaries are keyed on their source tables
+    bump_versions(*(spec.source.__tablename__ for spec in ROLLUPS))
+
+
+@job_kind('rebuild_rollups', prepare=_prepare_rebuild, finish=_finish_rebuild)
+def rebuild_rollups_batch(params, state, batch_size):
+    """Rebuild ROLLUP_REBUILD_DAYS days of one rollup per batch; progress counts days."""
+    ranges = state['ranges']
+    if not ranges:
+        return state, 0, True
+    index, first, last = ranges[0]
+    first, last = date.fromisoformat(first), date.fromisoformat(last)
+    stop = min(last, first + timedelta(days=current_app.config.get('ROLLUP_REBUILD_DAYS', 31) - 1))
+    rebuild_rollup(ROLLUPS[index], first, stop)
+    remaining = ranges[1:] if stop == last else [[index, (stop + timedelta(days=1)).isoformat(), last.isoformat()], *ranges[1:]]
+    return {'ranges': remaining}, (stop - first).days + 1, not remaining
+
+
+rollup_cli = AppGroup('rollups', help='Maintain the daily sales/purchase rollup tables.')
+
+
+@rollup_cli.command('rebuild')
+def rebuild_command():
+    """Recompute every rollup table from scratch."""
+    for spec in ROLLUPS:
+        rebuild_rollup(spec)
+        click.echo(f"Rebuilt {spec.rollup.__tablename__}")
+    db.session.commit()
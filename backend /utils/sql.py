@@ -0,0 +1,60 @@
+from sqlalchemy import and_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+def upsert_increment(connection, table, key_values, increments, assign=None):
+    """
+    Add `increments` (column -> amount) to the row identified by `key_values`,
+    inserting it with those amounts if it does not exist yet; `assign` columns
+    are overwritten. Uses a single INSERT ... ON CONFLICT on SQLite/PostgreSQL,
+    UPDATE-then-INSERT elsewhere.
+    """
+    assign = assign or {}
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+        stmt = insert(table).values(**key_values, **increments, **assign)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_values),
+            set_={
+                **{column: table.c[column] + stmt.excluded[column] for column in increments},
+                **{column: stmt.excluded[column] for column in assign},
+            },
+        )
+        connection.execute(stmt)
+        return
+
+    match = and_(*[table.c[column] == value for column, value in key_values.items()])
+    result = connection.execute(
+        table.update().where(match).values(
+            {column: table.c[column] + amount for column, amount in increments.items()}, **assign
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**key_values, **increments, **assign))
+
+
+def upsert_select(connection, table, key_columns, query):
+    """
+    Insert the rows of `query`, whose column labels name columns of `table`, and
+    overwrite the non-key columns of rows that already exist. One INSERT ... SELECT
+    ... ON CONFLICT statement on SQLite/PostgreSQL, so the values are computed and
+    stored atomically; elsewhere a DELETE then an INSERT. SQLite needs a WHERE
+    clause in `query` to parse the ON CONFLICT.
+    """
+    columns = [column.name for column in query.selected_columns]
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else pg_insert
+        stmt = insert(table).from_select(columns, query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={column: stmt.excluded[column] for column in columns if column not in key_columns},
+        )
+        connection.execute(stmt)
+        return
+
+    keys = select(*[query.selected_columns[column] for column in key_columns])
+    connection.execute(table.delete().where(tuple_(*[table.c[column] for column in key_columns]).in_(keys)))
+    connection.execute(table.insert().from_select(columns, query))
@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import db, Inventory, StockMovement, StockCheckpoint
+from utils.cache import bump_versions
+
+MOVEMENT_TYPES = ('in', 'out')
+
+
+class StockError(ValueError):
+    pass
+
+
+def _signed_quantity():
+    return case((StockMovement.movement_type == 'in', StockMovement.quantity), else_=-StockMovement.quantity)
+
+
+def record_movement(item, movement_type, quantity, day, added_by, notes=None):
+    """
+    Write a movement of `quantity` (already in `item.unit`) and apply it to the item's
+    balance in one conditional UPDATE, so concurrent movements can neither lose an
+    update nor take the balance below zero. Returns the new (unflushed) StockMovement.
+    """
+    if movement_type not in MOVEMENT_TYPES:
+        raise StockError(f"Invalid movement_type '{movement_type}'. Use 'in' or 'out'.")
+    if quantity <= 0:
+        raise StockError("Movement quantity must be positive.")
+
+    inventory = Inventory.__table__
+    delta = quantity if movement_type == 'in' else -quantity
+    stmt = update(inventory).where(inventory.c.id == item.id).values(
+        quantity=inventory.c.quantity + delta,
+        movement_count=inventory.c.movement_count + 1,
+    )
+    if movement_type == 'out':
+        stmt = stmt.where(inventory.c.quantity >= quantity)
+    if db.session.execute(stmt).rowcount == 0:
+        raise StockError(f"Insufficient stock: {item.name} has {item.quantity} {item.unit} available.")
+
+    # The UPDATE holds the row lock, so this reads our own write
+    balance, movement_count = db.session.execute(
+        select(inventory.c.quantity, inventory.c.movement_count).where(inventory.c.id == item.id)
+    ).one()
+    set_committed_value(item, 'quantity', balance)
+    set_committed_value(item, 'movement_count', movement_count)
+    bump_versions('inventory')
+
+    # Checkpoints at or after a backdated movement no longer hold
+    db.session.execute(StockCheckpoint.__table__.delete().where(
+        StockCheckpoint.inventory_id == item.id, StockCheckpoint.date >= day
+    ))
+
+    movement = StockMovement(
+        inventory_id=item.id,
+        movement_type=movement_type,
+        quantity=quantity,
+        unit=item.unit,
+        remaining_stock=balance,
+        date=day,
+        notes=notes,
+        added_by=added_by
+    )
+    db.session.add(movement)
+
+    interval = current_app.config.get('STOCK_CHECKPOINT_INTERVAL', 100)
+    if interval and movement_count % interval == 0:
+        create_checkpoint(item.id, day - timedelta(days=1))
+    return movement
+
+
+def stock_as_of(inventory_id, day):
+    """
+    Balance at the end of `day`: the nearest checkpoint on or before `day` plus the
+    movements recorded after it. Returns (balance, checkpoint_date or None).
+    """
+    checkpoint = db.session.execute(
+        select(StockCheckpoint.date, StockCheckpoint.balance)
+        .where(StockCheckpoint.inventory_id == inventory_id, StockCheckpoint.date <= day)
+        .order_by(StockCheckpoint.date.desc())
+        .limit(1)
+    ).first()
+
+    replay = select(func.coalesce(func.sum(_signed_quantity()), 0)).where(
+        StockMovement.inventory_id == inventory_id, StockMovement.date <= day
+    )
+    if checkpoint:
+        replay = replay.where(StockMovement.date > checkpoint.date)
+    balance = (checkpoint.balance if checkpoint else 0) + db.session.execute(replay).scalar()
+    return balance, checkpoint.date if checkpoint else None
+
+
+def create_checkpoint(inventory_id, day):
+    """Store the balance at the end of `day` unless a (still valid) checkpoint exists."""
+    exists = db.session.execute(
+        select(StockCheckpoint.id).where(StockCheckpoint.inventory_id == inventory_id, StockCheckpoint.date == day)
+    ).first()
+    if exists:
+        return False
+    balance, _ = stock_as_of(inventory_id, day)
+    db.session.execute(StockCheckpoint.__table__.insert().values(inventory_id=inventory_id, date=day, balance=balance))
+    return True
+
+
+stock_cli = AppGroup('stock', help='Maintain stock ledger checkpoints.')
+
+
+@stock_cli.command('checkpoint')
+@click.option('--date', 'day', help='Checkpoint balances at the end of this day (YYYY-MM-DD); defaults to yesterday.')
+def checkpoint_command(day):
+    """Checkpoint every inventory item, e.g. nightly from cron."""
+    day = date.fromisoformat(day) if day else date.today() - timedelta(days=1)
+    created = 0
+    for (inventory_id,) in db.session.execute(select(Inventory.id)).all():
+        created += create_checkpoint(inventory_id, day)
+    db.session.commit()
+    click.echo(f"Created {created} checkpoints for {day.isoformat()}")
@@ -0,0 +1,49 @@
+import re
+
+# Mass units are normalized to kilograms; countable units keep their own base unit.
+UNIT_ALIASES = {
+    'kg': ('kg', 1.0), 'kgs': ('kg', 1.0), 'kilo': ('kg', 1.0), 'kilos': ('kg', 1.0),
+    'kilogram': ('kg', 1.0), 'kilograms': ('kg', 1.0),
+    'g': ('kg', 0.001), 'gram': ('kg', 0.001), 'grams': ('kg', 0.001),
+    't': ('kg', 1000.0), 'ton': ('kg', 1000.0), 'tons': ('kg', 1000.0),
+    'tonne': ('kg', 1000.0), 'tonnes': ('kg', 1000.0),
+    'lb': ('kg', 0.45359237), 'lbs': ('kg', 0.45359237),
+    'crate': ('crate', 1.0), 'crates': ('crate', 1.0),
+    'box': ('box', 1.0), 'boxes': ('box', 1.0),
+    'bag': ('bag', 1.0), 'bags': ('bag', 1.0),
+    'sack': ('sack', 1.0), 'sacks': ('sack', 1.0),
+    'piece': ('piece', 1.0), 'pieces': ('piece', 1.0), 'pcs': ('piece', 1.0), 'pc': ('piece', 1.0),
+}
+DEFAULT_UNIT = 'kg'
+
+_QUANTITY_RE = re.compile(r'^\s*([-+]?\d+(?:[.,]\d+)?)\s*([A-Za-z]*)\s*$')
+
+
+def normalize_unit(unit):
+    """Return (base_unit, factor) for a unit name, or raise ValueError."""
+    if not unit:
+        return DEFAULT_UNIT, 1.0
+    key = unit.strip().lower().rstrip('.')
+    if key not in UNIT_ALIASES:
+        raise ValueError(f"Unknown unit '{unit}'.")
+    return UNIT_ALIASES[key]
+
+
+def parse_quantity(value, unit=None):
+    """
+    Parse a quantity such as 12, "12", "12.5 kg" or "3 crates" into (amount, base_unit).
+    A unit embedded in the text takes precedence over the separate `unit` argument.
+    """
+    if value is None or value == '':
+        raise ValueError("Quantity is required.")
+    if isinstance(value, (int, float)):
+        amount, text_unit = float(value), None
+    else:
+        match = _QUANTITY_RE.match(str(value))
+        if not match:
+            raise ValueError(f"Invalid quantity '{value}'.")
+        amount, text_unit = float(match.group(1).replace(',', '.')), match.group(2) or None
+    if amount < 0:
+        raise ValueError("Quantity cannot be negative.")
+    base_unit, factor = normalize_unit(text_unit or unit)
+    return round(amount * factor, 6), base_unit